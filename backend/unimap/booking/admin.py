@@ -2,4 +2,9 @@ from django.contrib import admin
 from .models import *
 
 # Register your models here.
-admin.site.register(Booking)
\ No newline at end of file
+admin.site.register(Booking)
+admin.site.register(BookingSeries)
+admin.site.register(RoomOccupancy)
+admin.site.register(RoomUsageRollup)
+admin.site.register(WaitlistEntry)
+admin.site.register(BookingArchive)
\ No newline at end of file
@@ -0,0 +1,108 @@
+# booking/admission.py
+import threading
+from contextlib import ExitStack, contextmanager
+
+from django.db import IntegrityError, transaction
+from rest_framework.serializers import ValidationError
+
+from users.models import User
+from uni.models import Room
+from .models import Booking
+
+# Admission for unrelated (room, date) and (user, date) keys rarely shares a
+# stripe, and the number of locks stays fixed however many rooms exist.
+LOCK_STRIPES = 64
+_locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+
+
+@contextmanager
+def _locked(keys, room_ids, user_ids=()):
+    # Always take stripes in index order so two admissions can't deadlock.
+    stripes = sorted({hash(key) % LOCK_STRIPES for key in keys})
+    with ExitStack() as stack:
+        for stripe in stripes:
+            stack.enter_context(_locks[stripe])
+        with transaction.atomic():
+            list(Room.objects.select_for_update().filter(pk__in=room_ids).order_by("pk").values_list("pk", flat=True))
+            if user_ids:
+                list(User.objects.select_for_update().filter(pk__in=user_ids).order_by("pk").values_list("pk", flat=True))
+            yield
+
+
+def slot_lock(room_id, days, user_id=None):
+    """
+    Serialize admission per (room, date) and per (user, date) for every
+    date in `days`: striped process-local locks for threads of this
+    process, then row locks on the room and user inside a transaction for
+    other processes (on databases that support SELECT ... FOR UPDATE).
+    """
+    keys = [("room", room_id, day) for day in days]
+    if user_id is not None:
+        keys += [("user", user_id, day) for day in days]
+    return _locked(keys, [room_id], [user_id] if user_id is not None else ())
+
+
+def rooms_lock(room_days):
+    """
+    slot_lock for many (room id, date) pairs at once.
+    """
+    room_days = set(room_days)
+    return _locked([("room", room_id, day) for room_id, day in room_days], {room_id for room_id, _ in room_days})
+
+
+def users_lock(room_id, day, user_ids):
+    """
+    slot_lock for one room and day and the (user, date) keys of several
+    users at once.
+    """
+    keys = [("room", room_id, day)] + [("user", user_id, day) for user_id in user_ids]
+    return _locked(keys, [room_id], sorted(user_ids))
+
+
+def overlapping(day, start, end, exclude=None):
+    bookings = Booking.objects.filter(date=day, start_time__lt=end, end_time__gt=start)
+    if exclude is not None:
+        bookings = bookings.exclude(pk=exclude)
+    return bookings
+
+
+def room_conflicts(room_id, day, start, end, exclude=None):
+    return overlapping(day, start, end, exclude).filter(room_id=room_id, status=Booking.STATUS_APPROVED)
+
+
+def user_conflicts(user_id, day, start, end, exclude=None):
+    return overlapping(day, start, end, exclude).filter(user_id=user_id, status__in=Booking.ACTIVE_STATUSES)
+
+
+def admit(serializer, user):
+    """
+    Save a new booking from `serializer` for `user` unless the room is
+    already booked or the user has another booking at that time.
+    """
+    data = serializer.validated_data
+    room, day, start, end = data["room"], data["date"], data["start_time"], data["end_time"]
+    if end <= start:
+        raise ValidationError({"end_time": "Must be after start_time."})
+
+    with slot_lock(room.pk, [day], user.pk):
+        if room_conflicts(room.pk, day, start, end).exists():
+            raise ValidationError({"message": "Room already booked."})
+        if user_conflicts(user.pk, day, start, end).exists():
+            raise ValidationError({"message": "You can't be in two places at once."})
+        try:
+            with transaction.atomic():
+                return serializer.save(user=user)
+        except IntegrityError:
+            raise ValidationError({"message": "Room already booked."})
+
+
+def approve(serializer):
+    """
+    Save an admin update that approves `serializer.instance`, unless another
+    approved booking already holds the room at that time.
+    """
+    booking = serializer.instance
+    with slot_lock(booking.room_id, [booking.date]):
+        if room_conflicts(booking.room_id, booking.date, booking.start_time, booking.end_time, exclude=booking.pk).exists():
+            raise ValidationError({"message": "Room already booked at this time."})
+        return serializer.save()
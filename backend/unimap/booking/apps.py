@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class BookingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'booking'
+
+    def ready(self):
+        from unimap.caches import require_shared_cache
+
+        from . import signals  # noqa: F401
+
+        require_shared_cache("BOOKING_AVAILABILITY_CACHE")
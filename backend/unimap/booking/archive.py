@@ -0,0 +1,60 @@
+# booking/archive.py
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Booking, BookingArchive
+from .signals import suppress_booking_signals
+
+DEFAULT_AFTER_DAYS = 90
+ARCHIVED_FIELDS = ("id", "room_id", "user_id", "date", "start_time", "end_time", "purpose",
+                   "series_id", "status", "created_at", "updated_at")
+
+
+def horizon(days=None):
+    """
+    The first date that stays in the hot table: bookings dated before it
+    are archived.
+    """
+    if days is None:
+        days = getattr(settings, "BOOKING_ARCHIVE_AFTER_DAYS", DEFAULT_AFTER_DAYS)
+    return timezone.localdate() - timedelta(days=days)
+
+
+def archive_batch(before, batch_size=500):
+    """
+    Move up to `batch_size` of the oldest bookings dated before `before`
+    into BookingArchive in one transaction. Returns how many were moved.
+    Each batch commits on its own and copying is idempotent, so an
+    interrupted run is resumed by running again.
+    """
+    with transaction.atomic():
+        rows = list(
+            Booking.objects.filter(date__lt=before)
+            .order_by("date", "id")
+            .select_for_update()
+            .values(*ARCHIVED_FIELDS)[:batch_size]
+        )
+        if not rows:
+            return 0
+        BookingArchive.objects.bulk_create([BookingArchive(**row) for row in rows], ignore_conflicts=True)
+        with suppress_booking_signals():
+            Booking.objects.filter(pk__in=[row["id"] for row in rows]).delete()
+    return len(rows)
+
+
+def archive(before, batch_size=500, max_batches=None):
+    """
+    Archive every booking dated before `before`, batch by batch, or at most
+    `max_batches` batches. Returns how many were moved.
+    """
+    moved = batches = 0
+    while max_batches is None or batches < max_batches:
+        count = archive_batch(before, batch_size)
+        if not count:
+            break
+        moved += count
+        batches += 1
+    return moved
@@ -0,0 +1,174 @@
+# booking/availability.py
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .models import Booking
+
+KEY_PREFIX = "booking:busy"
+GENERATION_PREFIX = "booking:busy-generation"
+# Busy intervals of a day change only through booking_changed, which
+# moves the day to a new generation; the timeout just bounds what a
+# missed invalidation costs.
+DEFAULT_TIMEOUT = 24 * 60 * 60
+DAY_MINUTES = 24 * 60
+
+
+def _cache():
+    return caches[getattr(settings, "BOOKING_AVAILABILITY_CACHE", "default")]
+
+
+def _timeout():
+    return getattr(settings, "BOOKING_AVAILABILITY_TIMEOUT", DEFAULT_TIMEOUT)
+
+
+def _key(room_id, day, generation):
+    return f"{KEY_PREFIX}:{room_id}:{day.isoformat()}:{generation}"
+
+
+def _generation_key(room_id, day):
+    return f"{GENERATION_PREFIX}:{room_id}:{day.isoformat()}"
+
+
+def _generations(cache, day_keys):
+    """
+    {(room id, date): generation} for `day_keys`. A day without one (never
+    seen, expired or evicted) starts at the current time in nanoseconds, so
+    it never matches intervals cached under an earlier generation.
+    """
+    keys = {_generation_key(*day_key): day_key for day_key in day_keys}
+    found = cache.get_many(list(keys))
+    missing = [key for key in keys if key not in found]
+    if missing:
+        start = time.time_ns()
+        for key in missing:
+            cache.add(key, start, timeout=_timeout())
+        found.update(cache.get_many(missing))
+    return {day_key: found.get(key) for key, day_key in keys.items()}
+
+
+def minutes(value):
+    return value.hour * 60 + value.minute
+
+
+def clock(value):
+    return f"{value // 60:02d}:{value % 60:02d}"
+
+
+class IntervalSet:
+    """
+    Disjoint, sorted [start, end) intervals in minutes since midnight.
+    add() expects intervals in start order and merges each one into the
+    last interval if they overlap or touch.
+    """
+
+    def __init__(self, intervals=()):
+        self.intervals = []
+        for start, end in sorted(intervals):
+            self.add(start, end)
+
+    def add(self, start, end):
+        if self.intervals and start <= self.intervals[-1][1]:
+            last_start, last_end = self.intervals[-1]
+            self.intervals[-1] = (last_start, max(last_end, end))
+        else:
+            self.intervals.append((start, end))
+
+    def complement(self, start=0, end=DAY_MINUTES):
+        gaps = []
+        cursor = start
+        for busy_start, busy_end in self.intervals:
+            if busy_start > cursor:
+                gaps.append((cursor, min(busy_start, end)))
+            cursor = max(cursor, busy_end)
+            if cursor >= end:
+                break
+        if cursor < end:
+            gaps.append((cursor, end))
+        return [(a, b) for a, b in gaps if a < b]
+
+
+def days_between(date_from, date_to):
+    return [date_from + timedelta(days=i) for i in range((date_to - date_from).days + 1)]
+
+
+def busy_intervals(room_ids, date_from, date_to):
+    """
+    {(room id, date): [(start, end), ...]} of merged approved bookings.
+    Cached days come from the cache; the rest are loaded with one query.
+    Loaded days are cached under the generation read before the query, so
+    an invalidation racing with the query leaves them unreachable.
+    """
+    cache = _cache()
+    days = days_between(date_from, date_to)
+    generations = _generations(cache, [(room_id, day) for room_id in room_ids for day in days])
+    keys = {
+        _key(*day_key, generation): day_key
+        for day_key, generation in generations.items()
+        if generation is not None
+    }
+    cached = cache.get_many(list(keys))
+    result = {keys[key]: [tuple(interval) for interval in value] for key, value in cached.items()}
+
+    missing = [day_key for day_key in generations if day_key not in result]
+    if not missing:
+        return result
+
+    missing_rooms = {room_id for room_id, _ in missing}
+    sets = {day_key: IntervalSet() for day_key in missing}
+    rows = Booking.objects.filter(
+        room_id__in=missing_rooms,
+        date__range=(date_from, date_to),
+        status=Booking.STATUS_APPROVED,
+    ).order_by("room_id", "date", "start_time").values_list("room_id", "date", "start_time", "end_time")
+    for room_id, day, start, end in rows:
+        interval_set = sets.get((room_id, day))
+        if interval_set is not None:
+            interval_set.add(minutes(start), minutes(end))
+
+    fresh = {day_key: interval_set.intervals for day_key, interval_set in sets.items()}
+    cache.set_many(
+        {
+            _key(*day_key, generations[day_key]): intervals
+            for day_key, intervals in fresh.items()
+            if generations[day_key] is not None
+        },
+        timeout=_timeout(),
+    )
+    result.update(fresh)
+    return result
+
+
+def invalidate(days):
+    """
+    Forget the cached intervals of each (room id, date) in `days` by moving
+    the day to a new generation.
+    """
+    cache = _cache()
+    for room_id, day in days:
+        key = _generation_key(room_id, day)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), timeout=_timeout())
+
+
+def availability(room_ids, date_from, date_to):
+    """
+    Busy and free intervals per room and day, as "HH:MM" pairs.
+    """
+    busy = busy_intervals(room_ids, date_from, date_to)
+    rooms = []
+    for room_id in room_ids:
+        days = []
+        for day in days_between(date_from, date_to):
+            intervals = busy[(room_id, day)]
+            days.append({
+                "date": day.isoformat(),
+                "busy": [[clock(a), clock(b)] for a, b in intervals],
+                "free": [[clock(a), clock(b)] for a, b in IntervalSet(intervals).complement()],
+            })
+        rooms.append({"room": room_id, "days": days})
+    return rooms
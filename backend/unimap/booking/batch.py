@@ -0,0 +1,90 @@
+# booking/batch.py
+from django.utils import timezone
+
+from .admission import rooms_lock
+from .models import Booking
+from .signals import bulk_updated
+
+MAX_ITEMS = 500
+# Status changes an admin may make; the same rules as AdminBookingView and
+# BookingSerializer.update: only pending bookings, never to cancelled.
+TARGET_STATUSES = (Booking.STATUS_APPROVED, Booking.STATUS_REJECTED)
+
+
+def _overlaps(start, end, intervals):
+    return any(start < other_end and end > other_start for other_start, other_end in intervals)
+
+
+def apply_batch(items):
+    """
+    Apply [{"id": ..., "status": ...}, ...] in one transaction with a single
+    bulk_update. Approvals are admitted first-come by created_at: each must
+    not overlap an approved booking already in the database or one
+    approved earlier in the batch. Returns one result per item, in order.
+    """
+    results = [{"id": item.get("id"), "ok": False} for item in items]
+    wanted = {}
+    for result, item in zip(results, items):
+        if not isinstance(item.get("id"), int):
+            result["error"] = "id must be an integer."
+        elif item.get("status") not in TARGET_STATUSES:
+            result["error"] = "status must be approved or rejected."
+        elif item["id"] in wanted:
+            result["error"] = "Duplicate id in batch."
+        else:
+            wanted[item["id"]] = (result, item["status"])
+
+    bookings = Booking.objects.in_bulk(list(wanted))
+    for pk, (result, _) in wanted.items():
+        booking = bookings.get(pk)
+        if booking is None:
+            result["error"] = "Booking not found."
+        elif booking.status != Booking.STATUS_PENDING:
+            result["error"] = "You cannot change the status of this booking."
+    todo = [(bookings[pk], target, result) for pk, (result, target) in wanted.items() if "error" not in result]
+    if not todo:
+        return results
+
+    room_days = {(booking.room_id, booking.date) for booking, _, _ in todo}
+    with rooms_lock(room_days):
+        # Read again under the lock: a booking may have been decided (or
+        # moved) since the read above.
+        current = Booking.objects.select_for_update().in_bulk([booking.pk for booking, _, _ in todo])
+        locked = []
+        for booking, target, result in todo:
+            booking = current.get(booking.pk)
+            if booking is None:
+                result["error"] = "Booking not found."
+            elif booking.status != Booking.STATUS_PENDING or (booking.room_id, booking.date) not in room_days:
+                result["error"] = "You cannot change the status of this booking."
+            else:
+                locked.append((booking, target, result))
+
+        # Approved intervals per (room, date), from the DB in one query.
+        taken = {room_day: [] for room_day in room_days}
+        approved = Booking.objects.filter(
+            room_id__in={room_id for room_id, _ in room_days},
+            date__in={day for _, day in room_days},
+            status=Booking.STATUS_APPROVED,
+        ).values_list("room_id", "date", "start_time", "end_time")
+        for room_id, day, start, end in approved:
+            if (room_id, day) in taken:
+                taken[(room_id, day)].append((start, end))
+
+        now = timezone.now()
+        changed = []
+        for booking, target, result in sorted(locked, key=lambda entry: (entry[0].created_at, entry[0].pk)):
+            if target == Booking.STATUS_APPROVED:
+                intervals = taken[(booking.room_id, booking.date)]
+                if _overlaps(booking.start_time, booking.end_time, intervals):
+                    result["error"] = "Room already booked at this time."
+                    continue
+                intervals.append((booking.start_time, booking.end_time))
+            booking.status = target
+            booking.updated_at = now
+            changed.append(booking)
+            result.update(ok=True, status=target)
+
+        Booking.objects.bulk_update(changed, ["status", "updated_at"])
+        bulk_updated(changed)
+    return results
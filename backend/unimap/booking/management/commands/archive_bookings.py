@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from booking.archive import archive, horizon
+
+
+class Command(BaseCommand):
+    help = "Move bookings older than the archive horizon into the booking archive, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, help="archive bookings dated more than this many days ago "
+                                                     "(default: BOOKING_ARCHIVE_AFTER_DAYS)")
+        parser.add_argument("--batch-size", type=int, default=500, help="bookings moved per transaction")
+        parser.add_argument("--max-batches", type=int, help="stop after this many batches; run again to resume")
+
+    def handle(self, *args, **options):
+        before = horizon(options["days"])
+        moved = archive(before, batch_size=max(1, options["batch_size"]), max_batches=options["max_batches"])
+        self.stdout.write(self.style.SUCCESS(f"Archived {moved} booking(s) dated before {before}"))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from booking.models import Booking, RoomOccupancy
+from booking.occupancy import recompute
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-room daily occupancy bitmaps from approved bookings."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500, help="(room, date) pairs per query")
+
+    def handle(self, *args, **options):
+        days = sorted(set(
+            Booking.objects.filter(status=Booking.STATUS_APPROVED).values_list("room_id", "date")
+        ))
+        chunk = max(1, options["chunk_size"])
+        with transaction.atomic():
+            RoomOccupancy.objects.all().delete()
+            for i in range(0, len(days), chunk):
+                recompute(days[i:i + chunk])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt occupancy for {len(days)} room-day(s)"))
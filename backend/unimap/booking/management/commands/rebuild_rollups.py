@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from booking.rollups import rebuild
+
+
+class Command(BaseCommand):
+    help = "Rebuild the hourly room usage rollups from all bookings, archived ones included."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="bookings read and rollups written per query")
+
+    def handle(self, *args, **options):
+        buckets = rebuild(batch_size=max(1, options["batch_size"]))
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {buckets} rollup bucket(s)"))
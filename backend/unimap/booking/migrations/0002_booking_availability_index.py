@@ -0,0 +1,20 @@
+# Generated by Django 5.1.7 on 2026-10-18 08:29
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0001_initial'),
+        ('uni', '0010_navigation_graph'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['room', 'date', 'status', 'start_time'], name='booking_boo_room_id_a30c0e_idx'),
+        ),
+    ]
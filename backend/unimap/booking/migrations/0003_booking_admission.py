@@ -0,0 +1,28 @@
+# Generated by Django 5.1.7 on 2026-10-18 08:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0002_booking_availability_index'),
+        ('uni', '0010_navigation_graph'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='booking',
+            unique_together=set(),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['user', 'date', 'start_time'], name='booking_boo_user_id_48b5d6_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='booking',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['pending', 'approved'])), fields=('room', 'date', 'start_time', 'end_time'), name='booking_unique_active_slot'),
+        ),
+    ]
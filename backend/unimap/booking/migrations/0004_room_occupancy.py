@@ -0,0 +1,27 @@
+# Generated by Django 5.1.7 on 2026-10-18 08:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0003_booking_admission'),
+        ('uni', '0010_navigation_graph'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoomOccupancy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('slots', models.BinaryField(max_length=12)),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occupancy', to='uni.room')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('date', 'room'), name='booking_occupancy_room_day')],
+            },
+        ),
+    ]
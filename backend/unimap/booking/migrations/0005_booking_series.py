@@ -0,0 +1,43 @@
+# Generated by Django 5.1.7 on 2026-10-18 08:36
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0004_room_occupancy'),
+        ('uni', '0010_navigation_graph'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookingSeries',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField()),
+                ('purpose', models.TextField(blank=True)),
+                ('rule', models.CharField(choices=[('weekly', 'Weekly'), ('custom', 'Custom dates')], default='weekly', max_length=20)),
+                ('interval', models.PositiveSmallIntegerField(default=1)),
+                ('first_date', models.DateField(blank=True, null=True)),
+                ('last_date', models.DateField(blank=True, null=True)),
+                ('dates', models.JSONField(blank=True, default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='booking_series', to='uni.room')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='booking_series', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'Booking series',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='series',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='bookings', to='booking.bookingseries'),
+        ),
+    ]
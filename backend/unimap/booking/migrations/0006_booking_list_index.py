@@ -0,0 +1,20 @@
+# Generated by Django 5.1.7 on 2026-10-18 08:46
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0005_booking_series'),
+        ('uni', '0010_navigation_graph'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['status', 'date'], name='booking_boo_status_6f8d87_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.7 on 2026-10-18 08:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0006_booking_list_index'),
+        ('uni', '0010_navigation_graph'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoomUsageRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('hour', models.PositiveSmallIntegerField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('approved', 'Approved'), ('rejected', 'Rejected'), ('cancelled', 'Cancelled')], max_length=20)),
+                ('minutes', models.PositiveIntegerField(default=0)),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='usage_rollups', to='uni.room')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('date', 'room', 'hour', 'status'), name='booking_rollup_bucket')],
+            },
+        ),
+    ]
@@ -15,6 +15,8 @@ class Booking(models.Model):
         (STATUS_REJECTED, "Rejected"),
         (STATUS_CANCELLED, "Cancelled")
     ]
+    # Bookings that still hold their slot.
+    ACTIVE_STATUSES = [STATUS_PENDING, STATUS_APPROVED]
 
     room = models.ForeignKey(Room, related_name="bookings", on_delete=models.CASCADE)
     user = models.ForeignKey(User, related_name="bookings", on_delete=models.CASCADE)
@@ -24,6 +26,7 @@ class Booking(models.Model):
     end_time = models.TimeField()
 
     purpose = models.TextField(blank=True)
+    series = models.ForeignKey("BookingSeries", related_name="bookings", on_delete=models.CASCADE, null=True, blank=True)
 
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -31,7 +34,183 @@ class Booking(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
-        unique_together = ("room", "date", "start_time", "end_time")
+        constraints = [
+            # Rejected and cancelled bookings give their slot back.
+            models.UniqueConstraint(
+                fields=["room", "date", "start_time", "end_time"],
+                condition=models.Q(status__in=["pending", "approved"]),
+                name="booking_unique_active_slot",
+            ),
+        ]
+        indexes = [
+            # Availability and conflict checks: one room's bookings of a
+            # given status on a day, in start order.
+            models.Index(fields=["room", "date", "status", "start_time"]),
+            # The same user's bookings on a day, for double-booking checks
+            # and the user's date-filtered list.
+            models.Index(fields=["user", "date", "start_time"]),
+            # Admin lists filtered by status and date range.
+            models.Index(fields=["status", "date"]),
+        ]
 
     def __str__(self):
         return f"{self.room} on {self.date}"
+
+
+class BookingSeries(models.Model):
+    """
+    A recurring booking: the same room and time every `interval` weeks from
+    first_date to last_date, or on an explicit list of `dates`. Each
+    occurrence is a Booking pointing back at its series.
+    """
+    RULE_WEEKLY = "weekly"
+    RULE_CUSTOM = "custom"
+
+    RULE_CHOICES = [
+        (RULE_WEEKLY, "Weekly"),
+        (RULE_CUSTOM, "Custom dates"),
+    ]
+
+    room = models.ForeignKey(Room, related_name="booking_series", on_delete=models.CASCADE)
+    user = models.ForeignKey(User, related_name="booking_series", on_delete=models.CASCADE)
+
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    purpose = models.TextField(blank=True)
+
+    rule = models.CharField(max_length=20, choices=RULE_CHOICES, default=RULE_WEEKLY)
+    interval = models.PositiveSmallIntegerField(default=1)
+    first_date = models.DateField(null=True, blank=True)
+    last_date = models.DateField(null=True, blank=True)
+    dates = models.JSONField(default=list, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name_plural = "Booking series"
+
+    def __str__(self):
+        return f"{self.room} series from {self.first_date or (self.dates[0] if self.dates else '?')}"
+
+
+class RoomOccupancy(models.Model):
+    """
+    Which 15-minute slots of a day a room is booked for (approved bookings
+    only), as a 96-bit little-endian bitmap; bit i covers minutes
+    [15 * i, 15 * (i + 1)). Maintained by booking/occupancy.py; rooms with
+    no row are free all day.
+    """
+    room = models.ForeignKey(Room, related_name="occupancy", on_delete=models.CASCADE)
+    date = models.DateField()
+    slots = models.BinaryField(max_length=12)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["date", "room"], name="booking_occupancy_room_day"),
+        ]
+
+    def __str__(self):
+        return f"{self.room} occupancy on {self.date}"
+
+
+class RoomUsageRollup(models.Model):
+    """
+    Booked minutes of a room within one hour of a day, per booking status.
+    Maintained incrementally by booking/rollups.py; analytics read these
+    rows instead of scanning bookings.
+    """
+    room = models.ForeignKey(Room, related_name="usage_rollups", on_delete=models.CASCADE)
+    date = models.DateField()
+    hour = models.PositiveSmallIntegerField()
+    status = models.CharField(max_length=20, choices=Booking.STATUS_CHOICES)
+    minutes = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["date", "room", "hour", "status"], name="booking_rollup_bucket"),
+        ]
+
+    def __str__(self):
+        return f"{self.room} on {self.date} at {self.hour:02d}:00 ({self.status})"
+
+
+class WaitlistEntry(models.Model):
+    """
+    A request for a room and time that was taken when asked for. When a
+    booking blocking it goes away, booking/waitlist.py turns the oldest
+    compatible entries into pending bookings.
+    """
+    STATUS_WAITING = "waiting"
+    STATUS_PROMOTED = "promoted"
+    STATUS_CANCELLED = "cancelled"
+
+    STATUS_CHOICES = [
+        (STATUS_WAITING, "Waiting"),
+        (STATUS_PROMOTED, "Promoted"),
+        (STATUS_CANCELLED, "Cancelled"),
+    ]
+
+    room = models.ForeignKey(Room, related_name="waitlist", on_delete=models.CASCADE)
+    user = models.ForeignKey(User, related_name="waitlist", on_delete=models.CASCADE)
+
+    date = models.DateField()
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    purpose = models.TextField(blank=True)
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_WAITING)
+    booking = models.OneToOneField(Booking, related_name="waitlist_entry", on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["created_at", "id"]
+        verbose_name_plural = "Waitlist entries"
+        constraints = [
+            # One place in the queue per user and slot.
+            models.UniqueConstraint(
+                fields=["user", "room", "date", "start_time", "end_time"],
+                condition=models.Q(status="waiting"),
+                name="booking_waitlist_unique_waiting",
+            ),
+        ]
+        indexes = [
+            # Promotion: the waiting entries of a room and day, oldest first.
+            models.Index(fields=["room", "date", "status", "created_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.user} waiting for {self.room} on {self.date}"
+
+
+class BookingArchive(models.Model):
+    """
+    A booking moved out of the hot Booking table by booking/archive.py once
+    its date is past the archive horizon. Keeps the booking's id, so
+    archiving is idempotent and bookings and history never share ids.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    room = models.ForeignKey(Room, related_name="archived_bookings", on_delete=models.CASCADE)
+    user = models.ForeignKey(User, related_name="archived_bookings", on_delete=models.CASCADE)
+
+    date = models.DateField()
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+
+    purpose = models.TextField(blank=True)
+    series = models.ForeignKey(BookingSeries, related_name="archived_bookings", on_delete=models.SET_NULL, null=True, blank=True)
+
+    status = models.CharField(max_length=20, choices=Booking.STATUS_CHOICES)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["user", "date"]),
+            models.Index(fields=["status", "date"]),
+        ]
+
+    def __str__(self):
+        return f"{self.room} on {self.date} (archived)"
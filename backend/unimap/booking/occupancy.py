@@ -0,0 +1,95 @@
+# booking/occupancy.py
+import threading
+from contextlib import contextmanager
+
+from .availability import minutes
+from .models import Booking, RoomOccupancy
+
+SLOT_MINUTES = 15
+SLOTS = 24 * 60 // SLOT_MINUTES
+SLOT_BYTES = SLOTS // 8
+
+_deferred = threading.local()
+
+
+def slot_mask(start, end):
+    """
+    Bits of every slot that [start, end) touches, with start and end in
+    minutes since midnight.
+    """
+    first = start // SLOT_MINUTES
+    last = -(-end // SLOT_MINUTES)  # ceil
+    if last <= first:
+        return 0
+    return ((1 << (last - first)) - 1) << first
+
+
+def to_bytes(bits):
+    return bits.to_bytes(SLOT_BYTES, "little")
+
+
+def from_bytes(data):
+    return int.from_bytes(bytes(data), "little")
+
+
+@contextmanager
+def deferred():
+    """
+    Collect recompute() calls made inside the block and run them as one
+    recompute at the end, e.g. around bulk updates of many bookings.
+    """
+    if getattr(_deferred, "days", None) is not None:
+        yield
+        return
+    _deferred.days = set()
+    try:
+        yield
+        days = _deferred.days
+    finally:
+        _deferred.days = None
+    recompute(days)
+
+
+def recompute(days):
+    """
+    Rebuild the bitmaps of each (room id, date) in `days` from its approved
+    bookings, with one query for all of them.
+    """
+    days = set(days)
+    pending = getattr(_deferred, "days", None)
+    if pending is not None:
+        pending |= days
+        return
+    if not days:
+        return
+    bits = dict.fromkeys(days, 0)
+    rows = Booking.objects.filter(
+        room_id__in={room_id for room_id, _ in days},
+        date__in={day for _, day in days},
+        status=Booking.STATUS_APPROVED,
+    ).values_list("room_id", "date", "start_time", "end_time")
+    for room_id, day, start, end in rows:
+        if (room_id, day) in bits:
+            bits[(room_id, day)] |= slot_mask(minutes(start), minutes(end))
+
+    for (room_id, day), value in bits.items():
+        if value:
+            RoomOccupancy.objects.update_or_create(room_id=room_id, date=day, defaults={"slots": to_bytes(value)})
+        else:
+            RoomOccupancy.objects.filter(room_id=room_id, date=day).delete()
+
+
+def free_rooms(rooms, day, start, end, limit=None):
+    """
+    The rooms of the `rooms` queryset with no approved booking touching
+    [start, end) on `day`: their bitmaps ANDed with the wanted slots. With
+    `limit`, at most that many are loaded.
+    """
+    mask = slot_mask(start, end)
+    busy = {
+        room_id
+        for room_id, slots in RoomOccupancy.objects.filter(date=day, room__in=rooms).values_list("room_id", "slots")
+        if from_bytes(slots) & mask
+    }
+    free = rooms.exclude(pk__in=busy)
+    return list(free if limit is None else free[:limit])
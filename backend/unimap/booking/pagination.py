@@ -0,0 +1,20 @@
+# booking/pagination.py
+from uni.pagination import KeysetPagination
+
+
+class BookingPagination(KeysetPagination):
+    """
+    Keyset pagination over bookings, newest first. Opt-in like the catalog
+    lists: without ?limit= or ?cursor= the plain list is returned.
+    """
+    ordering = ("-created_at", "-id")
+    default_limit = 50
+    max_limit = 500
+
+
+class AdminBookingPagination(BookingPagination):
+    """
+    BookingPagination for the admin lists, which span every user: always
+    paged, `default_limit` bookings per page without ?limit=.
+    """
+    always = True
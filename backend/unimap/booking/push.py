@@ -0,0 +1,124 @@
+# booking/push.py
+import asyncio
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from .availability import availability
+
+DEFAULT_BROKER = "booking.push.LocalBroker"
+
+_broker_lock = threading.Lock()
+_broker = None
+_broker_path = None
+
+
+def topic(room_id, day):
+    return f"availability:{room_id}:{day.isoformat()}"
+
+
+class Subscription:
+    """
+    Messages for a set of topics, delivered to the event loop that
+    subscribed. Await get() for the next one; close() when done.
+
+    Each message carries a topic's whole state, so one not yet read is
+    replaced by a newer one for its topic: a slow subscriber holds at most
+    one pending message per topic and never misses the latest.
+    """
+
+    def __init__(self, broker, topics):
+        self.broker = broker
+        self.topics = set(topics)
+        self.loop = asyncio.get_running_loop()
+        self.pending = {}
+        self.ready = asyncio.Event()
+
+    def deliver(self, name, message):
+        # Called from whichever thread published.
+        try:
+            self.loop.call_soon_threadsafe(self._put, name, message)
+        except RuntimeError:
+            # The subscriber's loop is gone.
+            self.close()
+
+    def _put(self, name, message):
+        # Re-insert so topics are read in the order of their latest change.
+        self.pending.pop(name, None)
+        self.pending[name] = message
+        self.ready.set()
+
+    async def get(self):
+        while not self.pending:
+            self.ready.clear()
+            await self.ready.wait()
+        return self.pending.pop(next(iter(self.pending)))
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class LocalBroker:
+    """
+    In-process fan-out: publish() hands each message to every subscription
+    of this process listening to its topic. A broker shared between
+    processes can replace it through BOOKING_PUSH_BROKER as long as it
+    offers subscribe(), unsubscribe(), publish() and has_subscribers().
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = defaultdict(set)
+
+    def subscribe(self, topics):
+        subscription = Subscription(self, topics)
+        with self._lock:
+            for name in subscription.topics:
+                self._subscriptions[name].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for name in subscription.topics:
+                subscriptions = self._subscriptions.get(name)
+                if subscriptions is not None:
+                    subscriptions.discard(subscription)
+                    if not subscriptions:
+                        del self._subscriptions[name]
+
+    def has_subscribers(self, name):
+        with self._lock:
+            return name in self._subscriptions
+
+    def publish(self, name, message):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(name, ()))
+        for subscription in subscriptions:
+            subscription.deliver(name, message)
+
+
+def get_broker():
+    global _broker, _broker_path
+    path = getattr(settings, "BOOKING_PUSH_BROKER", DEFAULT_BROKER)
+    with _broker_lock:
+        if path != _broker_path:
+            _broker = import_string(path)()
+            _broker_path = path
+        return _broker
+
+
+def publish_availability(days):
+    """
+    Push the busy and free intervals of each (room id, date) in `days` to
+    its subscribers. Days nobody listens to cost nothing; the rest cost one
+    availability lookup each, however many subscribers there are.
+    """
+    broker = get_broker()
+    for room_id, day in sorted(days):
+        name = topic(room_id, day)
+        if not broker.has_subscribers(name):
+            continue
+        (room,) = availability([room_id], day, day)
+        broker.publish(name, {"room": room_id, **room["days"][0]})
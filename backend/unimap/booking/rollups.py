@@ -0,0 +1,175 @@
+# booking/rollups.py
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+from django.db import IntegrityError, transaction
+from django.db.models import Sum
+from django.db.models.functions import ExtractIsoWeekDay
+
+from .availability import minutes
+from .models import Booking, BookingArchive, RoomUsageRollup
+
+_deferred = threading.local()
+
+# ?group_by= dimensions and the rollup column behind each; weekday (1 is
+# Monday) is annotated from the date.
+DIMENSIONS = {
+    "room": "room_id",
+    "building": "room__building_id",
+    "date": "date",
+    "weekday": "weekday",
+    "hour": "hour",
+    "status": "status",
+}
+
+
+def hour_minutes(start, end):
+    """
+    {hour: minutes} of [start, end), with start and end in minutes since
+    midnight.
+    """
+    split = {}
+    cursor = start
+    while cursor < end:
+        hour = cursor // 60
+        upto = min(end, (hour + 1) * 60)
+        split[hour] = upto - cursor
+        cursor = upto
+    return split
+
+
+def contribution(room_id, day, start_time, end_time, status):
+    """
+    The rollup minutes one booking accounts for, keyed by
+    (room id, date, hour, status).
+    """
+    return Counter({
+        (room_id, day, hour, status): booked
+        for hour, booked in hour_minutes(minutes(start_time), minutes(end_time)).items()
+    })
+
+
+def delta(booking, previous, deleted=False):
+    """
+    How a booking_changed event moves the rollups: the booking's current
+    contribution minus the one it had as loaded.
+    """
+    change = Counter()
+    if not deleted:
+        change.update(contribution(booking.room_id, booking.date, booking.start_time, booking.end_time, booking.status))
+    if previous is not None:
+        change.subtract(contribution(previous["room_id"], previous["date"], previous["start_time"],
+                                     previous["end_time"], previous["status"]))
+    return {key: minutes for key, minutes in change.items() if minutes}
+
+
+@contextmanager
+def deferred():
+    """
+    Collect apply() calls made inside the block and apply their sum at the
+    end, e.g. around bulk updates of many bookings.
+    """
+    if getattr(_deferred, "changes", None) is not None:
+        yield
+        return
+    _deferred.changes = Counter()
+    try:
+        yield
+        changes = _deferred.changes
+    finally:
+        _deferred.changes = None
+    apply(changes)
+
+
+def apply(changes):
+    """
+    Add {(room id, date, hour, status): minutes} to the rollups: one locking
+    read of the touched buckets, then one bulk update, insert and delete.
+    """
+    pending = getattr(_deferred, "changes", None)
+    if pending is not None:
+        pending.update(changes)
+        return
+    changes = {key: minutes for key, minutes in changes.items() if minutes}
+    if not changes:
+        return
+    with transaction.atomic():
+        candidates = RoomUsageRollup.objects.select_for_update().filter(
+            room_id__in={key[0] for key in changes},
+            date__in={key[1] for key in changes},
+            hour__in={key[2] for key in changes},
+            status__in={key[3] for key in changes},
+        )
+        existing = {
+            (row.room_id, row.date, row.hour, row.status): row
+            for row in candidates
+        }
+        kept, emptied, created = [], [], {}
+        for key, minutes in changes.items():
+            row = existing.get(key)
+            if row is None:
+                if minutes > 0:
+                    created[key] = minutes
+                continue
+            row.minutes = max(0, row.minutes + minutes)
+            (kept if row.minutes else emptied).append(row)
+
+        RoomUsageRollup.objects.bulk_update(kept, ["minutes"])
+        RoomUsageRollup.objects.filter(pk__in=[row.pk for row in emptied]).delete()
+        try:
+            with transaction.atomic():
+                RoomUsageRollup.objects.bulk_create([
+                    RoomUsageRollup(room_id=room_id, date=day, hour=hour, status=status, minutes=minutes)
+                    for (room_id, day, hour, status), minutes in created.items()
+                ])
+        except IntegrityError:
+            # Some bucket was created concurrently; it exists now, so this
+            # round updates it instead.
+            apply(created)
+
+
+def rebuild(batch_size=1000):
+    """
+    Recompute every rollup from the bookings and the booking archive, which
+    keeps the history of archived dates. Returns the number of buckets
+    written.
+    """
+    totals = Counter()
+    columns = ("room_id", "date", "start_time", "end_time", "status")
+    # A row copied to the archive but not yet deleted counts once.
+    archived = BookingArchive.objects.exclude(pk__in=Booking.objects.values("pk"))
+    for rows in (Booking.objects.values_list(*columns), archived.values_list(*columns)):
+        for row in rows.iterator(chunk_size=batch_size):
+            totals.update(contribution(*row))
+    with transaction.atomic():
+        RoomUsageRollup.objects.all().delete()
+        RoomUsageRollup.objects.bulk_create(
+            [
+                RoomUsageRollup(room_id=room_id, date=day, hour=hour, status=status, minutes=minutes)
+                for (room_id, day, hour, status), minutes in totals.items()
+                if minutes
+            ],
+            batch_size=batch_size,
+        )
+    return len(totals)
+
+
+def usage(date_from, date_to, group_by, statuses, rooms=None, buildings=None):
+    """
+    Booked minutes between date_from and date_to summed per combination of
+    the `group_by` dimensions, read from the rollups only.
+    """
+    rollups = RoomUsageRollup.objects.filter(date__range=(date_from, date_to), status__in=statuses)
+    if rooms:
+        rollups = rollups.filter(room_id__in=rooms)
+    if buildings:
+        rollups = rollups.filter(room__building_id__in=buildings)
+    if "weekday" in group_by:
+        rollups = rollups.annotate(weekday=ExtractIsoWeekDay("date"))
+    columns = [DIMENSIONS[name] for name in group_by]
+    rows = rollups.values(*columns).annotate(total=Sum("minutes")).order_by(*columns)
+    return [
+        {**{name: row[column] for name, column in zip(group_by, columns)}, "minutes": row["total"]}
+        for row in rows
+    ]
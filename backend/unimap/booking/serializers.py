@@ -1,12 +1,14 @@
-from rest_framework.serializers import ModelSerializer, ValidationError
+from rest_framework.serializers import BooleanField, ModelSerializer, ValidationError
 from .models import *
+from uni.models import Building, Campus, Room
+from .series import MAX_OCCURRENCES, expand
 
 
 class BookingSerializer(ModelSerializer):
     class Meta:
         model = Booking
         fields = '__all__'
-        read_only_fields = ['id', 'user', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'user', 'series', 'created_at', 'updated_at']
 
 
     def update(self, instance, validated_data):
@@ -17,7 +19,7 @@ class BookingSerializer(ModelSerializer):
         if old_status != Booking.STATUS_PENDING:
             raise ValidationError({"message": "You cannot change the status of this booking."})
 
-        IMMUTABLE_FIELDS = ['purpose', 'room', 'start_time', 'end_time', 'date']
+        IMMUTABLE_FIELDS = ['purpose', 'room', 'start_time', 'end_time', 'date', 'series']
         for field in IMMUTABLE_FIELDS:
             if field in validated_data:
                 old_val = getattr(instance, field)
@@ -30,4 +32,103 @@ class BookingSerializer(ModelSerializer):
 
 
         return super().update(instance, validated_data)
-    
\ No newline at end of file
+
+
+class BookingCampusSerializer(ModelSerializer):
+    class Meta:
+        model = Campus
+        fields = ['id', 'name']
+
+
+class BookingBuildingSerializer(ModelSerializer):
+    campus = BookingCampusSerializer(read_only=True)
+
+    class Meta:
+        model = Building
+        fields = ['id', 'name', 'campus']
+
+
+class BookingRoomSerializer(ModelSerializer):
+    building = BookingBuildingSerializer(read_only=True)
+
+    class Meta:
+        model = Room
+        fields = ['id', 'name', 'type', 'building']
+
+
+class ExpandedBookingSerializer(BookingSerializer):
+    """
+    A booking with its room, building and campus nested, for ?expand=room.
+    The view must select_related("room__building__campus").
+    """
+    room = BookingRoomSerializer(read_only=True)
+
+
+class BookingArchiveSerializer(ModelSerializer):
+    class Meta:
+        model = BookingArchive
+        fields = '__all__'
+
+
+class ExpandedBookingArchiveSerializer(BookingArchiveSerializer):
+    room = BookingRoomSerializer(read_only=True)
+
+
+class OccurrenceSerializer(ModelSerializer):
+    class Meta:
+        model = Booking
+        fields = ['id', 'date', 'status']
+
+
+class BookingSeriesSerializer(ModelSerializer):
+    bookings = OccurrenceSerializer(many=True, read_only=True)
+    # Create the occurrences that don't conflict instead of failing.
+    skip_conflicts = BooleanField(write_only=True, required=False, default=False)
+
+    class Meta:
+        model = BookingSeries
+        fields = '__all__'
+        read_only_fields = ['id', 'user', 'created_at']
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        data['bookings'] = sorted(data['bookings'], key=lambda booking: booking['date'])
+        return data
+
+    def validate(self, attrs):
+        if attrs['end_time'] <= attrs['start_time']:
+            raise ValidationError({"end_time": "Must be after start_time."})
+
+        rule = attrs.get('rule', BookingSeries.RULE_WEEKLY)
+        if rule == BookingSeries.RULE_WEEKLY:
+            if not attrs.get('first_date') or not attrs.get('last_date'):
+                raise ValidationError({"first_date": "Weekly series need first_date and last_date."})
+            if attrs['last_date'] < attrs['first_date']:
+                raise ValidationError({"last_date": "Must not be before first_date."})
+            if attrs.get('interval', 1) < 1:
+                raise ValidationError({"interval": "Must be at least 1."})
+        elif not attrs.get('dates'):
+            raise ValidationError({"dates": "Custom series need at least one date."})
+
+        try:
+            occurrences = expand(rule, attrs.get('interval', 1), attrs.get('first_date'),
+                                 attrs.get('last_date'), attrs.get('dates', ()))
+        except (TypeError, ValueError):
+            raise ValidationError({"dates": "Must be a list of YYYY-MM-DD dates."})
+        if len(occurrences) > MAX_OCCURRENCES:
+            raise ValidationError({"message": f"A series can have at most {MAX_OCCURRENCES} occurrences."})
+        if rule == BookingSeries.RULE_CUSTOM:
+            attrs['dates'] = [day.isoformat() for day in occurrences]
+        return attrs
+
+
+class WaitlistEntrySerializer(ModelSerializer):
+    class Meta:
+        model = WaitlistEntry
+        fields = '__all__'
+        read_only_fields = ['id', 'user', 'status', 'booking', 'created_at']
+
+    def validate(self, attrs):
+        if attrs['end_time'] <= attrs['start_time']:
+            raise ValidationError({"end_time": "Must be after start_time."})
+        return attrs
@@ -0,0 +1,118 @@
+# booking/series.py
+from datetime import date, timedelta
+
+from django.db.models import Q
+from rest_framework.serializers import ValidationError
+
+from .admission import slot_lock
+from .models import Booking, BookingSeries
+from .signals import bulk_created
+
+MAX_OCCURRENCES = 60
+
+
+def expand(rule, interval=1, first_date=None, last_date=None, dates=()):
+    """
+    The sorted occurrence dates of a series rule. Custom dates may be date
+    objects or ISO strings.
+    """
+    if rule == BookingSeries.RULE_CUSTOM:
+        return sorted({date.fromisoformat(str(day)) for day in dates})
+    step = timedelta(weeks=interval)
+    occurrences = []
+    day = first_date
+    # Stop one past the limit: enough for validation to reject the rule.
+    while day <= last_date and len(occurrences) <= MAX_OCCURRENCES:
+        occurrences.append(day)
+        day += step
+    return occurrences
+
+
+def find_conflicts(room_id, user_id, dates, start, end, exclude_series=None):
+    """
+    Existing bookings that block an occurrence, found with one query over
+    all `dates`: approved bookings of the room overlapping the time, active
+    bookings of the room for the exact slot, and the user's own active
+    bookings overlapping the time.
+    """
+    blocking = Q(room_id=room_id, status=Booking.STATUS_APPROVED) | Q(
+        room_id=room_id, status__in=Booking.ACTIVE_STATUSES, start_time=start, end_time=end
+    )
+    if user_id is not None:
+        blocking |= Q(user_id=user_id, status__in=Booking.ACTIVE_STATUSES)
+    bookings = Booking.objects.filter(blocking, date__in=dates, start_time__lt=end, end_time__gt=start)
+    if exclude_series is not None:
+        bookings = bookings.exclude(series=exclude_series)
+    return _report(bookings, room_id)
+
+
+def _report(bookings, room_id):
+    return [
+        {"date": day, "booking": pk, "reason": "room" if booking_room_id == room_id else "user"}
+        for pk, day, booking_room_id in bookings.order_by("date", "start_time").values_list("pk", "date", "room_id")
+    ]
+
+
+def create_series(serializer, user, skip_conflicts=False):
+    """
+    Save the series from `serializer` and bulk-create its occurrences in
+    one transaction. Returns (series, conflicts); series is None if an
+    occurrence conflicts, unless `skip_conflicts`, in which case the
+    conflicting occurrences are left out.
+    """
+    data = serializer.validated_data
+    room, start, end = data["room"], data["start_time"], data["end_time"]
+    dates = expand(data.get("rule", BookingSeries.RULE_WEEKLY), data.get("interval", 1),
+                   data.get("first_date"), data.get("last_date"), data.get("dates", ()))
+
+    with slot_lock(room.pk, dates, user.pk):
+        conflicts = find_conflicts(room.pk, user.pk, dates, start, end)
+        blocked = {conflict["date"] for conflict in conflicts}
+        free = [day for day in dates if day not in blocked]
+        if (conflicts and not skip_conflicts) or not free:
+            return None, conflicts
+
+        series = serializer.save(user=user)
+        bookings = Booking.objects.bulk_create([
+            Booking(room=room, user=user, date=day, start_time=start, end_time=end,
+                    purpose=series.purpose, series=series)
+            for day in free
+        ])
+        bulk_created(bookings)
+    return series, conflicts
+
+
+def set_series_status(series, status):
+    """
+    Approve or reject every pending occurrence of `series` at once. Approval
+    is all or nothing: if any occurrence overlaps an approved booking,
+    nothing changes and the conflicts are returned.
+    """
+    pending = list(series.bookings.filter(status=Booking.STATUS_PENDING).order_by("date"))
+    if not pending:
+        raise ValidationError({"message": "This series has no pending bookings."})
+
+    dates = [booking.date for booking in pending]
+    with slot_lock(series.room_id, dates):
+        # Read again under the lock: occurrences may have been decided or
+        # cancelled since the read above.
+        pending = list(series.bookings.select_for_update()
+                       .filter(status=Booking.STATUS_PENDING, room_id=series.room_id, date__in=dates)
+                       .order_by("date"))
+        if not pending:
+            raise ValidationError({"message": "This series has no pending bookings."})
+        if status == Booking.STATUS_APPROVED:
+            approved = Booking.objects.filter(
+                room_id=series.room_id,
+                status=Booking.STATUS_APPROVED,
+                date__in=dates,
+                start_time__lt=series.end_time,
+                end_time__gt=series.start_time,
+            ).exclude(series=series)
+            conflicts = _report(approved, series.room_id)
+            if conflicts:
+                return conflicts
+        for booking in pending:
+            booking.status = status
+            booking.save(update_fields=["status", "updated_at"])
+    return []
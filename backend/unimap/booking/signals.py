@@ -0,0 +1,140 @@
+# booking/signals.py
+import threading
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import Signal
+
+from .models import Booking
+from unimap.tasks import run_after_commit
+from . import availability, occupancy, push, rollups, waitlist
+
+# Sent after a booking is created, deleted, or saved with a different
+# status, room, date or time. Arguments: booking, previous (the tracked
+# field values as loaded, or None for a new booking), created, deleted.
+booking_changed = Signal()
+
+TRACKED_FIELDS = ("status", "room_id", "date", "start_time", "end_time")
+
+_suppressed = threading.local()
+
+
+@contextmanager
+def suppress_booking_signals():
+    """
+    Don't send booking_changed for saves and deletes inside the block, e.g.
+    when archiving: the history stays in the rollups and frees no slot.
+    """
+    depth = getattr(_suppressed, "depth", 0)
+    _suppressed.depth = depth + 1
+    try:
+        yield
+    finally:
+        _suppressed.depth = depth
+
+
+def _is_suppressed():
+    return getattr(_suppressed, "depth", 0) > 0
+
+
+def _tracked(instance):
+    return {field: getattr(instance, field) for field in TRACKED_FIELDS}
+
+
+def booking_loaded(sender, instance, **kwargs):
+    # Model.from_db() only clears _state.adding after post_init, so rows
+    # loaded from the database are told apart by their pk. Rows loaded
+    # without some tracked field (.only()/.defer()) aren't tracked.
+    loaded = instance.pk is not None and all(field in instance.__dict__ for field in TRACKED_FIELDS)
+    instance._loaded_values = _tracked(instance) if loaded else None
+
+
+def booking_saved(sender, instance, created, **kwargs):
+    if _is_suppressed():
+        return
+    previous = getattr(instance, "_loaded_values", None)
+    current = _tracked(instance)
+    instance._loaded_values = current
+    if created or previous != current:
+        booking_changed.send(sender=Booking, booking=instance, previous=previous, created=created, deleted=False)
+
+
+def booking_deleted(sender, instance, **kwargs):
+    if _is_suppressed():
+        return
+    previous = getattr(instance, "_loaded_values", None)
+    booking_changed.send(sender=Booking, booking=instance, previous=previous, created=False, deleted=True)
+
+
+def _affected_days(booking, previous):
+    days = {(booking.room_id, booking.date)}
+    if previous is not None:
+        days.add((previous["room_id"], previous["date"]))
+    return days
+
+
+def bulk_created(bookings):
+    """
+    Send booking_changed for bookings inserted with bulk_create, which
+    skips post_save.
+    """
+    with occupancy.deferred(), rollups.deferred():
+        for booking in bookings:
+            booking._loaded_values = _tracked(booking)
+            booking_changed.send(sender=Booking, booking=booking, previous=None, created=True, deleted=False)
+
+
+def bulk_updated(bookings):
+    """
+    Send booking_changed for bookings saved with bulk_update, which skips
+    post_save, comparing against the values they were loaded with.
+    """
+    with occupancy.deferred(), rollups.deferred():
+        for booking in bookings:
+            booking_saved(Booking, booking, created=False)
+
+
+def invalidate_availability(sender, booking, previous, **kwargs):
+    days = _affected_days(booking, previous)
+    # Now, and again on commit so nothing cached while the transaction
+    # was open survives it.
+    availability.invalidate(days)
+    transaction.on_commit(lambda: availability.invalidate(days))
+
+
+def update_occupancy(sender, booking, previous, **kwargs):
+    # Only approved bookings occupy slots.
+    was_approved = previous is not None and previous["status"] == Booking.STATUS_APPROVED
+    if booking.status == Booking.STATUS_APPROVED or was_approved:
+        occupancy.recompute(_affected_days(booking, previous))
+
+
+def update_rollups(sender, booking, previous, deleted, **kwargs):
+    rollups.apply(rollups.delta(booking, previous, deleted))
+
+
+def promote_waitlist(sender, booking, previous, deleted, **kwargs):
+    # A booking that held its slot gave it up: let waiters have it.
+    if previous is None or previous["status"] not in Booking.ACTIVE_STATUSES:
+        return
+    moved = any(previous[field] != getattr(booking, field) for field in ("room_id", "date", "start_time", "end_time"))
+    if deleted or moved or booking.status not in Booking.ACTIVE_STATUSES:
+        transaction.on_commit(lambda: waitlist.schedule(previous["room_id"], previous["date"]))
+
+
+def push_availability(sender, booking, previous, **kwargs):
+    # Like occupancy, availability only follows approved bookings.
+    was_approved = previous is not None and previous["status"] == Booking.STATUS_APPROVED
+    if booking.status == Booking.STATUS_APPROVED or was_approved:
+        run_after_commit(push.publish_availability, _affected_days(booking, previous))
+
+
+post_init.connect(booking_loaded, sender=Booking, dispatch_uid="booking-loaded")
+post_save.connect(booking_saved, sender=Booking, dispatch_uid="booking-saved")
+post_delete.connect(booking_deleted, sender=Booking, dispatch_uid="booking-deleted")
+booking_changed.connect(invalidate_availability, sender=Booking, dispatch_uid="booking-availability")
+booking_changed.connect(update_occupancy, sender=Booking, dispatch_uid="booking-occupancy")
+booking_changed.connect(update_rollups, sender=Booking, dispatch_uid="booking-rollups")
+booking_changed.connect(promote_waitlist, sender=Booking, dispatch_uid="booking-waitlist")
+booking_changed.connect(push_availability, sender=Booking, dispatch_uid="booking-push")
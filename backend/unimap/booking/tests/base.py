@@ -0,0 +1,13 @@
+from uni.models import Campus, Building, Room
+
+
+def make_campus(name="Main Campus"):
+    return Campus.objects.create(name=name, address="Some Addr", maps_url="http://maps")
+
+
+def make_building(campus=None, name="Main Building"):
+    return Building.objects.create(name=name, campus=campus or make_campus(), address="B Addr", maps_url="http://maps")
+
+
+def make_room(building=None, name="R101", type="seminar room"):
+    return Room.objects.create(name=name, type=type, building=building or make_building())
@@ -0,0 +1,111 @@
+import threading
+from datetime import date, time
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient, APITestCase
+from rest_framework import status
+
+from booking.models import Booking
+from booking.tests.base import make_room
+
+User = get_user_model()
+
+
+class AdmissionTests(APITestCase):
+    def setUp(self):
+        self.room = make_room()
+        self.user = User.objects.create_user(username="student", email="stu@example.com", password="pass")
+        self.other = User.objects.create_user(username="other", email="other@example.com", password="pass")
+        self.client.force_authenticate(self.user)
+        self.url = reverse("booking-list")
+
+    def post(self, day="2025-01-06", start="10:00", end="11:00", room=None):
+        return self.client.post(self.url, {
+            "room": (room or self.room).id, "date": day, "start_time": start, "end_time": end,
+        }, format="json")
+
+    def test_conflicts_are_scoped_to_the_date(self):
+        Booking.objects.create(room=self.room, user=self.other, date=date(2025, 1, 6),
+                               start_time=time(10), end_time=time(11), status=Booking.STATUS_APPROVED)
+        self.assertEqual(self.post().status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.post(day="2025-01-07").status_code, status.HTTP_201_CREATED)
+        # Same user, same time, another day and room.
+        other_room = make_room(self.room.building, "R102", "laboratory")
+        self.assertEqual(self.post(day="2025-01-08", room=other_room).status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.post(day="2025-01-07", start="10:30", end="11:30", room=other_room).status_code,
+                         status.HTTP_400_BAD_REQUEST)
+
+    def test_released_slots_can_be_booked_again(self):
+        Booking.objects.create(room=self.room, user=self.user, date=date(2025, 1, 6),
+                               start_time=time(10), end_time=time(11), status=Booking.STATUS_CANCELLED)
+        self.assertEqual(self.post().status_code, status.HTTP_201_CREATED)
+        self.client.force_authenticate(self.other)
+        self.assertEqual(self.post().status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_end_must_follow_start(self):
+        self.assertEqual(self.post(start="11:00", end="10:00").status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_admin_cannot_approve_into_a_conflict(self):
+        admin = User.objects.create_superuser(username="admin", email="admin@example.com", password="pass")
+        Booking.objects.create(room=self.room, user=self.other, date=date(2025, 1, 6),
+                               start_time=time(10), end_time=time(11), status=Booking.STATUS_APPROVED)
+        pending = Booking.objects.create(room=self.room, user=self.user, date=date(2025, 1, 6),
+                                         start_time=time(10, 30), end_time=time(11, 30))
+        self.client.force_authenticate(admin)
+        res = self.client.patch(reverse("admin-booking-detail", args=[pending.id]),
+                                {"status": Booking.STATUS_APPROVED}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+# These tests commit, so keep catalog changes from scheduling snapshot builds.
+@override_settings(UNI_CATALOG_SNAPSHOTS=False)
+class ConcurrentAdmissionTests(TransactionTestCase):
+    workers = 8
+
+    def setUp(self):
+        self.room = make_room()
+        self.users = [
+            User.objects.create_user(username=f"user{i}", email=f"user{i}@example.com", password="pass")
+            for i in range(self.workers)
+        ]
+
+    def race(self, requests):
+        barrier = threading.Barrier(len(requests))
+        results = []
+
+        def run(user, payload):
+            client = APIClient()
+            client.force_authenticate(user)
+            barrier.wait()
+            try:
+                results.append(client.post(reverse("booking-list"), payload, format="json").status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=run, args=request) for request in requests]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def payload(self, start="10:00", end="11:00", room=None):
+        return {"room": (room or self.room).id, "date": "2025-01-06", "start_time": start, "end_time": end}
+
+    def test_parallel_requests_for_the_same_slot(self):
+        results = self.race([(user, self.payload()) for user in self.users])
+        self.assertEqual(sorted(results), [201] + [400] * (self.workers - 1))
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_parallel_overlapping_requests_by_one_user(self):
+        user = self.users[0]
+        rooms = [self.room] + [
+            make_room(self.room.building, f"R2{i}", "laboratory")
+            for i in range(self.workers - 1)
+        ]
+        results = self.race([(user, self.payload(f"10:{i:02d}", "11:00", room)) for i, room in enumerate(rooms)])
+        self.assertEqual(sorted(results), [201] + [400] * (self.workers - 1))
+        self.assertEqual(Booking.objects.filter(user=user).count(), 1)
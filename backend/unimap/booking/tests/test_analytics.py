@@ -0,0 +1,121 @@
+import io
+from datetime import date, time
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from booking.models import Booking, RoomUsageRollup
+from booking.rollups import hour_minutes
+from booking.signals import bulk_updated
+from booking.tests.base import make_building, make_campus, make_room
+
+User = get_user_model()
+
+
+class RoomUsageRollupTests(APITestCase):
+    monday = date(2025, 1, 6)
+    tuesday = date(2025, 1, 7)
+
+    def setUp(self):
+        campus = make_campus()
+        self.building = make_building(campus)
+        self.r1 = make_room(self.building)
+        self.r2 = make_room(make_building(campus, "Annex"), "A1")
+        self.user = User.objects.create_user(username="student", email="stu@example.com", password="pass")
+        admin = User.objects.create_superuser(username="admin", email="admin@example.com", password="pass")
+        self.client.force_authenticate(admin)
+        self.url = reverse("admin-analytics")
+
+    def book(self, room, day, start, end, status=Booking.STATUS_APPROVED):
+        return Booking.objects.create(room=room, user=self.user, date=day,
+                                      start_time=time(*start), end_time=time(*end), status=status)
+
+    def rollups(self):
+        return {
+            (row.room_id, row.date, row.hour, row.status): row.minutes
+            for row in RoomUsageRollup.objects.all()
+        }
+
+    def analytics(self, **params):
+        res = self.client.get(self.url, {"date_from": self.monday.isoformat(),
+                                         "date_to": self.tuesday.isoformat(), **params})
+        self.assertEqual(res.status_code, status.HTTP_200_OK, res.data)
+        return res.data["results"]
+
+    def test_hour_minutes(self):
+        self.assertEqual(hour_minutes(9 * 60 + 30, 11 * 60 + 15), {9: 30, 10: 60, 11: 15})
+        self.assertEqual(hour_minutes(60, 120), {1: 60})
+
+    def test_rollups_follow_status_transitions(self):
+        booking = self.book(self.r1, self.monday, (9, 30), (10, 30), status=Booking.STATUS_PENDING)
+        self.assertEqual(self.rollups(), {
+            (self.r1.id, self.monday, 9, "pending"): 30,
+            (self.r1.id, self.monday, 10, "pending"): 30,
+        })
+
+        booking.status = Booking.STATUS_APPROVED
+        booking.save()
+        self.assertEqual(self.rollups(), {
+            (self.r1.id, self.monday, 9, "approved"): 30,
+            (self.r1.id, self.monday, 10, "approved"): 30,
+        })
+
+        self.book(self.r1, self.monday, (10, 30), (11, 0))
+        self.assertEqual(self.rollups()[(self.r1.id, self.monday, 10, "approved")], 60)
+
+        booking.delete()
+        self.assertEqual(self.rollups(), {(self.r1.id, self.monday, 10, "approved"): 30})
+
+    def test_bulk_updates_are_rolled_up(self):
+        bookings = [self.book(self.r1, self.monday, (h, 0), (h + 1, 0), status=Booking.STATUS_PENDING)
+                    for h in (8, 9)]
+        for booking in bookings:
+            booking.status = Booking.STATUS_REJECTED
+        Booking.objects.bulk_update(bookings, ["status"])
+        bulk_updated(bookings)
+        self.assertEqual(set(self.rollups().values()), {60})
+        self.assertEqual({key[3] for key in self.rollups()}, {"rejected"})
+
+    def test_rebuild_command_matches_incremental_rollups(self):
+        self.book(self.r1, self.monday, (9, 0), (10, 45))
+        self.book(self.r2, self.tuesday, (14, 0), (15, 0), status=Booking.STATUS_CANCELLED)
+        expected = self.rollups()
+        RoomUsageRollup.objects.all().delete()
+
+        out = io.StringIO()
+        call_command("rebuild_rollups", stdout=out)
+        self.assertIn("Rebuilt 3 rollup bucket(s)", out.getvalue())
+        self.assertEqual(self.rollups(), expected)
+
+    def test_analytics_groups_read_only_rollups(self):
+        self.book(self.r1, self.monday, (9, 0), (11, 0))
+        self.book(self.r2, self.monday, (9, 30), (10, 0))
+        self.book(self.r2, self.tuesday, (9, 0), (10, 0))
+        self.book(self.r2, self.tuesday, (12, 0), (13, 0), status=Booking.STATUS_PENDING)
+
+        self.assertEqual(self.analytics(), [
+            {"room": self.r1.id, "minutes": 120},
+            {"room": self.r2.id, "minutes": 90},
+        ])
+        self.assertEqual(self.analytics(group_by="weekday,hour", buildings=str(self.r2.building_id)), [
+            {"weekday": 1, "hour": 9, "minutes": 30},
+            {"weekday": 2, "hour": 9, "minutes": 60},
+        ])
+        self.assertEqual(self.analytics(group_by="building,status", status="approved,pending"), [
+            {"building": self.building.id, "status": "approved", "minutes": 120},
+            {"building": self.r2.building_id, "status": "approved", "minutes": 90},
+            {"building": self.r2.building_id, "status": "pending", "minutes": 60},
+        ])
+
+        with self.assertNumQueries(1):
+            self.analytics(group_by="date,hour")
+
+    def test_invalid_parameters(self):
+        for params in ({"group_by": "floor"}, {"status": "maybe"}, {"rooms": "a"}):
+            res = self.client.get(self.url, {"date_from": self.monday.isoformat(), **params})
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        res = self.client.get(self.url)
+        self.assertIn("date_from", res.data)
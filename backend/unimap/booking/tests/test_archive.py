@@ -0,0 +1,108 @@
+import io
+from datetime import time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from booking.archive import archive, horizon
+from booking.models import Booking, BookingArchive, RoomUsageRollup
+from booking.tests.base import make_room
+
+User = get_user_model()
+
+
+@override_settings(BOOKING_ARCHIVE_AFTER_DAYS=30)
+class BookingArchiveTests(APITestCase):
+
+    def setUp(self):
+        self.room = make_room()
+        self.user = User.objects.create_user(username="student", email="stu@example.com", password="pass")
+        self.other = User.objects.create_user(username="other", email="other@example.com", password="pass")
+        self.today = timezone.localdate()
+
+    def book(self, days_ago, user=None, status=Booking.STATUS_APPROVED, hour=9):
+        return Booking.objects.create(room=self.room, user=user or self.user,
+                                      date=self.today - timedelta(days=days_ago),
+                                      start_time=time(hour), end_time=time(hour + 1), status=status)
+
+    def test_old_bookings_move_in_resumable_batches(self):
+        old = [self.book(40 + i) for i in range(5)]
+        recent = self.book(10)
+        rollups = list(RoomUsageRollup.objects.values_list("date", "minutes"))
+
+        self.assertEqual(horizon(), self.today - timedelta(days=30))
+        self.assertEqual(archive(horizon(), batch_size=2, max_batches=1), 2)
+        self.assertEqual(BookingArchive.objects.count(), 2)
+        self.assertEqual(archive(horizon(), batch_size=2), 3)
+
+        self.assertEqual(list(Booking.objects.all()), [recent])
+        archived = BookingArchive.objects.get(pk=old[0].pk)
+        self.assertEqual((archived.date, archived.status, archived.created_at),
+                         (old[0].date, old[0].status, old[0].created_at))
+        # Archiving is not a cancellation: the history stays in the rollups.
+        self.assertEqual(list(RoomUsageRollup.objects.values_list("date", "minutes")), rollups)
+
+    def test_rebuilt_rollups_keep_archived_dates(self):
+        old = self.book(40)
+        self.book(40, user=self.other, status=Booking.STATUS_CANCELLED, hour=11)
+        recent = self.book(10)
+        archive(horizon())
+        # A copy of a still-live booking is counted once.
+        BookingArchive.objects.create(id=recent.pk, room=self.room, user=self.user, date=recent.date,
+                                      start_time=recent.start_time, end_time=recent.end_time,
+                                      status=recent.status, created_at=recent.created_at,
+                                      updated_at=recent.updated_at)
+        rollups = set(RoomUsageRollup.objects.values_list("date", "hour", "status", "minutes"))
+
+        call_command("rebuild_rollups", stdout=io.StringIO())
+        self.assertEqual(set(RoomUsageRollup.objects.values_list("date", "hour", "status", "minutes")), rollups)
+
+        self.client.force_authenticate(User.objects.create_superuser(username="admin", email="admin@example.com",
+                                                                     password="pass"))
+        res = self.client.get(reverse("admin-analytics"), {"date_from": old.date.isoformat(), "group_by": "status",
+                                                          "status": "approved,cancelled"})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["results"], [
+            {"status": Booking.STATUS_APPROVED, "minutes": 60},
+            {"status": Booking.STATUS_CANCELLED, "minutes": 60},
+        ])
+
+    def test_archiving_again_after_an_interrupted_copy(self):
+        booking = self.book(40)
+        BookingArchive.objects.create(id=booking.pk, room=self.room, user=self.user, date=booking.date,
+                                      start_time=booking.start_time, end_time=booking.end_time,
+                                      status=booking.status, created_at=booking.created_at,
+                                      updated_at=booking.updated_at)
+        self.assertEqual(archive(horizon()), 1)
+        self.assertFalse(Booking.objects.exists())
+        self.assertEqual(BookingArchive.objects.count(), 1)
+
+    def test_command(self):
+        self.book(40)
+        self.book(20)
+        out = io.StringIO()
+        call_command("archive_bookings", "--days", "15", stdout=out)
+        self.assertIn("Archived 2 booking(s)", out.getvalue())
+
+    def test_history_api(self):
+        mine = self.book(40, status=Booking.STATUS_CANCELLED)
+        theirs = self.book(41, user=self.other, hour=11)
+        archive(horizon())
+
+        self.client.force_authenticate(self.user)
+        res = self.client.get(reverse("history-list"), {"expand": "room"})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([booking["id"] for booking in res.data], [mine.pk])
+        self.assertEqual(res.data[0]["room"]["name"], "R101")
+        res = self.client.get(reverse("history-detail", args=[theirs.pk]))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+        admin = User.objects.create_superuser(username="admin", email="admin@example.com", password="pass")
+        self.client.force_authenticate(admin)
+        res = self.client.get(reverse("admin-history-list"), {"status": "approved", "limit": 10})
+        self.assertEqual([booking["id"] for booking in res.data["results"]], [theirs.pk])
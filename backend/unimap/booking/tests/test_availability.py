@@ -0,0 +1,103 @@
+from datetime import date, time
+from unittest.mock import patch
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from booking import availability
+from booking.models import Booking
+from booking.tests.base import make_room
+
+User = get_user_model()
+
+
+class AvailabilityViewTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.room = make_room()
+        self.other_room = make_room(self.room.building, "R102", "laboratory")
+        self.user = User.objects.create_user(username="student", email="stu@example.com", password="pass")
+        self.client.force_authenticate(self.user)
+        self.url = reverse("availability")
+
+    def book(self, room, day, start, end, status=Booking.STATUS_APPROVED):
+        return Booking.objects.create(
+            room=room, user=self.user, date=day, start_time=time(*start), end_time=time(*end), status=status
+        )
+
+    def get(self, rooms, date_from="2025-01-06", date_to=None):
+        params = {"rooms": ",".join(str(room.id) for room in rooms), "date_from": date_from}
+        if date_to:
+            params["date_to"] = date_to
+        return self.client.get(self.url, params)
+
+    def test_busy_and_free_intervals(self):
+        day = date(2025, 1, 6)
+        self.book(self.room, day, (10, 0), (11, 0))
+        self.book(self.room, day, (10, 30), (12, 0))
+        self.book(self.room, day, (12, 0), (13, 0))
+        self.book(self.room, day, (15, 0), (16, 0), status=Booking.STATUS_PENDING)
+
+        res = self.get([self.room, self.other_room], date_to="2025-01-07")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        first, second = res.data["rooms"]
+        self.assertEqual(first["days"][0]["busy"], [["10:00", "13:00"]])
+        self.assertEqual(first["days"][0]["free"], [["00:00", "10:00"], ["13:00", "24:00"]])
+        self.assertEqual(first["days"][1]["busy"], [])
+        self.assertEqual(second["days"][0]["free"], [["00:00", "24:00"]])
+
+    def test_invalidation_during_load_is_not_lost(self):
+        day = date(2025, 1, 6)
+        real_cache = availability._cache()
+        case = self
+
+        class RacingCache:
+            # Another request approves a booking after this one has queried
+            # the database but before it caches what it read.
+            def __getattr__(self, name):
+                return getattr(real_cache, name)
+
+            def set_many(self, *args, **kwargs):
+                case.book(case.room, day, (9, 0), (10, 0))
+                return real_cache.set_many(*args, **kwargs)
+
+        with patch.object(availability, "_cache", RacingCache):
+            self.assertEqual(availability.busy_intervals([self.room.id], day, day)[(self.room.id, day)], [])
+        self.assertEqual(availability.busy_intervals([self.room.id], day, day)[(self.room.id, day)], [(540, 600)])
+
+    def test_cached_until_status_changes(self):
+        booking = self.book(self.room, date(2025, 1, 6), (9, 0), (10, 0), status=Booking.STATUS_PENDING)
+        self.get([self.room])
+        with self.assertNumQueries(1):  # only the room check
+            self.assertEqual(self.get([self.room]).data["rooms"][0]["days"][0]["busy"], [])
+
+        booking.status = Booking.STATUS_APPROVED
+        booking.save()
+        self.assertEqual(self.get([self.room]).data["rooms"][0]["days"][0]["busy"], [["09:00", "10:00"]])
+
+        booking.delete()
+        self.assertEqual(self.get([self.room]).data["rooms"][0]["days"][0]["busy"], [])
+
+    def test_invalid_params(self):
+        self.assertEqual(self.client.get(self.url, {"date_from": "2025-01-06"}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.get([self.room], date_from="2025-02-30").status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.get([self.room], date_to="2025-01-01").status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.get([self.room], date_to="2025-03-01").status_code, status.HTTP_400_BAD_REQUEST)
+        res = self.client.get(self.url, {"rooms": "999999", "date_from": "2025-01-06"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class AvailabilityCacheCheckTests(SimpleTestCase):
+    @override_settings(DEBUG=False, BOOKING_AVAILABILITY_CACHE="busy", CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": "redis://localhost:6379/0"},
+        "busy": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    })
+    def test_refuses_a_local_availability_cache_without_debug(self):
+        with self.assertRaises(ImproperlyConfigured):
+            apps.get_app_config("booking").ready()
@@ -0,0 +1,103 @@
+from datetime import date, time, timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from booking import batch
+from booking.models import Booking, RoomOccupancy
+from booking.tests.base import make_room
+
+User = get_user_model()
+
+
+class AdminBookingBatchTests(APITestCase):
+    day = date(2025, 1, 6)
+
+    def setUp(self):
+        self.room = make_room()
+        self.users = [User.objects.create_user(username=f"u{i}", email=f"u{i}@example.com", password="pass")
+                      for i in range(3)]
+        admin = User.objects.create_superuser(username="admin", email="admin@example.com", password="pass")
+        self.client.force_authenticate(admin)
+        self.url = reverse("admin-booking-batch")
+
+    def book(self, user, start, end, age=0, **extra):
+        booking = Booking.objects.create(room=self.room, user=user, date=self.day,
+                                         start_time=time(*start), end_time=time(*end), **extra)
+        # Spread created_at so first-come order is explicit.
+        Booking.objects.filter(pk=booking.pk).update(created_at=timezone.now() - timedelta(minutes=age))
+        return booking
+
+    def post(self, items):
+        res = self.client.post(self.url, {"items": items}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data["results"]
+
+    def test_first_come_wins_within_a_batch(self):
+        late = self.book(self.users[0], (10, 0), (11, 0), age=1)
+        early = self.book(self.users[1], (10, 30), (11, 30), age=10)
+        rejected = self.book(self.users[2], (12, 0), (13, 0))
+
+        results = self.post([
+            {"id": late.id, "status": "approved"},
+            {"id": early.id, "status": "approved"},
+            {"id": rejected.id, "status": "rejected"},
+        ])
+        self.assertEqual([r["ok"] for r in results], [False, True, True])
+        self.assertEqual(results[0]["error"], "Room already booked at this time.")
+        late.refresh_from_db()
+        early.refresh_from_db()
+        self.assertEqual((late.status, early.status), (Booking.STATUS_PENDING, Booking.STATUS_APPROVED))
+        # Bulk updates still reach the booking_changed listeners.
+        self.assertTrue(RoomOccupancy.objects.filter(room=self.room, date=self.day).exists())
+
+    def test_status_rules(self):
+        approved = self.book(self.users[0], (8, 0), (9, 0), status=Booking.STATUS_APPROVED)
+        pending = self.book(self.users[1], (8, 30), (9, 30))
+        free = self.book(self.users[2], (14, 0), (15, 0))
+
+        results = self.post([
+            {"id": approved.id, "status": "rejected"},
+            {"id": pending.id, "status": "approved"},
+            {"id": free.id, "status": "cancelled"},
+            {"id": 999999, "status": "approved"},
+            {"id": free.id, "status": "approved"},
+            {"id": free.id, "status": "rejected"},
+        ])
+        self.assertEqual([r["ok"] for r in results], [False, False, False, False, True, False])
+        self.assertEqual(results[5]["error"], "Duplicate id in batch.")
+
+    def test_bookings_decided_before_the_lock_are_left_alone(self):
+        cancelled = self.book(self.users[0], (10, 0), (11, 0))
+        pending = self.book(self.users[1], (12, 0), (13, 0))
+        real_lock = batch.rooms_lock
+
+        def racing_lock(room_days):
+            # The user cancels after the batch read the booking as pending.
+            Booking.objects.filter(pk=cancelled.pk).update(status=Booking.STATUS_CANCELLED)
+            return real_lock(room_days)
+
+        with patch.object(batch, "rooms_lock", racing_lock):
+            results = self.post([{"id": cancelled.id, "status": "approved"}, {"id": pending.id, "status": "approved"}])
+        self.assertEqual([r["ok"] for r in results], [False, True])
+        self.assertEqual(results[0]["error"], "You cannot change the status of this booking.")
+        cancelled.refresh_from_db()
+        self.assertEqual(cancelled.status, Booking.STATUS_CANCELLED)
+
+    def test_query_count_is_flat(self):
+        bookings = [self.book(self.users[i % 3], (8 + i, 0), (9 + i, 0)) for i in range(6)]
+        # Load, room lock, reload under the lock, approved intervals, one
+        # bulk update, then one occupancy recompute for the affected day and
+        # one rollup read and bulk write per kind (pending buckets dropped,
+        # approved added), plus savepoints.
+        with self.assertNumQueries(21):
+            self.post([{"id": b.id, "status": "approved"} for b in bookings])
+        self.assertEqual(Booking.objects.filter(status=Booking.STATUS_APPROVED).count(), 6)
+
+    def test_invalid_payload(self):
+        res = self.client.post(self.url, {"items": "all"}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
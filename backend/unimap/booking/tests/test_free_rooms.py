@@ -0,0 +1,91 @@
+import io
+from datetime import date, time
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from booking.models import Booking, RoomOccupancy
+from booking.occupancy import slot_mask, from_bytes
+from booking.tests.base import make_building, make_campus, make_room
+
+User = get_user_model()
+
+
+class FreeRoomsTests(APITestCase):
+    day = date(2025, 1, 6)
+
+    def setUp(self):
+        campus = make_campus()
+        self.building = make_building(campus)
+        self.r1 = make_room(self.building)
+        self.r2 = make_room(self.building, "R102")
+        self.lab = make_room(self.building, "L1", "laboratory")
+        make_room(make_building(campus, "Annex"), "A1")
+        self.user = User.objects.create_user(username="student", email="stu@example.com", password="pass")
+        self.client.force_authenticate(self.user)
+        self.url = reverse("free-rooms")
+
+    def book(self, room, start, end, status=Booking.STATUS_APPROVED):
+        return Booking.objects.create(room=room, user=self.user, date=self.day,
+                                      start_time=time(*start), end_time=time(*end), status=status)
+
+    def free(self, start, end, **params):
+        res = self.client.get(self.url, {"building": self.building.id, "type": "seminar room",
+                                         "date": self.day.isoformat(), "start": start, "end": end, **params})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [room["name"] for room in res.data["rooms"]]
+
+    def test_slot_mask(self):
+        self.assertEqual(slot_mask(0, 15), 1)
+        self.assertEqual(slot_mask(10 * 60 + 5, 10 * 60 + 50), 0b1111 << 40)
+        self.assertEqual(slot_mask(23 * 60 + 45, 24 * 60), 1 << 95)
+
+    def test_free_rooms_follow_booking_status(self):
+        booking = self.book(self.r1, (10, 0), (11, 0), status=Booking.STATUS_PENDING)
+        self.assertEqual(self.free("10:00", "11:00"), ["R101", "R102"])
+
+        booking.status = Booking.STATUS_APPROVED
+        booking.save()
+        self.assertEqual(self.free("10:30", "11:30"), ["R102"])
+        self.assertEqual(self.free("11:00", "12:00"), ["R101", "R102"])
+        self.assertEqual(self.free("09:00", "10:00"), ["R101", "R102"])
+
+        booking.status = Booking.STATUS_CANCELLED
+        booking.save()
+        self.assertEqual(self.free("10:00", "11:00"), ["R101", "R102"])
+        self.assertFalse(RoomOccupancy.objects.exists())
+
+    def test_query_count(self):
+        self.book(self.r1, (10, 0), (11, 0))
+        self.book(self.r2, (8, 0), (9, 0))
+        with self.assertNumQueries(2):  # candidate rooms, their bitmaps
+            self.client.get(self.url, {"building": self.building.id, "date": self.day.isoformat(),
+                                       "start": "10:00", "end": "11:00"})
+
+    def test_result_is_capped(self):
+        self.assertEqual(self.free("10:00", "11:00", limit=1), ["R101"])
+        res = self.client.get(self.url, {"date": self.day.isoformat(), "start": "10:00", "end": "11:00", "limit": 3})
+        self.assertEqual([room["name"] for room in res.data["rooms"]], ["A1", "L1", "R101"])
+        self.assertTrue(res.data["truncated"])
+        res = self.client.get(self.url, {"date": self.day.isoformat(), "start": "10:00", "end": "11:00"})
+        self.assertEqual(len(res.data["rooms"]), 4)
+        self.assertFalse(res.data["truncated"])
+        res = self.client.get(self.url, {"limit": "all"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_rebuild_command(self):
+        self.book(self.r1, (10, 0), (11, 0))
+        self.book(self.r1, (13, 0), (13, 30))
+        RoomOccupancy.objects.all().delete()
+        call_command("rebuild_occupancy", stdout=io.StringIO())
+        slots = from_bytes(RoomOccupancy.objects.get(room=self.r1, date=self.day).slots)
+        self.assertEqual(slots, slot_mask(600, 660) | slot_mask(780, 810))
+
+    def test_invalid_params(self):
+        res = self.client.get(self.url, {"start": "11:00", "end": "10:00"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        res = self.client.get(self.url, {"start": "noon"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,105 @@
+from datetime import date, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from booking.models import Booking
+from booking.tests.base import make_building, make_campus, make_room
+
+User = get_user_model()
+
+
+class BookingListTests(APITestCase):
+    day = date(2025, 1, 6)
+
+    def setUp(self):
+        campus = make_campus()
+        self.buildings = [make_building(campus, f"Building {i}") for i in range(2)]
+        self.rooms = [make_room(self.buildings[i % 2], f"R{i}") for i in range(4)]
+        self.user = User.objects.create_user(username="student", email="s@example.com", password="pass")
+        self.other = User.objects.create_user(username="other", email="o@example.com", password="pass")
+        self.admin = User.objects.create_superuser(username="admin", email="admin@example.com", password="pass")
+        self.now = timezone.now()
+        self.bookings = []
+        for i in range(8):
+            booking = Booking.objects.create(
+                room=self.rooms[i % 4], user=self.user if i < 6 else self.other,
+                date=self.day + timedelta(days=i), start_time=time(9), end_time=time(10),
+                status=Booking.STATUS_APPROVED if i % 2 else Booking.STATUS_PENDING,
+            )
+            # Two bookings per created_at, so the id tie-break matters.
+            Booking.objects.filter(pk=booking.pk).update(created_at=self.now - timedelta(minutes=i // 2))
+            self.bookings.append(booking)
+
+    def get(self, name, **params):
+        res = self.client.get(reverse(name), params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK, res.data)
+        return res.data
+
+    def test_plain_list_without_pagination_params(self):
+        self.client.force_authenticate(self.user)
+        data = self.get("booking-list")
+        self.assertIsInstance(data, list)
+        self.assertEqual(len(data), 6)
+
+    def test_pages_follow_created_at_then_id(self):
+        self.client.force_authenticate(self.admin)
+        ids, url = [], reverse("admin-booking-list") + "?limit=3"
+        while url:
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            ids += [booking["id"] for booking in res.data["results"]]
+            url = res.data["next"]
+        expected = list(Booking.objects.order_by("-created_at", "-id").values_list("pk", flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_admin_lists_are_always_paged(self):
+        self.client.force_authenticate(self.admin)
+        data = self.get("admin-booking-list")
+        self.assertEqual(len(data["results"]), 8)
+        self.assertIsNone(data["next"])
+        self.assertEqual(len(self.get("admin-history-list")["results"]), 0)
+
+    def test_filters(self):
+        self.client.force_authenticate(self.admin)
+        ids = lambda data: {booking["id"] for booking in data["results"]}
+        b = self.bookings
+        self.assertEqual(ids(self.get("admin-booking-list", status="approved")), {b[1].pk, b[3].pk, b[5].pk, b[7].pk})
+        self.assertEqual(ids(self.get("admin-booking-list", date_from=str(self.day + timedelta(days=2)),
+                                      date_to=str(self.day + timedelta(days=3)))), {b[2].pk, b[3].pk})
+        self.assertEqual(ids(self.get("admin-booking-list", room=self.rooms[0].pk)), {b[0].pk, b[4].pk})
+        self.assertEqual(ids(self.get("admin-booking-list", building=self.buildings[1].pk, user=self.user.pk)),
+                         {b[1].pk, b[3].pk, b[5].pk})
+
+        res = self.client.get(reverse("admin-booking-list"), {"date_from": "06.01.2025"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("date_from", res.data)
+
+    def test_users_only_see_their_own_bookings(self):
+        self.client.force_authenticate(self.user)
+        data = self.get("booking-list", user=self.other.pk, limit=20)
+        self.assertEqual(len(data["results"]), 6)
+
+    def test_expanded_list_has_a_fixed_query_budget(self):
+        self.client.force_authenticate(self.admin)
+        with self.assertNumQueries(1):
+            data = self.get("admin-booking-list", expand="room")["results"]
+        self.assertEqual(len(data), 8)
+        room = data[0]["room"]
+        self.assertEqual(set(room), {"id", "name", "type", "building"})
+        self.assertEqual(room["building"]["campus"]["name"], "Main Campus")
+
+        with self.assertNumQueries(1):
+            data = self.get("admin-booking-list", expand="room", limit=3)
+        self.assertEqual(len(data["results"]), 3)
+
+        res = self.client.get(reverse("admin-booking-list"), {"expand": "user"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_cursor(self):
+        self.client.force_authenticate(self.admin)
+        res = self.client.get(reverse("admin-booking-list"), {"cursor": "bm9wZQ=="})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
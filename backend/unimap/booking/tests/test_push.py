@@ -0,0 +1,112 @@
+import asyncio
+import json
+import threading
+from datetime import date, time
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from booking.models import Booking
+from booking.push import LocalBroker, get_broker, topic
+from booking.tests.base import make_room
+
+User = get_user_model()
+
+
+class LocalBrokerTests(SimpleTestCase):
+
+    async def test_fan_out_across_threads(self):
+        broker = LocalBroker()
+        first = broker.subscribe(["a", "b"])
+        second = broker.subscribe(["b"])
+
+        thread = threading.Thread(target=broker.publish, args=("b", {"n": 1}))
+        thread.start()
+        thread.join()
+        self.assertEqual(await asyncio.wait_for(first.get(), 1), {"n": 1})
+        self.assertEqual(await asyncio.wait_for(second.get(), 1), {"n": 1})
+
+        broker.publish("a", {"n": 2})
+        self.assertEqual(await asyncio.wait_for(first.get(), 1), {"n": 2})
+        self.assertFalse(second.pending)
+
+        first.close()
+        second.close()
+        self.assertFalse(broker.has_subscribers("a"))
+        self.assertFalse(broker.has_subscribers("b"))
+
+    async def test_slow_subscriber_keeps_the_latest_per_topic(self):
+        broker = LocalBroker()
+        subscription = broker.subscribe(["a", "b"])
+        for n in range(1000):
+            broker.publish("a", {"n": n})
+        broker.publish("b", {"n": 0})
+        broker.publish("a", {"n": 1000})
+        await asyncio.sleep(0)
+        self.assertEqual(len(subscription.pending), 2)
+        self.assertEqual(await subscription.get(), {"n": 0})
+        self.assertEqual(await subscription.get(), {"n": 1000})
+        subscription.close()
+
+
+@override_settings(TASKS_ALWAYS_EAGER=True)
+class AvailabilityStreamTests(TestCase):
+    day = date(2025, 1, 6)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.room = make_room()
+        cls.user = User.objects.create_user(username="student", email="stu@example.com", password="pass")
+
+    def approve_booking(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Booking.objects.create(room=self.room, user=self.user, date=self.day, start_time=time(10),
+                                   end_time=time(11), status=Booking.STATUS_APPROVED)
+
+    @staticmethod
+    def parse(chunk):
+        lines = chunk.decode().strip().split("\n")
+        return lines[0].removeprefix("event: "), json.loads(lines[1].removeprefix("data: "))
+
+    async def test_snapshot_then_deltas(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse("availability-stream"),
+                                               {"rooms": str(self.room.id), "date_from": self.day.isoformat()})
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        # Nothing is subscribed until the response is read.
+        self.assertFalse(get_broker().has_subscribers(topic(self.room.id, self.day)))
+        stream = aiter(response.streaming_content)
+
+        event, data = self.parse(await anext(stream))
+        self.assertEqual(event, "snapshot")
+        self.assertEqual(data["rooms"][0]["days"][0]["busy"], [])
+        self.assertTrue(get_broker().has_subscribers(topic(self.room.id, self.day)))
+
+        await sync_to_async(self.approve_booking)()
+        event, data = self.parse(await asyncio.wait_for(anext(stream), 5))
+        self.assertEqual(event, "delta")
+        self.assertEqual(data, {
+            "room": self.room.id,
+            "date": self.day.isoformat(),
+            "busy": [["10:00", "11:00"]],
+            "free": [["00:00", "10:00"], ["11:00", "24:00"]],
+        })
+
+        # A client disconnect cancels the pending read, which unsubscribes.
+        pending = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0)
+        pending.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await pending
+        self.assertFalse(get_broker().has_subscribers(topic(self.room.id, self.day)))
+
+    async def test_requires_authentication_and_valid_params(self):
+        response = await self.async_client.get(reverse("availability-stream"), {"rooms": str(self.room.id)})
+        self.assertEqual(response.status_code, 401)
+
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse("availability-stream"), {"rooms": "x"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("rooms", json.loads(response.content))
@@ -0,0 +1,121 @@
+from datetime import date, time
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from booking import series
+from booking.models import Booking, BookingSeries, RoomOccupancy
+from booking.tests.base import make_room
+
+User = get_user_model()
+
+
+class BookingSeriesTests(APITestCase):
+    def setUp(self):
+        self.room = make_room()
+        self.user = User.objects.create_user(username="student", email="stu@example.com", password="pass")
+        self.other = User.objects.create_user(username="other", email="other@example.com", password="pass")
+        self.admin = User.objects.create_superuser(username="admin", email="admin@example.com", password="pass")
+        self.client.force_authenticate(self.user)
+
+    def create(self, **extra):
+        payload = {
+            "room": self.room.id, "start_time": "10:00", "end_time": "12:00", "purpose": "Study group",
+            "first_date": "2025-02-04", "last_date": "2025-03-04", **extra,
+        }
+        return self.client.post(reverse("series-list"), payload, format="json")
+
+    def test_weekly_series_is_created_in_bulk(self):
+        # Room, lock rows, one conflict query, series, one bulk insert, one
+        # rollup read and insert, the occurrences for the response and
+        # savepoints, however many occurrences there are.
+        with self.assertNumQueries(15):
+            res = self.create()
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([b["date"] for b in res.data["bookings"]],
+                         ["2025-02-04", "2025-02-11", "2025-02-18", "2025-02-25", "2025-03-04"])
+        self.assertEqual(res.data["conflicts"], [])
+        self.assertEqual(Booking.objects.filter(series_id=res.data["id"], status=Booking.STATUS_PENDING).count(), 5)
+
+    def test_custom_dates_and_limits(self):
+        res = self.create(rule="custom", dates=["2025-02-06", "2025-02-05", "2025-02-05"])
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["dates"], ["2025-02-05", "2025-02-06"])
+
+        self.assertEqual(self.create(rule="custom", dates=["someday"]).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.create(last_date="2030-01-01").status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.create(end_time="09:00").status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_conflicts_are_reported_per_occurrence(self):
+        taken = Booking.objects.create(room=self.room, user=self.other, date=date(2025, 2, 18),
+                                       start_time=time(11), end_time=time(13), status=Booking.STATUS_APPROVED)
+        res = self.create()
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(res.data["conflicts"], [{"date": date(2025, 2, 18), "booking": taken.id, "reason": "room"}])
+        self.assertFalse(BookingSeries.objects.exists())
+
+        res = self.create(skip_conflicts=True)
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data["bookings"]), 4)
+        self.assertEqual(len(res.data["conflicts"]), 1)
+
+    def test_bookings_cannot_join_a_series(self):
+        self.client.force_authenticate(self.other)
+        series_id = self.create(first_date="2025-02-05", last_date="2025-02-05").data["id"]
+        self.client.force_authenticate(self.user)
+
+        res = self.client.post(reverse("booking-list"), {
+            "room": self.room.id, "date": "2025-02-06", "start_time": "10:00", "end_time": "11:00",
+            "series": series_id,
+        }, format="json")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertIsNone(Booking.objects.get(pk=res.data["id"]).series_id)
+
+        self.client.patch(reverse("booking-detail", args=[res.data["id"]]), {"series": series_id}, format="json")
+        self.assertIsNone(Booking.objects.get(pk=res.data["id"]).series_id)
+        self.assertEqual(BookingSeries.objects.get().bookings.count(), 1)
+
+    def test_admin_approves_and_rejects_series(self):
+        series_id = self.create().data["id"]
+        self.client.force_authenticate(self.admin)
+        url = reverse("admin-series-detail", args=[series_id])
+
+        res = self.client.patch(url, {"status": Booking.STATUS_APPROVED}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual({b["status"] for b in res.data["bookings"]}, {Booking.STATUS_APPROVED})
+        self.assertEqual(RoomOccupancy.objects.filter(room=self.room).count(), 5)
+
+        self.assertEqual(self.client.patch(url, {"status": Booking.STATUS_REJECTED}, format="json").status_code,
+                         status.HTTP_400_BAD_REQUEST)
+
+    def test_occurrences_decided_before_the_lock_are_left_alone(self):
+        series_id = self.create().data["id"]
+        cancelled = Booking.objects.filter(series_id=series_id).order_by("date").first()
+        real_lock = series.slot_lock
+
+        def racing_lock(*args, **kwargs):
+            # The user cancels one occurrence after the pending ones were read.
+            Booking.objects.filter(pk=cancelled.pk).update(status=Booking.STATUS_CANCELLED)
+            return real_lock(*args, **kwargs)
+
+        self.client.force_authenticate(self.admin)
+        with patch.object(series, "slot_lock", racing_lock):
+            res = self.client.patch(reverse("admin-series-detail", args=[series_id]),
+                                    {"status": Booking.STATUS_APPROVED}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        cancelled.refresh_from_db()
+        self.assertEqual(cancelled.status, Booking.STATUS_CANCELLED)
+        self.assertEqual(Booking.objects.filter(series_id=series_id, status=Booking.STATUS_APPROVED).count(), 4)
+
+    def test_series_approval_fails_on_conflict(self):
+        series_id = self.create().data["id"]
+        Booking.objects.create(room=self.room, user=self.other, date=date(2025, 2, 11),
+                               start_time=time(9), end_time=time(10, 30), status=Booking.STATUS_APPROVED)
+        self.client.force_authenticate(self.admin)
+        res = self.client.patch(reverse("admin-series-detail", args=[series_id]),
+                                {"status": Booking.STATUS_APPROVED}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(Booking.objects.filter(series_id=series_id, status=Booking.STATUS_APPROVED).exists())
@@ -0,0 +1,50 @@
+from datetime import date, time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+from booking.availability import busy_intervals
+from booking.models import Booking, RoomOccupancy, RoomUsageRollup
+from booking.tests.base import make_room
+
+User = get_user_model()
+
+
+class LoadedBookingTests(TestCase):
+    """
+    Receivers of booking_changed compare against the values a booking was
+    loaded with, so changes to bookings read from the database must undo
+    what the old values accounted for.
+    """
+    day = date(2025, 1, 6)
+
+    def setUp(self):
+        cache.clear()
+        self.room = make_room()
+        user = User.objects.create_user(username="student", email="stu@example.com", password="pass")
+        self.booking = Booking.objects.create(room=self.room, user=user, date=self.day, start_time=time(10),
+                                              end_time=time(11), status=Booking.STATUS_APPROVED)
+
+    def rollups(self):
+        return set(RoomUsageRollup.objects.values_list("date", "hour", "status", "minutes"))
+
+    def test_status_change_of_a_loaded_booking(self):
+        self.assertTrue(RoomOccupancy.objects.filter(room=self.room, date=self.day).exists())
+        self.assertEqual(self.rollups(), {(self.day, 10, Booking.STATUS_APPROVED, 60)})
+
+        booking = Booking.objects.get(pk=self.booking.pk)
+        booking.status = Booking.STATUS_CANCELLED
+        booking.save()
+        self.assertFalse(RoomOccupancy.objects.exists())
+        self.assertEqual(self.rollups(), {(self.day, 10, Booking.STATUS_CANCELLED, 60)})
+
+    def test_moving_a_loaded_booking_frees_its_old_day(self):
+        self.assertEqual(busy_intervals([self.room.id], self.day, self.day)[(self.room.id, self.day)], [(600, 660)])
+
+        booking = Booking.objects.get(pk=self.booking.pk)
+        booking.date = date(2025, 1, 7)
+        booking.save()
+        self.assertEqual(busy_intervals([self.room.id], self.day, self.day)[(self.room.id, self.day)], [])
+        self.assertEqual(set(RoomOccupancy.objects.values_list("date", flat=True)), {date(2025, 1, 7)})
+        self.assertEqual(self.rollups(), {(date(2025, 1, 7), 10, Booking.STATUS_APPROVED, 60)})
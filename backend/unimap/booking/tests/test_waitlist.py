@@ -0,0 +1,97 @@
+from datetime import date, time
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from booking.models import Booking, WaitlistEntry
+from booking.tests.base import make_room
+
+User = get_user_model()
+
+
+@override_settings(TASKS_ALWAYS_EAGER=True, UNI_CATALOG_SNAPSHOTS=False)
+class WaitlistTests(APITestCase):
+    day = date(2025, 1, 6)
+
+    def setUp(self):
+        self.room = make_room()
+        self.other_room = make_room(self.room.building, "R102")
+        self.owner = User.objects.create_user(username="owner", email="owner@example.com", password="pass")
+        self.users = [User.objects.create_user(username=f"u{i}", email=f"u{i}@example.com", password="pass")
+                      for i in range(3)]
+        self.admin = User.objects.create_superuser(username="admin", email="admin@example.com", password="pass")
+
+    def book(self, user, start, end, status=Booking.STATUS_APPROVED, room=None):
+        return Booking.objects.create(room=room or self.room, user=user, date=self.day,
+                                      start_time=time(*start), end_time=time(*end), status=status)
+
+    def wait(self, user, start, end):
+        self.client.force_authenticate(user)
+        return self.client.post(reverse("waitlist-list"), {
+            "room": self.room.id, "date": self.day.isoformat(), "start_time": start, "end_time": end,
+        }, format="json")
+
+    def test_only_taken_slots_can_be_waited_for(self):
+        res = self.wait(self.users[0], "10:00", "11:00")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.book(self.owner, (10, 0), (11, 0))
+        res = self.wait(self.users[0], "10:00", "11:00")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["status"], WaitlistEntry.STATUS_WAITING)
+
+        res = self.wait(self.users[0], "10:00", "11:00")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(WaitlistEntry.objects.count(), 1)
+
+    def test_freed_slot_goes_to_waiters_in_fifo_order(self):
+        approved = self.book(self.owner, (10, 0), (12, 0))
+        first = self.wait(self.users[0], "10:00", "11:00").data
+        overlapping = self.wait(self.users[1], "10:30", "11:30").data
+        later = self.wait(self.users[2], "11:00", "12:00").data
+
+        self.client.force_authenticate(self.admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.delete(reverse("admin-booking-detail", args=[approved.id]))
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+
+        entries = {entry.pk: entry for entry in WaitlistEntry.objects.all()}
+        self.assertEqual(entries[first["id"]].status, WaitlistEntry.STATUS_PROMOTED)
+        self.assertEqual(entries[overlapping["id"]].status, WaitlistEntry.STATUS_WAITING)
+        self.assertEqual(entries[later["id"]].status, WaitlistEntry.STATUS_PROMOTED)
+        booking = entries[first["id"]].booking
+        self.assertEqual((booking.user, booking.status, booking.start_time),
+                         (self.users[0], Booking.STATUS_PENDING, time(10, 0)))
+
+    def test_waiters_with_clashing_bookings_are_skipped(self):
+        pending = self.book(self.owner, (10, 0), (11, 0), status=Booking.STATUS_PENDING)
+        busy = self.wait(self.users[0], "10:00", "11:00").data
+        free = self.wait(self.users[1], "10:00", "11:00").data
+        self.book(self.users[0], (10, 0), (11, 0), status=Booking.STATUS_PENDING, room=self.other_room)
+
+        self.client.force_authenticate(self.admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.patch(reverse("admin-booking-detail", args=[pending.id]),
+                                    {"status": Booking.STATUS_REJECTED}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(WaitlistEntry.objects.get(pk=busy["id"]).status, WaitlistEntry.STATUS_WAITING)
+        promoted = WaitlistEntry.objects.get(pk=free["id"])
+        self.assertEqual(promoted.status, WaitlistEntry.STATUS_PROMOTED)
+        self.assertEqual(promoted.booking.user, self.users[1])
+
+    def test_leaving_the_waitlist(self):
+        self.book(self.owner, (10, 0), (11, 0))
+        entry = self.wait(self.users[0], "10:00", "11:00").data
+        res = self.client.delete(reverse("waitlist-detail", args=[entry["id"]]))
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(WaitlistEntry.objects.get(pk=entry["id"]).status, WaitlistEntry.STATUS_CANCELLED)
+
+        res = self.client.delete(reverse("waitlist-detail", args=[entry["id"]]))
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.client.force_authenticate(self.users[1])
+        res = self.client.get(reverse("waitlist-detail", args=[entry["id"]]))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
@@ -5,6 +5,22 @@ urlpatterns = [
     path('mybookings/', BookingView.as_view(), name='booking-list'),
     path('mybookings/<int:pk>/', BookingView.as_view(), name='booking-detail'),
     
+    path('myhistory/', BookingHistoryView.as_view(), name='history-list'),
+    path('myhistory/<int:pk>/', BookingHistoryView.as_view(), name='history-detail'),
+    path('myseries/', BookingSeriesView.as_view(), name='series-list'),
+    path('myseries/<int:pk>/', BookingSeriesView.as_view(), name='series-detail'),
+    path('mywaitlist/', WaitlistView.as_view(), name='waitlist-list'),
+    path('mywaitlist/<int:pk>/', WaitlistView.as_view(), name='waitlist-detail'),
+    path('availability/', AvailabilityView.as_view(), name='availability'),
+    path('availability/stream/', AvailabilityStreamView.as_view(), name='availability-stream'),
+    path('free-rooms/', FreeRoomsView.as_view(), name='free-rooms'),
+
     path('admin/bookings/', AdminBookingView.as_view(), name='admin-booking-list'),
     path('admin/bookings/<int:pk>/', AdminBookingView.as_view(), name='admin-booking-detail'),
+    path('admin/history/', AdminBookingHistoryView.as_view(), name='admin-history-list'),
+    path('admin/history/<int:pk>/', AdminBookingHistoryView.as_view(), name='admin-history-detail'),
+    path('admin/bookings/batch/', AdminBookingBatchView.as_view(), name='admin-booking-batch'),
+    path('admin/series/', AdminBookingSeriesView.as_view(), name='admin-series-list'),
+    path('admin/series/<int:pk>/', AdminBookingSeriesView.as_view(), name='admin-series-detail'),
+    path('admin/analytics/', AdminAnalyticsView.as_view(), name='admin-analytics'),
 ]
\ No newline at end of file
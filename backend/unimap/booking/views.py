@@ -6,11 +6,71 @@ from .models import *
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from .serializers import *
 from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_time
 from rest_framework import status
+from uni.models import Room
+from .availability import availability, days_between, minutes
+from .admission import admit, approve
+from .series import create_series, set_series_status
+from .batch import MAX_ITEMS as MAX_BATCH_ITEMS, apply_batch
+from .occupancy import free_rooms
+from .rollups import DIMENSIONS, usage
+from .waitlist import enqueue
+from .push import get_broker, topic
+from users.authentication import JWTAuthentication
+from uni.serializers import RoomSerializer
+from uni.views import filter_by_params
+from .pagination import AdminBookingPagination, BookingPagination
+from datetime import date
+import asyncio
+import json
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views import View
+from rest_framework.exceptions import AuthenticationFailed
 
 
 # Create your views here.
-class BookingView(mixins.ListModelMixin, mixins.CreateModelMixin, generics.RetrieveUpdateAPIView):
+class BookingListMixin:
+    """
+    Filtering, keyset pagination (opt-in except for the admin lists) and
+    ?expand=room for booking lists.
+    Expanded bookings nest their room, building and campus, loaded with
+    the bookings in the same query.
+    """
+    pagination_class = BookingPagination
+    filter_params = {
+        "status": ("status", str),
+        "date_from": ("date__gte", date.fromisoformat),
+        "date_to": ("date__lte", date.fromisoformat),
+        "room": ("room_id", int),
+        "building": ("room__building_id", int),
+    }
+    expandable = ("room",)
+    expanded_serializer_class = ExpandedBookingSerializer
+
+    def expanded(self):
+        expand = self.request.query_params.get("expand")
+        if expand is not None and expand not in self.expandable:
+            raise ValidationError({"expand": f"Must be one of: {', '.join(self.expandable)}."})
+        return self.request.method == "GET" and expand is not None
+
+    def filter_queryset(self, queryset):
+        queryset = filter_by_params(queryset, self.request, self.filter_params)
+        if self.expanded():
+            queryset = queryset.select_related("room__building__campus")
+        return queryset
+
+    def get_serializer_class(self):
+        if self.expanded():
+            return self.expanded_serializer_class
+        return super().get_serializer_class()
+
+
+class BookingView(BookingListMixin, mixins.ListModelMixin, mixins.CreateModelMixin, generics.RetrieveUpdateAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = BookingSerializer
 
@@ -24,35 +84,7 @@ class BookingView(mixins.ListModelMixin, mixins.CreateModelMixin, generics.Retri
         return self.create(request, *args, **kwargs)
     
     def perform_create(self, serializer):
-        data = serializer.validated_data
-
-        start = data['start_time']
-        end = data['end_time']
-        room = data['room']
-        user = self.request.user
-
-
-        # Check for conflicts
-        conflicts = Booking.objects.filter(
-            Q(start_time__lt=end) & Q(end_time__gt=start),
-            room=room,
-            status="approved"
-        )
-
-        if conflicts.exists():
-            raise ValidationError({"message": "Room already booked."})
-
-        user = self.request.user
-
-        # Check for user conflicts
-        conflicts = Booking.objects.filter(
-            Q(start_time__lt=end) & Q(end_time__gt=start),
-            user=user
-        )
-        if conflicts.exists():
-            raise ValidationError({"message": "You can't be in two places at once."})
-
-        serializer.save(user=self.request.user)
+        admit(serializer, self.request.user)
 
     def perform_update(self, serializer):
         validated_data = serializer.validated_data
@@ -63,15 +95,381 @@ class BookingView(mixins.ListModelMixin, mixins.CreateModelMixin, generics.Retri
         return super().perform_update(serializer)
 
 
-class AdminBookingView(generics.ListAPIView, generics.RetrieveUpdateDestroyAPIView):
+class BookingHistoryView(BookingListMixin, generics.ListAPIView, generics.RetrieveAPIView):
+    """
+    The user's archived bookings, with the same filters, pagination and
+    ?expand=room as their booking list.
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = BookingArchiveSerializer
+    expanded_serializer_class = ExpandedBookingArchiveSerializer
+
+    def get_queryset(self):
+        return BookingArchive.objects.filter(user=self.request.user)
+
+    def get(self, request, *args, **kwargs):
+        if "pk" in kwargs:
+            return self.retrieve(request, *args, **kwargs)
+        return self.list(request, *args, **kwargs)
+
+
+class BookingSeriesView(generics.ListCreateAPIView, generics.RetrieveAPIView):
+    """
+    The user's recurring bookings. POST expands the rule and creates every
+    occurrence at once; the response lists the occurrences and, with
+    skip_conflicts, the ones left out.
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = BookingSeriesSerializer
+
+    def get_queryset(self):
+        return BookingSeries.objects.filter(user=self.request.user).prefetch_related("bookings")
+
+    def get(self, request, *args, **kwargs):
+        if "pk" in kwargs:
+            return self.retrieve(request, *args, **kwargs)
+        return self.list(request, *args, **kwargs)
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        skip_conflicts = serializer.validated_data.pop("skip_conflicts", False)
+        series, conflicts = create_series(serializer, request.user, skip_conflicts)
+        if series is None:
+            return Response({
+                "message": "Some occurrences conflict with existing bookings.",
+                "conflicts": conflicts,
+            }, status=status.HTTP_409_CONFLICT)
+        data = self.get_serializer(series).data
+        data["conflicts"] = conflicts
+        return Response(data, status=status.HTTP_201_CREATED)
+
+
+class WaitlistView(generics.ListCreateAPIView, generics.RetrieveDestroyAPIView):
+    """
+    The user's waitlist. POST queues a request for a slot that is taken;
+    when the slot frees up the oldest compatible entries become pending
+    bookings. DELETE leaves the queue.
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = WaitlistEntrySerializer
+
+    def get_queryset(self):
+        return WaitlistEntry.objects.filter(user=self.request.user)
+
+    def get(self, request, *args, **kwargs):
+        if "pk" in kwargs:
+            return self.retrieve(request, *args, **kwargs)
+        return self.list(request, *args, **kwargs)
+
+    def perform_create(self, serializer):
+        enqueue(serializer, self.request.user)
+
+    def perform_destroy(self, instance):
+        if instance.status != WaitlistEntry.STATUS_WAITING:
+            raise ValidationError({"message": "This entry is no longer waiting."})
+        instance.status = WaitlistEntry.STATUS_CANCELLED
+        instance.save(update_fields=["status"])
+
+
+class AdminBookingView(BookingListMixin, generics.ListAPIView, generics.RetrieveUpdateDestroyAPIView):
     queryset = Booking.objects.all()
     permission_classes = [IsAuthenticated, IsAdminUser]
     serializer_class = BookingSerializer
+    pagination_class = AdminBookingPagination
+    filter_params = {**BookingListMixin.filter_params, "user": ("user_id", int)}
 
     def perform_update(self, serializer):
         validated_data = serializer.validated_data
         status = validated_data.get('status', '')
         if status == Booking.STATUS_CANCELLED:
             raise ValidationError({"message": "You cannot cancel a booking, you can reject it."})
-            
-        return super().perform_update(serializer)
\ No newline at end of file
+        if status == Booking.STATUS_APPROVED:
+            return approve(serializer)
+
+        return super().perform_update(serializer)
+
+
+class AdminBookingHistoryView(BookingListMixin, generics.ListAPIView, generics.RetrieveAPIView):
+    """
+    Every archived booking, filtered like admin/bookings/.
+    """
+    queryset = BookingArchive.objects.all()
+    permission_classes = [IsAuthenticated, IsAdminUser]
+    serializer_class = BookingArchiveSerializer
+    expanded_serializer_class = ExpandedBookingArchiveSerializer
+    filter_params = AdminBookingView.filter_params
+    pagination_class = AdminBookingPagination
+
+    def get(self, request, *args, **kwargs):
+        if "pk" in kwargs:
+            return self.retrieve(request, *args, **kwargs)
+        return self.list(request, *args, **kwargs)
+
+
+class AdminBookingBatchView(APIView):
+    """
+    Approve or reject many pending bookings at once:
+    {"items": [{"id": 1, "status": "approved"}, ...]}. Responds with one
+    result per item; approvals that conflict are resolved first-come by
+    created_at.
+    """
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def post(self, request):
+        items = request.data.get("items")
+        if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+            raise ValidationError({"items": "Must be a list of {\"id\", \"status\"} objects."})
+        if len(items) > MAX_BATCH_ITEMS:
+            raise ValidationError({"items": f"At most {MAX_BATCH_ITEMS} items per batch."})
+        return Response({"results": apply_batch(items)})
+
+
+def _date_param(params, name):
+    try:
+        value = parse_date(params.get(name, ""))
+    except ValueError:
+        value = None
+    if value is None:
+        raise ValidationError({name: "Must be a date in YYYY-MM-DD format."})
+    return value
+
+
+def _availability_params(params, max_rooms, max_days):
+    try:
+        room_ids = list(dict.fromkeys(int(pk) for pk in params.get("rooms", "").split(",") if pk.strip()))
+    except ValueError:
+        raise ValidationError({"rooms": "Must be a comma-separated list of room ids."})
+    if not room_ids:
+        raise ValidationError({"rooms": "This parameter is required."})
+    if len(room_ids) > max_rooms:
+        raise ValidationError({"rooms": f"At most {max_rooms} rooms per request."})
+
+    date_from = _date_param(params, "date_from")
+    date_to = _date_param(params, "date_to") if "date_to" in params else date_from
+    if date_to < date_from:
+        raise ValidationError({"date_to": "Must not be before date_from."})
+    if (date_to - date_from).days >= max_days:
+        raise ValidationError({"date_to": f"At most {max_days} days per request."})
+
+    unknown = set(room_ids) - set(Room.objects.filter(pk__in=room_ids).values_list("pk", flat=True))
+    if unknown:
+        raise ValidationError({"rooms": f"Unknown room(s): {', '.join(map(str, sorted(unknown)))}."})
+    return room_ids, date_from, date_to
+
+
+class AvailabilityView(APIView):
+    """
+    Busy and free intervals of ?rooms=1,2,3 for every day from ?date_from
+    to ?date_to (default: date_from), based on approved bookings.
+    """
+    permission_classes = [IsAuthenticated]
+    max_rooms = 50
+    max_days = 31
+
+    def get(self, request):
+        room_ids, date_from, date_to = _availability_params(request.query_params, self.max_rooms, self.max_days)
+        return Response({
+            "date_from": date_from,
+            "date_to": date_to,
+            "rooms": availability(room_ids, date_from, date_to),
+        })
+
+
+class AvailabilityStreamView(View):
+    """
+    Server-sent events for the rooms and dates of AvailabilityView: one
+    "snapshot" event with the current availability, then a "delta" event
+    with the day's busy and free intervals whenever an approved booking of
+    a subscribed room and date changes. Deltas come from the push broker,
+    so open streams cost no queries between changes. Authenticate with the
+    usual Authorization: Bearer header (or a session).
+    """
+    max_rooms = AvailabilityView.max_rooms
+    max_days = AvailabilityView.max_days
+
+    async def get(self, request):
+        try:
+            user = await sync_to_async(_stream_user)(request)
+        except AuthenticationFailed as exc:
+            return JsonResponse({"detail": exc.detail}, status=status.HTTP_401_UNAUTHORIZED)
+        if user is None:
+            user = await request.auser()
+        if not user.is_authenticated:
+            return JsonResponse({"detail": "Authentication credentials were not provided."},
+                                status=status.HTTP_401_UNAUTHORIZED)
+        try:
+            room_ids, date_from, date_to = await sync_to_async(_availability_params)(
+                request.GET, self.max_rooms, self.max_days)
+        except ValidationError as exc:
+            return JsonResponse(exc.detail, status=status.HTTP_400_BAD_REQUEST)
+
+        response = StreamingHttpResponse(
+            _event_stream(room_ids, date_from, date_to),
+            content_type="text/event-stream",
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+
+def _stream_user(request):
+    authenticated = JWTAuthentication().authenticate(request)
+    return authenticated[0] if authenticated else None
+
+
+def _event(name, data):
+    return f"event: {name}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n"
+
+
+async def _event_stream(room_ids, date_from, date_to):
+    # Subscribing here ties the subscription to the response being read, so
+    # one that is never iterated holds none. Subscribe before taking the
+    # snapshot so no change falls between.
+    keepalive = getattr(settings, "BOOKING_PUSH_KEEPALIVE", 15)
+    subscription = get_broker().subscribe(
+        topic(room_id, day) for room_id in room_ids for day in days_between(date_from, date_to)
+    )
+    try:
+        snapshot = await sync_to_async(availability)(room_ids, date_from, date_to)
+        yield _event("snapshot", {"date_from": date_from, "date_to": date_to, "rooms": snapshot})
+        while True:
+            try:
+                message = await asyncio.wait_for(subscription.get(), timeout=keepalive)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield _event("delta", message)
+    finally:
+        subscription.close()
+
+
+def _list_param(params, name, cast=str):
+    try:
+        return list(dict.fromkeys(cast(value.strip()) for value in params.get(name, "").split(",") if value.strip()))
+    except ValueError:
+        raise ValidationError({name: "Must be a comma-separated list of ids."})
+
+
+class AdminAnalyticsView(APIView):
+    """
+    Booked minutes from ?date_from to ?date_to (default: date_from) summed
+    per ?group_by=room,building,date,weekday,hour,status (default: room),
+    for ?status= (default: approved) and optionally only ?rooms= or
+    ?buildings=. Reads the hourly rollups, never the bookings; group by
+    weekday,hour for a utilisation heatmap.
+    """
+    permission_classes = [IsAuthenticated, IsAdminUser]
+    max_days = 366
+
+    def get(self, request):
+        params = request.query_params
+        date_from = _date_param(params, "date_from")
+        date_to = _date_param(params, "date_to") if "date_to" in params else date_from
+        if date_to < date_from:
+            raise ValidationError({"date_to": "Must not be before date_from."})
+        if (date_to - date_from).days >= self.max_days:
+            raise ValidationError({"date_to": f"At most {self.max_days} days per request."})
+
+        group_by = _list_param(params, "group_by") or ["room"]
+        unknown = [name for name in group_by if name not in DIMENSIONS]
+        if unknown:
+            raise ValidationError({"group_by": f"Unknown dimension(s): {', '.join(unknown)}."})
+        statuses = _list_param(params, "status") or [Booking.STATUS_APPROVED]
+        unknown = [name for name in statuses if name not in dict(Booking.STATUS_CHOICES)]
+        if unknown:
+            raise ValidationError({"status": f"Unknown status(es): {', '.join(unknown)}."})
+
+        return Response({
+            "date_from": date_from,
+            "date_to": date_to,
+            "group_by": group_by,
+            "status": statuses,
+            "results": usage(date_from, date_to, group_by, statuses,
+                             rooms=_list_param(params, "rooms", int),
+                             buildings=_list_param(params, "buildings", int)),
+        })
+
+
+def _time_param(params, name):
+    value = params.get(name, "")
+    if value == "24:00":
+        return 24 * 60
+    try:
+        value = parse_time(value)
+    except ValueError:
+        value = None
+    if value is None:
+        raise ValidationError({name: "Must be a time in HH:MM format."})
+    return minutes(value)
+
+
+class FreeRoomsView(APIView):
+    """
+    Rooms with no approved booking between ?start and ?end (HH:MM) on ?date,
+    optionally limited to ?building=<id> and ?type=<room type>. Defaults to
+    the next hour of today. At most ?limit rooms (default 100, at most 500)
+    are returned; "truncated" says whether more are free.
+    """
+    permission_classes = [IsAuthenticated]
+    default_limit = 100
+    max_limit = 500
+
+    def get(self, request):
+        params = request.query_params
+        now = timezone.localtime()
+        day = _date_param(params, "date") if "date" in params else now.date()
+        start = _time_param(params, "start") if "start" in params else minutes(now)
+        end = _time_param(params, "end") if "end" in params else min(start + 60, 24 * 60)
+        if end <= start:
+            raise ValidationError({"end": "Must be after start."})
+
+        rooms = Room.objects.all()
+        if "building" in params:
+            try:
+                rooms = rooms.filter(building_id=int(params["building"]))
+            except ValueError:
+                raise ValidationError({"building": "Must be an integer."})
+        if "type" in params:
+            rooms = rooms.filter(type=params["type"])
+        try:
+            limit = max(1, min(int(params.get("limit", self.default_limit)), self.max_limit))
+        except ValueError:
+            raise ValidationError({"limit": "Must be an integer."})
+
+        free = free_rooms(rooms, day, start, end, limit + 1)
+        return Response({
+            "date": day,
+            "start": f"{start // 60:02d}:{start % 60:02d}",
+            "end": f"{end // 60:02d}:{end % 60:02d}",
+            "rooms": RoomSerializer(free[:limit], many=True).data,
+            "truncated": len(free) > limit,
+        })
+
+
+class AdminBookingSeriesView(generics.ListAPIView, generics.RetrieveAPIView):
+    """
+    Booking series for admins. PATCH {"status": "approved" | "rejected"}
+    applies to every pending occurrence of the series at once.
+    """
+    queryset = BookingSeries.objects.prefetch_related("bookings")
+    permission_classes = [IsAuthenticated, IsAdminUser]
+    serializer_class = BookingSeriesSerializer
+
+    def get(self, request, *args, **kwargs):
+        if "pk" in kwargs:
+            return self.retrieve(request, *args, **kwargs)
+        return self.list(request, *args, **kwargs)
+
+    def patch(self, request, *args, **kwargs):
+        new_status = request.data.get("status")
+        if new_status not in (Booking.STATUS_APPROVED, Booking.STATUS_REJECTED):
+            raise ValidationError({"status": "Must be approved or rejected."})
+        series = self.get_object()
+        conflicts = set_series_status(series, new_status)
+        if conflicts:
+            return Response({
+                "message": "Some occurrences conflict with approved bookings.",
+                "conflicts": conflicts,
+            }, status=status.HTTP_409_CONFLICT)
+        return Response(self.get_serializer(BookingSeries.objects.prefetch_related("bookings").get(pk=series.pk)).data)
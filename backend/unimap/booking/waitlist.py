@@ -0,0 +1,103 @@
+# booking/waitlist.py
+import threading
+from collections import defaultdict
+
+from django.db.models import Q
+from rest_framework.serializers import ValidationError
+
+from unimap.tasks import run_in_background
+from .admission import slot_lock, users_lock
+from .models import Booking, WaitlistEntry
+
+_scheduled = set()
+_scheduled_lock = threading.Lock()
+
+
+def _overlaps(start, end, intervals):
+    return any(start < other_end and end > other_start for other_start, other_end in intervals)
+
+
+def blocking(room_id, day, start, end):
+    """
+    Bookings that keep a request for the room from being admitted: approved
+    ones overlapping the time and active ones holding the exact slot.
+    """
+    return Booking.objects.filter(room_id=room_id, date=day, start_time__lt=end, end_time__gt=start).filter(
+        Q(status=Booking.STATUS_APPROVED) | Q(status__in=Booking.ACTIVE_STATUSES, start_time=start, end_time=end)
+    )
+
+
+def enqueue(serializer, user):
+    """
+    Put `user` on the waitlist for the slot in `serializer`. Only slots that
+    are actually taken can be waited for.
+    """
+    data = serializer.validated_data
+    room, day, start, end = data["room"], data["date"], data["start_time"], data["end_time"]
+    with slot_lock(room.pk, [day], user.pk):
+        if not blocking(room.pk, day, start, end).exists():
+            raise ValidationError({"message": "The room is free at this time, book it directly."})
+        if WaitlistEntry.objects.filter(user=user, room=room, date=day, start_time=start, end_time=end,
+                                        status=WaitlistEntry.STATUS_WAITING).exists():
+            raise ValidationError({"message": "You are already on the waitlist for this slot."})
+        return serializer.save(user=user)
+
+
+def promote(room_id, day):
+    """
+    Turn waiting entries for (room, day) into pending bookings, oldest
+    first. An entry is promoted if the room is free for it and its user has
+    no other active booking at that time; a promoted entry then holds its
+    time against the entries behind it. Returns the promoted entries.
+    """
+    waiting = WaitlistEntry.objects.filter(room_id=room_id, date=day, status=WaitlistEntry.STATUS_WAITING)
+    user_ids = set(waiting.values_list("user_id", flat=True))
+    if not user_ids:
+        return []
+
+    with users_lock(room_id, day, user_ids):
+        entries = [entry for entry in waiting.order_by("created_at", "id") if entry.user_id in user_ids]
+        room_taken, slots, user_taken = [], set(), defaultdict(list)
+        rows = Booking.objects.filter(
+            Q(room_id=room_id) | Q(user_id__in=user_ids), date=day, status__in=Booking.ACTIVE_STATUSES,
+        ).values_list("room_id", "user_id", "start_time", "end_time", "status")
+        for booking_room_id, user_id, start, end, status in rows:
+            if booking_room_id == room_id:
+                slots.add((start, end))
+                if status == Booking.STATUS_APPROVED:
+                    room_taken.append((start, end))
+            user_taken[user_id].append((start, end))
+
+        promoted = []
+        for entry in entries:
+            window = (entry.start_time, entry.end_time)
+            if window in slots or _overlaps(*window, room_taken) or _overlaps(*window, user_taken[entry.user_id]):
+                continue
+            entry.booking = Booking.objects.create(room_id=room_id, user_id=entry.user_id, date=day,
+                                                   start_time=entry.start_time, end_time=entry.end_time,
+                                                   purpose=entry.purpose)
+            entry.status = WaitlistEntry.STATUS_PROMOTED
+            entry.save(update_fields=["status", "booking"])
+            slots.add(window)
+            room_taken.append(window)
+            user_taken[entry.user_id].append(window)
+            promoted.append(entry)
+    return promoted
+
+
+def _run_scheduled(room_id, day):
+    with _scheduled_lock:
+        _scheduled.discard((room_id, day))
+    promote(room_id, day)
+
+
+def schedule(room_id, day):
+    """
+    Promote waiters for (room, day) in the background. Requests for a
+    room and day already queued are merged into the queued run.
+    """
+    with _scheduled_lock:
+        if (room_id, day) in _scheduled:
+            return
+        _scheduled.add((room_id, day))
+    run_in_background(_run_scheduled, room_id, day)
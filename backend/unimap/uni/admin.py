@@ -8,4 +8,6 @@ admin.site.register(Room)
 admin.site.register(CampusAlias)
 admin.site.register(BuildingAlias)
 admin.site.register(RoomAlias)
-admin.site.register(FloorMap)
\ No newline at end of file
+admin.site.register(FloorMap)
+admin.site.register(NavNode)
+admin.site.register(NavEdge)
\ No newline at end of file
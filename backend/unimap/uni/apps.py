@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class UniConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'uni'
+
+    def ready(self):
+        from unimap.caches import require_shared_cache
+
+        from . import signals  # noqa: F401
+
+        require_shared_cache("UNI_CATALOG_CACHE")
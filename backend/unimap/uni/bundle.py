@@ -0,0 +1,85 @@
+# uni/bundle.py
+import hashlib
+import threading
+from collections import OrderedDict
+
+from django.db.models import Prefetch
+from rest_framework.renderers import JSONRenderer
+
+from . import catalog
+from .models import Campus, FloorMap, Room
+from .serializers import BundleCampusSerializer
+
+_lock = threading.Lock()
+# (campus id or None, base url) -> (catalog version, etag, blob), least
+# recently used first. Only ids of existing campuses and hosts that passed
+# ALLOWED_HOSTS get here, and entries of older versions are dropped.
+_blobs = OrderedDict()
+MAX_ENTRIES = 32
+
+
+def bundle_queryset():
+    rooms = Room.objects.prefetch_related("aliases")
+    return Campus.objects.prefetch_related(
+        "aliases",
+        "buildings__aliases",
+        Prefetch(
+            "buildings__floors",
+            queryset=FloorMap.objects.order_by("floor_number").prefetch_related(Prefetch("rooms", queryset=rooms)),
+        ),
+        Prefetch(
+            "buildings__rooms",
+            queryset=rooms.filter(floor_map__isnull=True),
+            to_attr="rooms_without_floor",
+        ),
+    )
+
+
+def _campuses(campus_id=None, request=None):
+    campuses = bundle_queryset()
+    if campus_id is not None:
+        campuses = campuses.filter(pk=campus_id)
+    return BundleCampusSerializer(campuses, many=True, context={"request": request}).data
+
+
+def build(campus_id=None, request=None):
+    """
+    Serialize the campus > building > floor > room tree (or one campus of
+    it) into JSON bytes.
+    """
+    return JSONRenderer().render({"campuses": _campuses(campus_id, request)})
+
+
+def get(campus_id=None, request=None):
+    """
+    Return (etag, blob) for the current catalog version, building it only
+    when the catalog changed since the last call. Returns None if there is
+    no campus `campus_id`.
+    """
+    base_url = request.build_absolute_uri("/") if request is not None else ""
+    key = (campus_id, base_url)
+    version = catalog.version()
+    with _lock:
+        cached = _blobs.get(key)
+        if cached is not None and cached[0] == version:
+            _blobs.move_to_end(key)
+            return cached[1], cached[2]
+
+    campuses = _campuses(campus_id, request)
+    if campus_id is not None and not campuses:
+        return None
+    blob = JSONRenderer().render({"campuses": campuses})
+    etag = hashlib.sha256(blob).hexdigest()[:32]
+    with _lock:
+        for stale in [other for other, entry in _blobs.items() if entry[0] != version]:
+            del _blobs[stale]
+        _blobs[key] = (version, etag, blob)
+        _blobs.move_to_end(key)
+        while len(_blobs) > MAX_ENTRIES:
+            _blobs.popitem(last=False)
+    return etag, blob
+
+
+def clear():
+    with _lock:
+        _blobs.clear()
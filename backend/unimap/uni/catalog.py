@@ -0,0 +1,102 @@
+# uni/catalog.py
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+KEY_PREFIX = "uni:catalog"
+
+
+def _cache():
+    return caches[getattr(settings, "UNI_CATALOG_CACHE", "default")]
+
+
+def _key(what, model=None):
+    if model is None:
+        return f"{KEY_PREFIX}:{what}"
+    return f"{KEY_PREFIX}:{what}:{model._meta.label_lower}"
+
+
+def _seed():
+    # Start from the clock rather than 0, so a counter lost with the cache
+    # never hands out a version that was already used.
+    return int(time.time() * 1000)
+
+
+def _incr(key):
+    cache = _cache()
+    cache.add(key, _seed(), timeout=None)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr().
+        value = _seed()
+        cache.set(key, value, timeout=None)
+        return value
+
+
+def version(model=None):
+    """
+    Current version of the whole catalog, or of one catalog model. Changes
+    whenever a campus, building, floor map, room or alias (of that model)
+    is saved or deleted.
+    """
+    cache = _cache()
+    key = _key("version", model)
+    value = cache.get(key)
+    if value is None:
+        cache.add(key, _seed(), timeout=None)
+        value = cache.get(key)
+    return value
+
+
+def last_modified(model=None):
+    """
+    Unix timestamp (whole seconds) of the last change, or of the first
+    time anyone asked if the cache holds no record of one.
+    """
+    cache = _cache()
+    key = _key("modified", model)
+    value = cache.get(key)
+    if value is None:
+        cache.add(key, math.ceil(time.time()), timeout=None)
+        value = cache.get(key)
+    return value
+
+
+def _touch(key):
+    # Last-Modified only has whole seconds, so every change moves it to a
+    # later second than the one before, even within the same second;
+    # otherwise If-Modified-Since would match data changed since.
+    cache = _cache()
+    previous = cache.get(key)
+    now = math.ceil(time.time())
+    cache.set(key, now if previous is None else max(now, int(previous) + 1), timeout=None)
+
+
+def bump(model=None):
+    value = _incr(_key("version"))
+    _touch(_key("modified"))
+    if model is not None:
+        _incr(_key("version", model))
+        _touch(_key("modified", model))
+    return value
+
+
+def scope_version(scope):
+    """
+    Version of a narrower slice of data, e.g. "nav:<building id>", that
+    changes independently of the catalog version.
+    """
+    cache = _cache()
+    key = f"{KEY_PREFIX}:scope:{scope}"
+    value = cache.get(key)
+    if value is None:
+        cache.add(key, _seed(), timeout=None)
+        value = cache.get(key)
+    return value
+
+
+def bump_scope(scope):
+    return _incr(f"{KEY_PREFIX}:scope:{scope}")
@@ -0,0 +1,187 @@
+# uni/fuzzy.py
+import threading
+
+from .models import Room, RoomAlias
+from .search_index import normalize
+
+# Queries shorter than this are too ambiguous to correct.
+MIN_QUERY_LENGTH = 3
+
+
+def compact(text):
+    """
+    Normalize and drop everything but letters and digits, so "IK-F01",
+    "IK F 01" and "ikf01" all become the same key.
+    """
+    return "".join(ch for ch in normalize(text) if ch.isalnum())
+
+
+def max_distance(term):
+    if len(term) < MIN_QUERY_LENGTH:
+        return 0
+    return 1 if len(term) <= 5 else 2
+
+
+def levenshtein(a, b):
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb),
+            ))
+        previous = current
+    return previous[-1]
+
+
+class _Node:
+    __slots__ = ("term", "keys", "children")
+
+    def __init__(self, term):
+        self.term = term
+        self.keys = set()
+        # edit distance to this node -> child node
+        self.children = {}
+
+
+class RoomBKTree:
+    """
+    BK-tree over compacted room names and room aliases. The triangle
+    inequality lets a lookup skip every subtree that can't be within the
+    allowed edit distance, instead of scoring every room.
+
+    Removing a room only empties its node; the tree is rebuilt from the
+    live entries once more than half of the nodes are empty.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._built = False
+        self._root = None
+        self._nodes = {}
+        self._empty_nodes = 0
+        # (model label, pk) -> (room id, compacted term)
+        self._sources = {}
+
+    def reset(self):
+        with self._lock:
+            self._built = False
+            self._root = None
+            self._nodes = {}
+            self._empty_nodes = 0
+            self._sources = {}
+
+    def build(self):
+        with self._lock:
+            self.reset()
+            for model, id_attr in ((Room, "pk"), (RoomAlias, "room_id")):
+                for pk, room_id, name in model.objects.values_list("pk", id_attr, "name"):
+                    self._add_source((model._meta.label_lower, pk), room_id, name)
+            self._built = True
+
+    def _ensure_built(self):
+        if not self._built:
+            with self._lock:
+                if not self._built:
+                    self.build()
+
+    def _insert(self, term):
+        node = self._nodes.get(term)
+        if node is not None:
+            return node
+        node = self._nodes[term] = _Node(term)
+        self._empty_nodes += 1
+        if self._root is None:
+            self._root = node
+            return node
+        parent = self._root
+        while True:
+            distance = levenshtein(term, parent.term)
+            child = parent.children.get(distance)
+            if child is None:
+                parent.children[distance] = node
+                return node
+            parent = child
+
+    def _attach(self, term, key):
+        node = self._insert(term)
+        if not node.keys:
+            self._empty_nodes -= 1
+        node.keys.add(key)
+
+    def _add_source(self, key, room_id, name):
+        self._remove_source(key)
+        term = compact(name)
+        if room_id is None or not term:
+            return
+        self._sources[key] = (room_id, term)
+        self._attach(term, key)
+
+    def _remove_source(self, key):
+        source = self._sources.pop(key, None)
+        if source is None:
+            return
+        node = self._nodes[source[1]]
+        node.keys.discard(key)
+        if not node.keys:
+            self._empty_nodes += 1
+            if self._empty_nodes * 2 > len(self._nodes):
+                self._rebuild_tree()
+
+    def _rebuild_tree(self):
+        self._root = None
+        self._nodes = {}
+        self._empty_nodes = 0
+        for key, (_, term) in self._sources.items():
+            self._attach(term, key)
+
+    def add(self, instance):
+        if isinstance(instance, Room):
+            room_id = instance.pk
+        elif isinstance(instance, RoomAlias):
+            room_id = instance.room_id
+        else:
+            return
+        with self._lock:
+            if self._built:
+                self._add_source((instance._meta.label_lower, instance.pk), room_id, instance.name)
+
+    def discard(self, instance):
+        if not isinstance(instance, (Room, RoomAlias)):
+            return
+        with self._lock:
+            if self._built:
+                self._remove_source((instance._meta.label_lower, instance.pk))
+
+    def search(self, query):
+        """
+        Return [(distance, room id), ...] for rooms within the allowed edit
+        distance of `query`, closest first.
+        """
+        self._ensure_built()
+        term = compact(query)
+        tolerance = max_distance(term)
+        if not tolerance:
+            return []
+
+        best = {}
+        with self._lock:
+            stack = [self._root] if self._root is not None else []
+            while stack:
+                node = stack.pop()
+                distance = levenshtein(term, node.term)
+                if distance <= tolerance:
+                    for key in node.keys:
+                        room_id = self._sources[key][0]
+                        best[room_id] = min(distance, best.get(room_id, distance))
+                for edge, child in node.children.items():
+                    if distance - tolerance <= edge <= distance + tolerance:
+                        stack.append(child)
+        return sorted((distance, room_id) for room_id, distance in best.items())
+
+
+tree = RoomBKTree()
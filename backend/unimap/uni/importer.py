@@ -0,0 +1,402 @@
+# uni/importer.py
+import csv
+import json
+import re
+import time
+
+from django.conf import settings
+from django.db import transaction
+
+from . import catalog, routing, snapshot
+from .models import Campus, Building, FloorMap, Room, CampusAlias, BuildingAlias, RoomAlias, ROOM_TYPES
+from .signals import CATALOG_INDEXES
+from .tiling import tile_floor_map
+from unimap.tasks import run_after_commit
+
+DEFAULT_CHUNK_SIZE = 1000
+READ_SIZE = 64 * 1024
+
+# Parents first, so a chunk can refer to anything flushed before it.
+KIND_MODELS = {
+    "campus": Campus,
+    "building": Building,
+    "floormap": FloorMap,
+    "room": Room,
+    "campus_alias": CampusAlias,
+    "building_alias": BuildingAlias,
+    "room_alias": RoomAlias,
+}
+KINDS = tuple(KIND_MODELS)
+
+# Fixture model labels -> record kind.
+MODEL_KINDS = {model._meta.label_lower: kind for kind, model in KIND_MODELS.items()}
+
+NUMBER_FIELDS = {"floor_number": int, "floor": int, "floor_map": int, "map_x": float, "map_y": float}
+
+# Key under which record_kind() keeps a fixture entry's own pk.
+FIXTURE_PK = "_fixture_pk"
+
+# Whitespace and array punctuation between top-level JSON values.
+SEPARATORS = re.compile(r"[ \t\r\n,\[]*")
+
+
+class CatalogImportError(ValueError):
+    pass
+
+
+def iter_json(stream):
+    """
+    Yield the objects of a JSON array or of JSON Lines from a text stream,
+    holding at most one read buffer and one object in memory.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    # Objects are decoded in place from `pos`; the consumed head of the
+    # buffer is only dropped when the next chunk is read.
+    pos = 0
+    eof = False
+    while True:
+        pos = SEPARATORS.match(buffer, pos).end()
+        if buffer.startswith("]", pos):
+            return
+        if pos == len(buffer):
+            if eof:
+                return
+        else:
+            try:
+                obj, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                if eof:
+                    raise CatalogImportError(f"Invalid JSON: {e}")
+            else:
+                yield obj
+                continue
+        chunk = stream.read(READ_SIZE)
+        eof = not chunk
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+
+def iter_csv(stream, kind=None):
+    """
+    Yield the rows of a CSV file with a header line. Rows name their kind in
+    a `kind` column unless the whole file is of one `kind`.
+    """
+    for line, row in enumerate(csv.DictReader(stream), start=2):
+        record = {}
+        for name, value in row.items():
+            value = (value or "").strip()
+            if value == "":
+                continue
+            if name in NUMBER_FIELDS:
+                try:
+                    value = NUMBER_FIELDS[name](value)
+                except ValueError:
+                    raise CatalogImportError(f"Line {line}: {name} must be a number, not {value!r}.")
+            record[name] = value
+        if kind is not None:
+            record.setdefault("kind", kind)
+        yield record
+
+
+def record_kind(record):
+    """
+    Flatten a Django fixture entry ({"model": ..., "fields": {...}}) into a
+    plain record, keeping its pk under FIXTURE_PK, and return (kind, record).
+    """
+    if "model" in record:
+        kind = MODEL_KINDS.get(record["model"].lower())
+        record = {**record.get("fields", {}), FIXTURE_PK: record.get("pk")}
+    else:
+        kind = record.get("kind")
+    if kind not in KINDS:
+        raise CatalogImportError(f"Unknown record kind {kind!r}.")
+    return kind, record
+
+
+def _required(record, *names):
+    missing = [name for name in names if record.get(name) in (None, "")]
+    if missing:
+        raise CatalogImportError(f"Missing field(s): {', '.join(missing)}.")
+    return [record[name] for name in names]
+
+
+class CatalogImporter:
+    """
+    Upserts catalog records in chunks with bulk_create/bulk_update, matching
+    existing rows on natural keys: campus and building by name, floor maps by
+    building and floor number, rooms by building and name, aliases by owner
+    and name. References to a parent are its name or its primary key; in
+    fixture entries a primary key means the parent's pk in the fixture
+    when that parent was imported, since imported rows get new pks.
+
+    Bulk writes send no model signals, so finish() drops the in-memory
+    catalog indexes, bumps the catalog versions, queues tiling for the
+    floor maps it wrote and invalidates their buildings' routes once at
+    the end.
+    """
+
+    def __init__(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self.buffers = {kind: [] for kind in KINDS}
+        self.counts = {kind: {"created": 0, "updated": 0} for kind in KINDS}
+        self.records = 0
+        # kind -> {fixture pk: pk in the database}
+        self.fixture_pks = {kind: {} for kind in KINDS}
+        # pks of the floor maps created or updated so far
+        self.floor_maps_written = set()
+        self.started = time.perf_counter()
+        self.campuses = self._lookup(Campus)
+        self.buildings = self._lookup(Building)
+        # (building id, floor number) -> floor map id
+        self.floor_maps = {
+            (building_id, number): pk
+            for pk, building_id, number in FloorMap.objects.values_list("pk", "building_id", "floor_number")
+        }
+
+    @staticmethod
+    def _lookup(model):
+        # name -> pk, plus every pk mapped to itself for references by id.
+        lookup = {}
+        for pk, name in model.objects.order_by("pk").values_list("pk", "name"):
+            lookup.setdefault(name, pk)
+            lookup[pk] = pk
+        return lookup
+
+    def _resolve(self, lookup, label, ref):
+        pk = lookup.get(ref)
+        if pk is None:
+            raise CatalogImportError(f"Unknown {label} {ref!r}.")
+        return pk
+
+    def _parent(self, record, kind, lookup, label, ref):
+        if FIXTURE_PK in record and ref in self.fixture_pks[kind]:
+            return self.fixture_pks[kind][ref]
+        return self._resolve(lookup, label, ref)
+
+    def add(self, record):
+        self.records += 1
+        try:
+            kind, record = record_kind(record)
+        except CatalogImportError as e:
+            raise CatalogImportError(f"Record {self.records}: {e}")
+        self.buffers[kind].append((self.records, record))
+        if len(self.buffers[kind]) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        for kind in KINDS:
+            buffer, self.buffers[kind] = self.buffers[kind], []
+            if not buffer:
+                continue
+            rows, fixture_keys = {}, {}
+            for number, record in buffer:
+                try:
+                    key, values = getattr(self, f"_{kind}_row")(record)
+                except CatalogImportError as e:
+                    raise CatalogImportError(f"Record {number}: {e}")
+                # A later record for the same key wins.
+                rows.setdefault(key, {}).update(values)
+                if record.get(FIXTURE_PK) is not None:
+                    fixture_keys[key] = record[FIXTURE_PK]
+            with transaction.atomic():
+                keys = getattr(self, f"_flush_{kind}")(rows) or {}
+            for key, fixture_pk in fixture_keys.items():
+                if key in keys:
+                    self.fixture_pks[kind][fixture_pk] = keys[key]
+
+    def finish(self):
+        self.flush()
+        for catalog_index in CATALOG_INDEXES:
+            catalog_index.reset()
+        changed = False
+        for kind, counts in self.counts.items():
+            if counts["created"] or counts["updated"]:
+                catalog.bump(KIND_MODELS[kind])
+                changed = True
+        if changed:
+            snapshot.rebuild_on_commit()
+        self._floor_maps_written()
+        return self.counts
+
+    def _floor_maps_written(self):
+        floor_maps = FloorMap.objects.filter(pk__in=self.floor_maps_written)
+        if getattr(settings, "UNI_FLOOR_MAP_TILING", True):
+            for pk in floor_maps.exclude(image="").values_list("pk", flat=True):
+                run_after_commit(tile_floor_map, pk)
+        # Route tables carry floor numbers through the floor maps.
+        for building_id in set(floor_maps.values_list("building_id", flat=True)):
+            routing.invalidate(building_id)
+            routing.rebuild_on_commit(building_id)
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    # record -> (natural key, field values)
+
+    def _campus_row(self, record):
+        (name,) = _required(record, "name")
+        values = {field: record[field] for field in ("name", "address", "maps_url", "image") if field in record}
+        return name, values
+
+    def _building_row(self, record):
+        name, campus = _required(record, "name", "campus")
+        values = {field: record[field] for field in ("name", "address", "maps_url", "image") if field in record}
+        values["campus_id"] = self._parent(record, "campus", self.campuses, "campus", campus)
+        return name, values
+
+    def _floormap_row(self, record):
+        building, number = _required(record, "building", "floor_number")
+        building_id = self._parent(record, "building", self.buildings, "building", building)
+        values = {"building_id": building_id, "floor_number": number}
+        if "image" in record:
+            values["image"] = record["image"]
+        return (building_id, number), values
+
+    def _room_row(self, record):
+        building, name, room_type = _required(record, "building", "name", "type")
+        if room_type not in ROOM_TYPES:
+            raise CatalogImportError(f"Unknown room type {room_type!r}.")
+        building_id = self._parent(record, "building", self.buildings, "building", building)
+        values = {"building_id": building_id, "name": name, "type": room_type}
+        for field in ("map_x", "map_y"):
+            if field in record:
+                values[field] = record[field]
+        if record.get("floor") is not None:
+            values["floor_map_id"] = self._resolve(self.floor_maps, "floor", (building_id, record["floor"]))
+        elif "floor_map" in record:
+            floor_map = record["floor_map"]
+            if FIXTURE_PK in record:
+                floor_map = self.fixture_pks["floormap"].get(floor_map, floor_map)
+            values["floor_map_id"] = floor_map
+        return (building_id, name), values
+
+    def _campus_alias_row(self, record):
+        campus, name = _required(record, "campus", "name")
+        campus_id = self._parent(record, "campus", self.campuses, "campus", campus)
+        return (campus_id, name), {"campus_id": campus_id, "name": name}
+
+    def _building_alias_row(self, record):
+        building, name = _required(record, "building", "name")
+        building_id = self._parent(record, "building", self.buildings, "building", building)
+        return (building_id, name), {"building_id": building_id, "name": name}
+
+    def _room_alias_row(self, record):
+        if "building" not in record and isinstance(record.get("room"), int):
+            # Fixture entries refer to the room by pk.
+            room, name = _required(record, "room", "name")
+            if FIXTURE_PK in record:
+                room = self.fixture_pks["room"].get(room, room)
+            return (room, name), {"room_id": room, "name": name}
+        building, room, name = _required(record, "building", "room", "name")
+        building_id = self._resolve(self.buildings, "building", building)
+        return ((building_id, room), name), {"room": (building_id, room), "name": name}
+
+    # bulk writes per kind
+
+    def _upsert(self, kind, model, key_fields, rows, existing, written=None):
+        """
+        Update the rows whose key matches an object in `existing` and
+        bulk-create the rest. Returns {key: pk}, and adds the pks of the
+        created and updated objects to the `written` set if given.
+        """
+        by_key = {tuple(getattr(obj, field) for field in key_fields): obj for obj in existing}
+        created, updated, changed_fields = [], [], set()
+        for key, values in rows.items():
+            obj = by_key.get(key if isinstance(key, tuple) else (key,))
+            if obj is None:
+                created.append((key, model(**values)))
+                continue
+            changed = {field for field, value in values.items() if getattr(obj, field) != value}
+            if changed:
+                for field in changed:
+                    setattr(obj, field, values[field])
+                changed_fields |= changed
+                updated.append(obj)
+
+        model.objects.bulk_create([obj for _, obj in created], batch_size=self.chunk_size)
+        if updated:
+            model.objects.bulk_update(updated, sorted(changed_fields), batch_size=self.chunk_size)
+        self.counts[kind]["created"] += len(created)
+        self.counts[kind]["updated"] += len(updated)
+
+        keys = {key: obj.pk for key, obj in created}
+        if written is not None:
+            written.update(obj.pk for _, obj in created)
+            written.update(obj.pk for obj in updated)
+        for key in rows:
+            obj = by_key.get(key if isinstance(key, tuple) else (key,))
+            if obj is not None:
+                keys[key] = obj.pk
+        return keys
+
+    def _flush_campus(self, rows):
+        existing = Campus.objects.filter(name__in=list(rows))
+        keys = self._upsert("campus", Campus, ("name",), rows, existing)
+        for name, pk in keys.items():
+            self.campuses.setdefault(name, pk)
+            self.campuses[pk] = pk
+        return keys
+
+    def _flush_building(self, rows):
+        existing = Building.objects.filter(name__in=list(rows))
+        keys = self._upsert("building", Building, ("name",), rows, existing)
+        for name, pk in keys.items():
+            self.buildings.setdefault(name, pk)
+            self.buildings[pk] = pk
+        return keys
+
+    def _flush_floormap(self, rows):
+        existing = FloorMap.objects.filter(
+            building_id__in={building_id for building_id, _ in rows},
+            floor_number__in={number for _, number in rows},
+        )
+        keys = self._upsert(
+            "floormap", FloorMap, ("building_id", "floor_number"), rows, existing, written=self.floor_maps_written
+        )
+        self.floor_maps.update(keys)
+        return keys
+
+    def _flush_room(self, rows):
+        existing = Room.objects.filter(
+            building_id__in={building_id for building_id, _ in rows},
+            name__in={name for _, name in rows},
+        )
+        return self._upsert("room", Room, ("building_id", "name"), rows, existing)
+
+    def _flush_aliases(self, kind, model, owner_field, rows):
+        existing = model.objects.filter(
+            **{f"{owner_field}__in": {owner for owner, _ in rows}, "name__in": {name for _, name in rows}}
+        )
+        self._upsert(kind, model, (owner_field, "name"), rows, existing)
+
+    def _flush_campus_alias(self, rows):
+        self._flush_aliases("campus_alias", CampusAlias, "campus_id", rows)
+
+    def _flush_building_alias(self, rows):
+        self._flush_aliases("building_alias", BuildingAlias, "building_id", rows)
+
+    def _flush_room_alias(self, rows):
+        # Resolve (building, room name) references in one query per chunk.
+        named = {values["room"] for values in rows.values() if "room" in values}
+        rooms = {}
+        if named:
+            for pk, building_id, name in Room.objects.filter(
+                building_id__in={building_id for building_id, _ in named},
+                name__in={name for _, name in named},
+            ).values_list("pk", "building_id", "name"):
+                rooms[(building_id, name)] = pk
+
+        by_pk = {values["room_id"] for values in rows.values() if "room_id" in values}
+        unknown = by_pk - set(Room.objects.filter(pk__in=by_pk).values_list("pk", flat=True))
+        if unknown:
+            raise CatalogImportError(f"Unknown room(s) {', '.join(map(str, sorted(unknown)))}.")
+
+        resolved = {}
+        for key, values in rows.items():
+            if "room" in values:
+                room_id = self._resolve(rooms, "room", values.pop("room"))
+                values["room_id"] = room_id
+                key = (room_id, key[1])
+            resolved[key] = values
+        self._flush_aliases("room_alias", RoomAlias, "room_id", resolved)
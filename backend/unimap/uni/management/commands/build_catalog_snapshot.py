@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from uni.snapshot import build_snapshots, MANIFEST_PATH
+
+
+class Command(BaseCommand):
+    help = "Write content-hashed, pre-compressed JSON catalog snapshots per campus and update their manifest."
+
+    def handle(self, *args, **options):
+        manifest = build_snapshots()
+        for campus_id, entry in manifest["campuses"].items():
+            self.stdout.write(f"Campus {campus_id}: {entry['files']['identity']} ({entry['size']} bytes)")
+        self.stdout.write(self.style.SUCCESS(f"Manifest written to {MANIFEST_PATH}"))
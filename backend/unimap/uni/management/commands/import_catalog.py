@@ -0,0 +1,45 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from uni.importer import CatalogImporter, CatalogImportError, DEFAULT_CHUNK_SIZE, KINDS, iter_csv, iter_json
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream a JSON (array, JSON Lines or fixture) or CSV catalog into the database, "
+        "upserting campuses, buildings, floor maps, rooms and aliases on their natural keys."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Catalog file, or - for stdin")
+        parser.add_argument("--format", choices=["json", "csv"], help="Default: from the file extension")
+        parser.add_argument("--kind", choices=KINDS, help="Record kind for CSV files without a 'kind' column")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or ("csv" if path.lower().endswith(".csv") else "json")
+        importer = CatalogImporter(chunk_size=max(1, options["chunk_size"]))
+
+        stream = sys.stdin if path == "-" else open(path, encoding="utf-8", newline="")
+        try:
+            records = iter_csv(stream, options["kind"]) if fmt == "csv" else iter_json(stream)
+            for record in records:
+                importer.add(record)
+                if options["verbosity"] > 1 and importer.records % importer.chunk_size == 0:
+                    self.stdout.write(f"{importer.records} records, {importer.records / importer.elapsed():.0f}/s")
+            counts = importer.finish()
+        except CatalogImportError as e:
+            raise CommandError(str(e))
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        for kind, count in counts.items():
+            if count["created"] or count["updated"]:
+                self.stdout.write(f"{kind}: {count['created']} created, {count['updated']} updated")
+        elapsed = importer.elapsed()
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {importer.records} records in {elapsed:.2f}s ({importer.records / max(elapsed, 1e-9):.0f} records/s)"
+        ))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from uni.models import FloorMap
+from uni.tiling import tile_floor_map
+
+
+class Command(BaseCommand):
+    help = "Cut floor map images into Deep Zoom tile pyramids (skips images that are already tiled)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("ids", nargs="*", type=int, help="Floor map ids (default: all)")
+        parser.add_argument("--force", action="store_true", help="Re-tile even if the image did not change")
+
+    def handle(self, *args, **options):
+        floor_maps = FloorMap.objects.order_by("pk")
+        if options["ids"]:
+            floor_maps = floor_maps.filter(pk__in=options["ids"])
+
+        tiled = 0
+        for pk in floor_maps.values_list("pk", flat=True):
+            if tile_floor_map(pk, force=options["force"]):
+                tiled += 1
+                self.stdout.write(f"Tiled floor map {pk}")
+        self.stdout.write(self.style.SUCCESS(f"{tiled} floor map(s) tiled"))
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.7 on 2026-10-18 08:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uni', '0007_building_image'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='building',
+            index=models.Index(fields=['name', 'id'], name='uni_buildin_name_a84d78_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='building',
+            index=models.Index(fields=['campus', 'name', 'id'], name='uni_buildin_campus__628408_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='floormap',
+            index=models.Index(fields=['floor_number', 'building'], name='uni_floorma_floor_n_4710b0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='room',
+            index=models.Index(fields=['name', 'id'], name='uni_room_name_15ac5c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='room',
+            index=models.Index(fields=['building', 'name', 'id'], name='uni_room_buildin_b5af14_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='room',
+            index=models.Index(fields=['floor_map', 'name', 'id'], name='uni_room_floor_m_b15090_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='room',
+            index=models.Index(fields=['type', 'name', 'id'], name='uni_room_type_59af33_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.7 on 2026-10-18 08:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uni', '0008_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='floormap',
+            name='image_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='floormap',
+            name='tile_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='floormap',
+            name='tile_levels',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='floormap',
+            name='tile_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+    ]
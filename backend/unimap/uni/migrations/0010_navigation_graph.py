@@ -0,0 +1,37 @@
+# Generated by Django 5.1.7 on 2026-10-18 08:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uni', '0009_floormap_tiles'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NavNode',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('corridor', 'Corridor'), ('room', 'Room'), ('entrance', 'Entrance'), ('stairs', 'Stairs'), ('elevator', 'Elevator')], default='corridor', max_length=20)),
+                ('label', models.CharField(blank=True, max_length=100)),
+                ('x', models.FloatField()),
+                ('y', models.FloatField()),
+                ('building', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='nav_nodes', to='uni.building')),
+                ('floor_map', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='nav_nodes', to='uni.floormap')),
+                ('room', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='nav_nodes', to='uni.room')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='NavEdge',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weight', models.FloatField(blank=True, null=True)),
+                ('building', models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='nav_edges', to='uni.building')),
+                ('a', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='uni.navnode')),
+                ('b', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='uni.navnode')),
+            ],
+        ),
+    ]
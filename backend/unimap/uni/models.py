@@ -1,3 +1,4 @@
+from django.core import exceptions
 from django.db import models
 
 # Create your models here.
@@ -23,6 +24,10 @@ class Building(models.Model):
 
     class Meta:
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['name', 'id']),
+            models.Index(fields=['campus', 'name', 'id']),
+        ]
 
     def __str__(self):
         return f"{self.id}. {self.name}"
@@ -46,6 +51,13 @@ class Room(models.Model):
 
     class Meta:
         ordering = ['name']
+        # Keyset pagination walks (name, id), optionally within one filter.
+        indexes = [
+            models.Index(fields=['name', 'id']),
+            models.Index(fields=['building', 'name', 'id']),
+            models.Index(fields=['floor_map', 'name', 'id']),
+            models.Index(fields=['type', 'name', 'id']),
+        ]
 
     def __str__(self):
         return f"Room: {self.name}"
@@ -55,6 +67,17 @@ class FloorMap(models.Model):
     floor_number = models.IntegerField()
     image = models.ImageField(upload_to="images/floor_maps/")
 
+    # Filled in by uni/tiling.py once the image has been cut into tiles.
+    image_hash = models.CharField(max_length=64, blank=True, editable=False)
+    tile_width = models.PositiveIntegerField(blank=True, null=True, editable=False)
+    tile_height = models.PositiveIntegerField(blank=True, null=True, editable=False)
+    tile_levels = models.PositiveSmallIntegerField(blank=True, null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['floor_number', 'building']),
+        ]
+
     def __str__(self):
         return f'{self.building} > Floor: {self.floor_number}'
 
@@ -91,3 +114,50 @@ class RoomAlias(models.Model):
 
 
 
+
+
+NAV_NODE_KINDS = {
+    "corridor": "Corridor",
+    "room": "Room",
+    "entrance": "Entrance",
+    "stairs": "Stairs",
+    "elevator": "Elevator"
+}
+
+class NavNode(models.Model):
+    """
+    A point of the indoor wayfinding graph: a corridor junction, a room
+    door, an entrance, or a stair/elevator landing on one floor.
+    """
+    building = models.ForeignKey(Building, on_delete=models.CASCADE, related_name='nav_nodes')
+    floor_map = models.ForeignKey(FloorMap, on_delete=models.CASCADE, related_name='nav_nodes')
+    kind = models.CharField(max_length=20, choices=NAV_NODE_KINDS, default="corridor")
+    room = models.ForeignKey(Room, on_delete=models.SET_NULL, related_name='nav_nodes', null=True, blank=True)
+    label = models.CharField(max_length=100, blank=True)
+    x = models.FloatField()
+    y = models.FloatField()
+
+    def __str__(self):
+        return f'{self.get_kind_display()} {self.label or self.id} ({self.floor_map})'
+
+class NavEdge(models.Model):
+    """
+    Walkable, two-way connection between two nodes of the same building.
+    Without an explicit weight the cost is the straight-line distance, plus
+    a per-floor penalty for stairs/elevator links between floors.
+    """
+    building = models.ForeignKey(Building, on_delete=models.CASCADE, related_name='nav_edges', editable=False)
+    a = models.ForeignKey(NavNode, on_delete=models.CASCADE, related_name='+')
+    b = models.ForeignKey(NavNode, on_delete=models.CASCADE, related_name='+')
+    weight = models.FloatField(null=True, blank=True)
+
+    def clean(self):
+        if self.a_id and self.b_id and self.a.building_id != self.b.building_id:
+            raise exceptions.ValidationError("Both nodes must be in the same building.")
+
+    def save(self, *args, **kwargs):
+        self.building_id = self.a.building_id
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f'{self.a} <-> {self.b}'
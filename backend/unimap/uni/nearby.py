@@ -0,0 +1,133 @@
+# uni/nearby.py
+import threading
+
+import numpy as np
+from django.conf import settings
+
+from .models import FloorMap, Room
+
+# Room coordinates are percentages of the floor map image; changing floors
+# counts as walking this far on the same floor.
+DEFAULT_FLOOR_PENALTY = 25.0
+
+FACILITY_FIELDS = ("id", "map_x", "map_y", "floor_map__floor_number")
+
+
+def floor_penalty():
+    return getattr(settings, "UNI_NEAREST_FLOOR_PENALTY", DEFAULT_FLOOR_PENALTY)
+
+
+class FacilityGroup:
+    """
+    Ids and (x, y, floor) of the placed rooms of one type in one building,
+    as parallel NumPy arrays.
+    """
+
+    def __init__(self, rows):
+        self.ids = np.array([row[0] for row in rows], dtype=np.int64)
+        self.coords = np.array([row[1:] for row in rows], dtype=np.float64).reshape(-1, 3)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def nearest(self, x, y, floor, k, exclude=None):
+        """
+        The k closest rooms to (x, y) on `floor` as [(distance, room id)],
+        where every floor changed adds the floor penalty to the walk.
+        """
+        distances = np.hypot(self.coords[:, 0] - x, self.coords[:, 1] - y)
+        distances += np.abs(self.coords[:, 2] - floor) * floor_penalty()
+        if exclude is not None:
+            distances[self.ids == exclude] = np.inf
+
+        k = min(k, int(np.isfinite(distances).sum()))
+        if k <= 0:
+            return []
+        closest = np.argpartition(distances, k - 1)[:k]
+        closest = closest[np.lexsort((self.ids[closest], distances[closest]))]
+        return [(float(distances[i]), int(self.ids[i])) for i in closest]
+
+
+class FacilityIndex:
+    """
+    One FacilityGroup per (building, room type), loaded on first use. Room
+    and floor map changes only drop the groups they affect; those reload
+    from the DB the next time they are asked for.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._groups = {}
+        # room id -> (building id, type) of the group holding it
+        self._room_groups = {}
+
+    def reset(self):
+        with self._lock:
+            self._groups = {}
+            self._room_groups = {}
+
+    def group(self, building_id, room_type):
+        key = (building_id, room_type)
+        with self._lock:
+            group = self._groups.get(key)
+        if group is not None:
+            return group
+
+        rows = list(Room.objects.filter(
+            building_id=building_id,
+            type=room_type,
+            floor_map__isnull=False,
+            map_x__isnull=False,
+            map_y__isnull=False,
+        ).order_by("pk").values_list(*FACILITY_FIELDS))
+
+        group = FacilityGroup(rows)
+        with self._lock:
+            for row in rows:
+                self._room_groups[row[0]] = key
+            return self._groups.setdefault(key, group)
+
+    def _drop_room(self, room_id):
+        key = self._room_groups.pop(room_id, None)
+        if key is not None:
+            self._drop_group(key)
+
+    def _drop_group(self, key):
+        group = self._groups.pop(key, None)
+        for room_id in group.ids.tolist() if group is not None else ():
+            self._room_groups.pop(room_id, None)
+
+    def _drop_building(self, building_id):
+        for key in [key for key in self._groups if key[0] == building_id]:
+            self._drop_group(key)
+
+    def add(self, instance):
+        with self._lock:
+            if isinstance(instance, Room):
+                self._drop_room(instance.pk)
+                self._drop_group((instance.building_id, instance.type))
+            elif isinstance(instance, FloorMap):
+                # A renumbered floor moves every room on it.
+                self._drop_building(instance.building_id)
+
+    def discard(self, instance):
+        with self._lock:
+            if isinstance(instance, Room):
+                self._drop_room(instance.pk)
+            elif isinstance(instance, FloorMap):
+                # Its rooms lose their floor through an UPDATE that sends no
+                # signals.
+                self._drop_building(instance.building_id)
+
+    def nearest(self, room, room_type, k):
+        """
+        The k rooms of `room_type` in the building of `room` closest to it,
+        as [(distance, room id)]. `room` needs map coordinates and a floor.
+        """
+        group = self.group(room.building_id, room_type)
+        if not len(group):
+            return []
+        return group.nearest(room.map_x, room.map_y, room.floor_map.floor_number, k, exclude=room.pk)
+
+
+index = FacilityIndex()
@@ -0,0 +1,109 @@
+# uni/pagination.py
+import base64
+import json
+from functools import reduce
+from operator import or_
+
+from django.core import exceptions
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over `ordering` (by default (name, id); the last
+    field must be unique). Each page continues strictly after the last row
+    of the previous one, so fetching a page costs the same however deep
+    into the list it is.
+
+    Pagination is opt-in: without ?limit= or ?cursor= the view returns the
+    plain list it always did, unless `always` is set.
+    """
+    ordering = ("name", "id")
+    default_limit = 100
+    max_limit = 1000
+    limit_query_param = "limit"
+    cursor_query_param = "cursor"
+    always = False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if not self.always and self.limit_query_param not in params and self.cursor_query_param not in params:
+            return None
+
+        self.request = request
+        self.limit = self.get_limit(request)
+        queryset = queryset.order_by(*self.ordering)
+
+        cursor = params.get(self.cursor_query_param)
+        if cursor:
+            queryset = queryset.filter(self.after(self.decode_cursor(cursor, queryset.model)))
+
+        rows = list(queryset[:self.limit + 1])
+        self.has_next = len(rows) > self.limit
+        self.page = rows[:self.limit]
+        return self.page
+
+    def get_limit(self, request):
+        try:
+            limit = int(request.query_params.get(self.limit_query_param, self.default_limit))
+        except ValueError:
+            raise ValidationError({self.limit_query_param: "Must be an integer."})
+        return max(1, min(limit, self.max_limit))
+
+    def after(self, values):
+        """
+        Rows that sort after `values`: (a > x) | (a = x & b > y) | ...,
+        with < for descending fields.
+        """
+        clauses = []
+        for i, field in enumerate(self.ordering):
+            lookup = "lt" if field.startswith("-") else "gt"
+            equal = {previous.lstrip("-"): value for previous, value in zip(self.ordering[:i], values)}
+            clauses.append(Q(**equal, **{f"{field.lstrip('-')}__{lookup}": values[i]}))
+        return reduce(or_, clauses)
+
+    def encode_cursor(self, obj):
+        values = [getattr(obj, field.lstrip("-")) for field in self.ordering]
+        raw = json.dumps(values, default=lambda value: value.isoformat()).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii")
+
+    def decode_cursor(self, cursor, model):
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise ValueError
+            values = [
+                model._meta.get_field(field.lstrip("-")).to_python(value)
+                for field, value in zip(self.ordering, values)
+            ]
+            if None in values:
+                raise ValueError
+            return values
+        except (ValueError, TypeError, exceptions.ValidationError):
+            raise ValidationError({self.cursor_query_param: "Invalid cursor."})
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_next_link(),
+            "results": data
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
@@ -0,0 +1,205 @@
+# uni/routing.py
+import heapq
+import math
+import threading
+from array import array
+
+from django.conf import settings
+from django.db import transaction
+
+from . import catalog
+from .models import NavNode, NavEdge
+from unimap.tasks import run_in_background
+
+# Cost of moving one floor up or down over a stairs/elevator edge, in map units.
+DEFAULT_FLOOR_COST = 20.0
+# Seconds to wait for a burst of graph edits to settle before precomputing.
+DEFAULT_REBUILD_DELAY = 2.0
+
+NODE_FIELDS = ("id", "kind", "floor_map_id", "floor_map__floor_number", "room_id", "label", "x", "y")
+
+
+def floor_cost():
+    return getattr(settings, "UNI_ROUTE_FLOOR_COST", DEFAULT_FLOOR_COST)
+
+
+def scope(building_id):
+    return f"nav:{building_id}"
+
+
+def edge_weight(a, b, weight=None):
+    if weight is not None:
+        return weight
+    floors = abs(a["floor_map__floor_number"] - b["floor_map__floor_number"])
+    if floors:
+        return floors * floor_cost()
+    return math.hypot(a["x"] - b["x"], a["y"] - b["y"])
+
+
+class BuildingRoutes:
+    """
+    All-pairs shortest paths over one building's navigation graph. Built
+    with one Dijkstra run per node; afterwards a route is a table lookup
+    plus walking the predecessor row back to the start.
+    """
+
+    def __init__(self, nodes, edges):
+        self.nodes = nodes
+        self.position = {node["id"]: i for i, node in enumerate(nodes)}
+        # room id -> positions of the nodes at its doors
+        self.room_nodes = {}
+        for i, node in enumerate(nodes):
+            if node["room_id"] is not None:
+                self.room_nodes.setdefault(node["room_id"], []).append(i)
+
+        n = len(nodes)
+        adjacency = [[] for _ in range(n)]
+        for a_id, b_id, weight in edges:
+            a, b = self.position.get(a_id), self.position.get(b_id)
+            if a is None or b is None:
+                continue
+            cost = edge_weight(nodes[a], nodes[b], weight)
+            adjacency[a].append((b, cost))
+            adjacency[b].append((a, cost))
+
+        self.dist = []
+        self.prev = []
+        for source in range(n):
+            dist, prev = self._dijkstra(adjacency, source)
+            self.dist.append(dist)
+            self.prev.append(prev)
+
+    @staticmethod
+    def _dijkstra(adjacency, source):
+        n = len(adjacency)
+        dist = array("d", [math.inf]) * n
+        prev = array("l", [-1]) * n
+        dist[source] = 0.0
+        heap = [(0.0, source)]
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue
+            for v, cost in adjacency[u]:
+                nd = d + cost
+                if nd < dist[v]:
+                    dist[v] = nd
+                    prev[v] = u
+                    heapq.heappush(heap, (nd, v))
+        return dist, prev
+
+    def route(self, from_room, to_room):
+        """
+        (distance, [node, ...]) of the shortest walk between any door of
+        `from_room` and any door of `to_room`, or None if there is none.
+        """
+        starts = self.room_nodes.get(from_room, ())
+        ends = self.room_nodes.get(to_room, ())
+        best = None
+        for s in starts:
+            for t in ends:
+                if best is None or self.dist[s][t] < best[0]:
+                    best = (self.dist[s][t], s, t)
+        if best is None or math.isinf(best[0]):
+            return None
+
+        distance, s, t = best
+        path = [t]
+        prev = self.prev[s]
+        while path[-1] != s:
+            path.append(prev[path[-1]])
+        return distance, [self.nodes[i] for i in reversed(path)]
+
+
+_lock = threading.Lock()
+# building id -> (nav version, BuildingRoutes)
+_routes = {}
+
+
+def load(building_id):
+    nodes = list(NavNode.objects.filter(building_id=building_id).order_by("pk").values(*NODE_FIELDS))
+    edges = list(NavEdge.objects.filter(building_id=building_id).values_list("a_id", "b_id", "weight"))
+    return BuildingRoutes(nodes, edges)
+
+
+def routes_for(building_id):
+    """
+    Precomputed routes for a building, rebuilt only after its graph changed.
+    """
+    version = catalog.scope_version(scope(building_id))
+    with _lock:
+        cached = _routes.get(building_id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    routes = load(building_id)
+    with _lock:
+        _routes[building_id] = (version, routes)
+    return routes
+
+
+def invalidate(building_id):
+    catalog.bump_scope(scope(building_id))
+    with _lock:
+        _routes.pop(building_id, None)
+
+
+_pending_lock = threading.Lock()
+_pending = set()
+_timer = None
+
+
+def build_pending():
+    """
+    Precompute the routes of every building scheduled for a rebuild.
+    """
+    global _timer
+    with _pending_lock:
+        building_ids = sorted(_pending)
+        _pending.clear()
+        _timer = None
+    for building_id in building_ids:
+        routes_for(building_id)
+
+
+def schedule_rebuild(building_id, delay=None):
+    """
+    Precompute the routes of `building_id` `delay` seconds from now,
+    restarting the countdown if a rebuild is already pending. Buildings
+    scheduled meanwhile join that rebuild, once each. With
+    TASKS_ALWAYS_EAGER the routes are built right away.
+    """
+    global _timer
+    if getattr(settings, "TASKS_ALWAYS_EAGER", False):
+        routes_for(building_id)
+        return
+    if delay is None:
+        delay = getattr(settings, "UNI_ROUTE_REBUILD_DELAY", DEFAULT_REBUILD_DELAY)
+    with _pending_lock:
+        _pending.add(building_id)
+        if _timer is not None:
+            _timer.cancel()
+        _timer = threading.Timer(delay, run_in_background, args=(build_pending,))
+        _timer.daemon = True
+        _timer.start()
+
+
+def rebuild_on_commit(building_id):
+    """
+    Once the current transaction commits, invalidate the routes of
+    `building_id` again and schedule_rebuild() them.
+    """
+    def committed():
+        invalidate(building_id)
+        schedule_rebuild(building_id)
+
+    transaction.on_commit(committed)
+
+
+def cancel_pending():
+    global _timer
+    with _pending_lock:
+        if _timer is not None:
+            _timer.cancel()
+            _timer = None
+        _pending.clear()
@@ -0,0 +1,133 @@
+# uni/search_cache.py
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+from . import catalog
+from .search_index import normalize
+
+DEFAULTS = {
+    "BACKEND": "local",
+    "ALIAS": "default",
+    "TIMEOUT": 300,
+    "MAX_ENTRIES": 1024,
+}
+
+
+class LocalBackend:
+    """
+    Per-process LRU with a TTL on every entry.
+    """
+
+    def __init__(self, timeout, max_entries):
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class DjangoCacheBackend:
+    """
+    Shares entries between processes through one of settings.CACHES.
+    """
+
+    def __init__(self, alias, timeout):
+        self.alias = alias
+        self.timeout = timeout
+
+    def get(self, key):
+        return caches[self.alias].get(key)
+
+    def set(self, key, value):
+        caches[self.alias].set(key, value, timeout=self.timeout)
+
+    def clear(self):
+        # Entries are keyed by catalog version; bumping it orphans them all.
+        catalog.bump()
+
+
+class SearchCache:
+    """
+    Caches serialized /api/uni/search/ payloads by normalized query. Keys
+    include the catalog version, so any catalog change invalidates every
+    entry at once without having to find them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._backend = None
+        self._config = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def backend(self):
+        config = {**DEFAULTS, **getattr(settings, "UNI_SEARCH_CACHE", {})}
+        if config != self._config:
+            if config["BACKEND"] == "django":
+                self._backend = DjangoCacheBackend(config["ALIAS"], config["TIMEOUT"])
+            else:
+                self._backend = LocalBackend(config["TIMEOUT"], config["MAX_ENTRIES"])
+            self._config = config
+        return self._backend
+
+    def key(self, query):
+        digest = hashlib.sha1(normalize(query).encode("utf-8")).hexdigest()
+        return f"uni:search:{catalog.version()}:{digest}"
+
+    def get(self, query):
+        value = self.backend.get(self.key(query))
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, query, payload):
+        self.backend.set(self.key(query), payload)
+
+    def clear(self):
+        self.backend.clear()
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+search_cache = SearchCache()
@@ -0,0 +1,154 @@
+# uni/search_index.py
+import threading
+import unicodedata
+from collections import defaultdict
+
+from .models import Campus, Building, Room, CampusAlias, BuildingAlias, RoomAlias
+
+GRAM_SIZE = 3
+
+# (model, kind of result it points to, attribute holding the result id)
+INDEXED_MODELS = [
+    (Campus, "campus", "pk"),
+    (CampusAlias, "campus", "campus_id"),
+    (Building, "building", "pk"),
+    (BuildingAlias, "building", "building_id"),
+    (Room, "room", "pk"),
+    (RoomAlias, "room", "room_id"),
+]
+
+KINDS = ("room", "building", "campus")
+
+
+def normalize(text):
+    """
+    Fold case, accents and repeated whitespace so "Épület" matches "epulet".
+    """
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(text.casefold().split())
+
+
+def grams(text, size=GRAM_SIZE):
+    """
+    Every substring of `text` of length 1..size.
+    """
+    out = set()
+    for n in range(1, size + 1):
+        for i in range(len(text) - n + 1):
+            out.add(text[i:i + n])
+    return out
+
+
+def _spec(model):
+    for indexed_model, kind, id_attr in INDEXED_MODELS:
+        if indexed_model is model:
+            return kind, id_attr
+    return None
+
+
+class NgramIndex:
+    """
+    In-memory n-gram index over the names and aliases of campuses, buildings
+    and rooms. It is built from the database on first use and then kept up to
+    date by the signals in uni/signals.py, so a search never touches the DB.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._built = False
+        # (model label, pk) -> (kind, result id, normalized text)
+        self._sources = {}
+        # gram -> set of source keys
+        self._postings = defaultdict(set)
+
+    def reset(self):
+        with self._lock:
+            self._built = False
+            self._sources = {}
+            self._postings = defaultdict(set)
+
+    def build(self):
+        with self._lock:
+            self.reset()
+            for model, kind, id_attr in INDEXED_MODELS:
+                for pk, owner_id, name in model.objects.values_list("pk", id_attr, "name"):
+                    self._add((model._meta.label_lower, pk), kind, owner_id, name)
+            self._built = True
+
+    def _ensure_built(self):
+        if not self._built:
+            with self._lock:
+                if not self._built:
+                    self.build()
+
+    def _add(self, key, kind, owner_id, name):
+        self._remove(key)
+        if owner_id is None:
+            return
+        text = normalize(name)
+        self._sources[key] = (kind, owner_id, text)
+        for gram in grams(text):
+            self._postings[gram].add(key)
+
+    def _remove(self, key):
+        source = self._sources.pop(key, None)
+        if source is None:
+            return
+        for gram in grams(source[2]):
+            postings = self._postings.get(gram)
+            if postings is not None:
+                postings.discard(key)
+                if not postings:
+                    del self._postings[gram]
+
+    def add(self, instance):
+        spec = _spec(type(instance))
+        if spec is None:
+            return
+        with self._lock:
+            # Not built yet: the next search loads the row from the DB anyway.
+            if not self._built:
+                return
+            kind, id_attr = spec
+            self._add((instance._meta.label_lower, instance.pk), kind, getattr(instance, id_attr), instance.name)
+
+    def discard(self, instance):
+        if _spec(type(instance)) is None:
+            return
+        with self._lock:
+            if self._built:
+                self._remove((instance._meta.label_lower, instance.pk))
+
+    def search(self, query):
+        """
+        Return {"room": ids, "building": ids, "campus": ids} for every entry
+        whose name or alias contains `query` (after normalization).
+        """
+        self._ensure_built()
+        result = {kind: set() for kind in KINDS}
+        text = normalize(query)
+        if not text:
+            return result
+
+        with self._lock:
+            n = min(len(text), GRAM_SIZE)
+            query_grams = {text[i:i + n] for i in range(len(text) - n + 1)}
+            candidates = None
+            # Intersect the rarest grams first so the candidate set shrinks fast.
+            for gram in sorted(query_grams, key=lambda g: len(self._postings.get(g, ()))):
+                postings = self._postings.get(gram)
+                if not postings:
+                    return result
+                candidates = set(postings) if candidates is None else candidates & postings
+                if not candidates:
+                    return result
+
+            for key in candidates:
+                kind, owner_id, source_text = self._sources[key]
+                if text in source_text:
+                    result[kind].add(owner_id)
+        return result
+
+
+index = NgramIndex()
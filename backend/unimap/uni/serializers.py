@@ -1,22 +1,99 @@
-from rest_framework.serializers import ModelSerializer
+from rest_framework.serializers import ModelSerializer, SerializerMethodField, SlugRelatedField, ValidationError
 from .models import *
+from .tiling import tile_info
 
-class CampusSerializer(ModelSerializer):
+
+def _field_list(value):
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+class SparseFieldsMixin:
+    """
+    Trims the representation to ?fields=a,b or drops ?omit=c,d when the
+    serializer has a request in its context. Without either parameter the
+    serializer is unchanged.
+
+    `column_sources` names the model columns behind computed fields, so
+    views can still load only what the kept fields need.
+    """
+    column_sources = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")
+        if request is None:
+            return
+
+        fields = _field_list(request.query_params.get("fields", ""))
+        omit = _field_list(request.query_params.get("omit", ""))
+        unknown = [name for name in fields + omit if name not in self.fields]
+        if unknown:
+            raise ValidationError({"fields": f"Unknown field(s): {', '.join(unknown)}."})
+
+        for name in list(self.fields):
+            if (fields and name not in fields) or name in omit:
+                self.fields.pop(name)
+
+class CampusSerializer(SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = Campus
         fields = '__all__'
 
-class BuildingSerializer(ModelSerializer):
+class BuildingSerializer(SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = Building
         fields = '__all__'
 
-class RoomSerializer(ModelSerializer):
+class RoomSerializer(SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = Room
         fields = '__all__'
 
-class FloorMapSerializer(ModelSerializer):
+TILE_COLUMNS = ['image_hash', 'tile_width', 'tile_height', 'tile_levels']
+
+class FloorMapSerializer(SparseFieldsMixin, ModelSerializer):
+    tiles = SerializerMethodField()
+    column_sources = {'tiles': ['id'] + TILE_COLUMNS}
+
     class Meta:
         model = FloorMap
-        fields = '__all__'
\ No newline at end of file
+        exclude = TILE_COLUMNS
+
+    def get_tiles(self, obj):
+        return tile_info(obj, self.context.get("request"))
+
+# Nested, read-only representation used by /api/uni/bundle/.
+class BundleRoomSerializer(ModelSerializer):
+    aliases = SlugRelatedField(many=True, read_only=True, slug_field='name')
+
+    class Meta:
+        model = Room
+        fields = '__all__'
+
+class BundleFloorMapSerializer(ModelSerializer):
+    rooms = BundleRoomSerializer(many=True, read_only=True)
+    tiles = SerializerMethodField()
+
+    class Meta:
+        model = FloorMap
+        exclude = TILE_COLUMNS
+
+    def get_tiles(self, obj):
+        return tile_info(obj, self.context.get("request"))
+
+class BundleBuildingSerializer(ModelSerializer):
+    aliases = SlugRelatedField(many=True, read_only=True, slug_field='name')
+    floors = BundleFloorMapSerializer(many=True, read_only=True)
+    rooms_without_floor = BundleRoomSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Building
+        fields = '__all__'
+
+class BundleCampusSerializer(ModelSerializer):
+    aliases = SlugRelatedField(many=True, read_only=True, slug_field='name')
+    buildings = BundleBuildingSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Campus
+        fields = '__all__'
@@ -0,0 +1,80 @@
+# uni/signals.py
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+
+from . import catalog
+from .models import Campus, Building, FloorMap, Room, CampusAlias, BuildingAlias, RoomAlias, NavNode, NavEdge
+from .search_index import index as search_index
+from .suggest import trie as suggest_trie
+from .fuzzy import tree as fuzzy_rooms
+from .spatial import index as spatial_index
+from .nearby import index as facility_index
+from .tiling import tile_floor_map, delete_tiles
+from . import routing, snapshot
+from unimap.tasks import run_after_commit
+
+CATALOG_MODELS = [Campus, Building, FloorMap, Room, CampusAlias, BuildingAlias, RoomAlias]
+
+# In-memory structures that mirror the catalog and follow its changes.
+CATALOG_INDEXES = [search_index, suggest_trie, fuzzy_rooms, spatial_index, facility_index]
+
+
+def catalog_changed(model):
+    # Bump now so this process stops serving cached data immediately, and
+    # again on commit so nothing cached while the transaction was open
+    # survives it.
+    catalog.bump(model)
+    transaction.on_commit(lambda: catalog.bump(model))
+    snapshot.rebuild_on_commit()
+
+
+def catalog_saved(sender, instance, **kwargs):
+    for catalog_index in CATALOG_INDEXES:
+        catalog_index.add(instance)
+    catalog_changed(sender)
+
+
+def catalog_deleted(sender, instance, **kwargs):
+    for catalog_index in CATALOG_INDEXES:
+        catalog_index.discard(instance)
+    catalog_changed(sender)
+    if sender is FloorMap:
+        # Its rooms lose their floor_map through a bulk UPDATE that sends
+        # no signal.
+        catalog_changed(Room)
+
+
+for model in CATALOG_MODELS:
+    post_save.connect(catalog_saved, sender=model, dispatch_uid=f"uni-catalog-saved-{model.__name__}")
+    post_delete.connect(catalog_deleted, sender=model, dispatch_uid=f"uni-catalog-deleted-{model.__name__}")
+
+
+def floor_map_saved(sender, instance, **kwargs):
+    # Tiling reads the whole image; keep it off the request path.
+    if getattr(settings, "UNI_FLOOR_MAP_TILING", True) and instance.image:
+        run_after_commit(tile_floor_map, instance.pk)
+
+
+def floor_map_deleted(sender, instance, **kwargs):
+    if instance.image_hash:
+        run_after_commit(delete_tiles, instance.pk)
+
+
+post_save.connect(floor_map_saved, sender=FloorMap, dispatch_uid="uni-floor-map-tiling")
+post_delete.connect(floor_map_deleted, sender=FloorMap, dispatch_uid="uni-floor-map-tiles-deleted")
+
+
+def nav_graph_changed(sender, instance, **kwargs):
+    building_id = instance.building_id
+    if building_id is None:
+        return
+    routing.invalidate(building_id)
+    # Precompute the new tables in the background so the next route
+    # request doesn't pay for it; a burst of edits rebuilds once.
+    routing.rebuild_on_commit(building_id)
+
+
+for model in (NavNode, NavEdge, FloorMap):
+    post_save.connect(nav_graph_changed, sender=model, dispatch_uid=f"uni-nav-saved-{model.__name__}")
+    post_delete.connect(nav_graph_changed, sender=model, dispatch_uid=f"uni-nav-deleted-{model.__name__}")
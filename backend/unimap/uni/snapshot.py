@@ -0,0 +1,139 @@
+# uni/snapshot.py
+import gzip
+import hashlib
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+from . import bundle, catalog
+from .models import Campus
+from .storage import overwrite
+from unimap.tasks import run_in_background
+
+try:
+    import brotli
+except ImportError:  # optional: only gzip copies are written without it
+    brotli = None
+
+SNAPSHOT_ROOT = "static/catalog"
+MANIFEST_PATH = f"{SNAPSHOT_ROOT}/manifest.json"
+# Seconds to wait for a burst of catalog edits to settle before rebuilding.
+DEFAULT_DELAY = 5.0
+
+_lock = threading.Lock()
+_timer = None
+
+
+def _snapshot_path(campus_id, digest):
+    return f"{SNAPSHOT_ROOT}/campus-{campus_id}.{digest}.json"
+
+
+def _write_once(path, data):
+    # Content-hashed names never change meaning, so an existing file is final.
+    if not default_storage.exists(path):
+        overwrite(path, data)
+
+
+def encodings(blob):
+    """
+    The pre-compressed variants of `blob` as {content encoding: (suffix, bytes)}.
+    """
+    variants = {"gzip": (".gz", gzip.compress(blob, compresslevel=9, mtime=0))}
+    if brotli is not None:
+        variants["br"] = (".br", brotli.compress(blob, quality=11))
+    return variants
+
+
+def read_manifest():
+    if not default_storage.exists(MANIFEST_PATH):
+        return None
+    with default_storage.open(MANIFEST_PATH, "rb") as f:
+        return json.loads(f.read())
+
+
+def build_snapshots():
+    """
+    Write one content-hashed JSON snapshot per campus, plus gzip and brotli
+    copies, then point the manifest at them. Snapshots whose content did
+    not change are not rewritten, and neither is the manifest if no campus
+    changed. Files referenced by neither the new nor the previous manifest
+    are removed.
+    """
+    version = catalog.version()
+    previous = read_manifest()
+    campuses = {}
+    for campus_id in Campus.objects.order_by("pk").values_list("pk", flat=True):
+        blob = bundle.build(campus_id)
+        digest = hashlib.sha256(blob).hexdigest()[:16]
+        path = _snapshot_path(campus_id, digest)
+        _write_once(path, blob)
+        files = {"identity": path}
+        for encoding, (suffix, data) in encodings(blob).items():
+            _write_once(path + suffix, data)
+            files[encoding] = path + suffix
+        campuses[str(campus_id)] = {
+            "sha256": digest,
+            "size": len(blob),
+            "urls": {encoding: default_storage.url(name) for encoding, name in files.items()},
+            "files": files,
+        }
+
+    if previous is not None and previous["campuses"] == campuses:
+        # Nothing changed: keep the manifest (and its ETag) as it is.
+        return previous
+
+    manifest = {"version": version, "generated_at": int(time.time()), "campuses": campuses}
+    overwrite(MANIFEST_PATH, json.dumps(manifest, indent=1).encode("utf-8"))
+    _prune(manifest, previous)
+    return manifest
+
+
+def _prune(manifest, previous):
+    # Clients holding the previous manifest may still fetch its files.
+    keep = {MANIFEST_PATH}
+    for generation in (manifest, previous or {}):
+        for entry in generation.get("campuses", {}).values():
+            keep.update(entry["files"].values())
+    if not default_storage.exists(SNAPSHOT_ROOT):
+        return
+    for name in default_storage.listdir(SNAPSHOT_ROOT)[1]:
+        path = f"{SNAPSHOT_ROOT}/{name}"
+        if path not in keep:
+            default_storage.delete(path)
+
+
+def schedule_build(delay=None):
+    """
+    Rebuild the snapshots `delay` seconds from now, restarting the countdown
+    if a rebuild is already pending.
+    """
+    global _timer
+    if delay is None:
+        delay = getattr(settings, "UNI_CATALOG_SNAPSHOT_DELAY", DEFAULT_DELAY)
+    with _lock:
+        if _timer is not None:
+            _timer.cancel()
+        _timer = threading.Timer(delay, run_in_background, args=(build_snapshots,))
+        _timer.daemon = True
+        _timer.start()
+
+
+def rebuild_on_commit():
+    """
+    schedule_build() once the current transaction commits, if snapshots
+    are enabled.
+    """
+    if getattr(settings, "UNI_CATALOG_SNAPSHOTS", False):
+        transaction.on_commit(schedule_build)
+
+
+def cancel_pending():
+    global _timer
+    with _lock:
+        if _timer is not None:
+            _timer.cancel()
+            _timer = None
@@ -0,0 +1,199 @@
+# uni/spatial.py
+import heapq
+import math
+import threading
+
+from django.conf import settings
+
+from .models import FloorMap, Room
+
+# Room coordinates are percentages of the floor map image, so a 5x5 cell
+# grid holds a handful of rooms per cell on a typical floor.
+DEFAULT_CELL_SIZE = 5.0
+
+PIN_FIELDS = ("id", "name", "type", "map_x", "map_y")
+
+
+def cell_size():
+    return getattr(settings, "UNI_SPATIAL_CELL_SIZE", DEFAULT_CELL_SIZE)
+
+
+class FloorGrid:
+    """
+    Uniform grid over the rooms of one floor map. Viewport and nearest-room
+    queries only look at the cells around the query, never the whole floor.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        # room id -> pin dict
+        self.pins = {}
+        # (col, row) -> set of room ids
+        self.cells = {}
+        # min col, min row, max col, max row ever occupied
+        self.bounds = None
+
+    def cell(self, x, y):
+        return math.floor(x / self.size), math.floor(y / self.size)
+
+    def insert(self, pin):
+        self.remove(pin["id"])
+        self.pins[pin["id"]] = pin
+        col, row = self.cell(pin["map_x"], pin["map_y"])
+        self.cells.setdefault((col, row), set()).add(pin["id"])
+        if self.bounds is None:
+            self.bounds = (col, row, col, row)
+        else:
+            min_col, min_row, max_col, max_row = self.bounds
+            self.bounds = (min(min_col, col), min(min_row, row), max(max_col, col), max(max_row, row))
+
+    def remove(self, room_id):
+        pin = self.pins.pop(room_id, None)
+        if pin is None:
+            return
+        key = self.cell(pin["map_x"], pin["map_y"])
+        ids = self.cells.get(key)
+        if ids is not None:
+            ids.discard(room_id)
+            if not ids:
+                del self.cells[key]
+
+    def within(self, x0, y0, x1, y1):
+        if self.bounds is None:
+            return []
+        # Only cells inside the occupied bounds can hold rooms, however
+        # large the requested box is.
+        min_col, min_row, max_col, max_row = self.bounds
+        (c0, r0), (c1, r1) = self.cell(x0, y0), self.cell(x1, y1)
+        c0, r0, c1, r1 = max(c0, min_col), max(r0, min_row), min(c1, max_col), min(r1, max_row)
+        if c0 > c1 or r0 > r1:
+            return []
+        if (c1 - c0 + 1) * (r1 - r0 + 1) > len(self.cells):
+            keys = [(col, row) for col, row in self.cells if c0 <= col <= c1 and r0 <= row <= r1]
+        else:
+            keys = [(col, row) for col in range(c0, c1 + 1) for row in range(r0, r1 + 1)]
+        found = []
+        for key in keys:
+            for room_id in self.cells.get(key, ()):
+                pin = self.pins[room_id]
+                if x0 <= pin["map_x"] <= x1 and y0 <= pin["map_y"] <= y1:
+                    found.append(pin)
+        return sorted(found, key=lambda pin: (pin["name"], pin["id"]))
+
+    def _ring(self, col, row, radius):
+        if radius == 0:
+            yield col, row
+            return
+        for c in range(col - radius, col + radius + 1):
+            yield c, row - radius
+            yield c, row + radius
+        for r in range(row - radius + 1, row + radius):
+            yield col - radius, r
+            yield col + radius, r
+
+    def nearest(self, x, y, k):
+        """
+        The k rooms closest to (x, y) as [(distance, pin), ...]. Rings of
+        cells are scanned outwards until no unvisited cell can hold a
+        closer room than the k-th found so far.
+        """
+        if not self.pins:
+            return []
+        col, row = self.cell(x, y)
+        min_col, min_row, max_col, max_row = self.bounds
+        if not (min_col <= col <= max_col and min_row <= row <= max_row):
+            # From outside the occupied cells the rings would have to grow
+            # as far as the point is away; compare against every room.
+            closest = heapq.nsmallest(k, (
+                (math.hypot(pin["map_x"] - x, pin["map_y"] - y), room_id) for room_id, pin in self.pins.items()
+            ))
+            return [(distance, self.pins[room_id]) for distance, room_id in closest]
+        # Inside the bounds no ring needs to reach past the grid's extent.
+        max_radius = max(col - min_col, max_col - col, row - min_row, max_row - row)
+
+        best = []  # max-heap of (-distance, id)
+        for radius in range(max_radius + 1):
+            for key in self._ring(col, row, radius):
+                for room_id in self.cells.get(key, ()):
+                    pin = self.pins[room_id]
+                    distance = math.hypot(pin["map_x"] - x, pin["map_y"] - y)
+                    if len(best) < k:
+                        heapq.heappush(best, (-distance, room_id))
+                    elif distance < -best[0][0]:
+                        heapq.heapreplace(best, (-distance, room_id))
+            # Anything beyond this ring is at least radius * size away.
+            if len(best) == k and -best[0][0] <= radius * self.size:
+                break
+        return [(distance, self.pins[room_id]) for distance, room_id in sorted((-d, i) for d, i in best)]
+
+
+class SpatialIndex:
+    """
+    One FloorGrid per floor map, loaded on first use and kept current by
+    the catalog signals when rooms move, change floor or disappear.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._grids = {}
+        # room id -> floor map id of the grid holding it
+        self._room_floors = {}
+
+    def reset(self):
+        with self._lock:
+            self._grids = {}
+            self._room_floors = {}
+
+    def grid(self, floor_map_id):
+        """
+        The grid for `floor_map_id`, or None if there is no such floor map.
+        """
+        with self._lock:
+            grid = self._grids.get(floor_map_id)
+        if grid is not None:
+            return grid
+
+        if not FloorMap.objects.filter(pk=floor_map_id).exists():
+            return None
+        rooms = list(Room.objects.filter(
+            floor_map_id=floor_map_id, map_x__isnull=False, map_y__isnull=False
+        ).values(*PIN_FIELDS))
+
+        grid = FloorGrid(cell_size())
+        with self._lock:
+            for pin in rooms:
+                grid.insert(pin)
+                self._room_floors[pin["id"]] = floor_map_id
+            return self._grids.setdefault(floor_map_id, grid)
+
+    def _remove_room(self, room_id):
+        floor_map_id = self._room_floors.pop(room_id, None)
+        grid = self._grids.get(floor_map_id)
+        if grid is not None:
+            grid.remove(room_id)
+
+    def add(self, instance):
+        if not isinstance(instance, Room):
+            return
+        with self._lock:
+            self._remove_room(instance.pk)
+            grid = self._grids.get(instance.floor_map_id)
+            # Floors nobody has asked about yet load from the DB later.
+            if grid is None or instance.map_x is None or instance.map_y is None:
+                return
+            grid.insert({field: getattr(instance, field) for field in PIN_FIELDS})
+            self._room_floors[instance.pk] = instance.floor_map_id
+
+    def discard(self, instance):
+        with self._lock:
+            if isinstance(instance, Room):
+                self._remove_room(instance.pk)
+            elif isinstance(instance, FloorMap):
+                # Its rooms get floor_map=NULL through an UPDATE, which sends
+                # no signals, so drop the whole grid here.
+                grid = self._grids.pop(instance.pk, None)
+                for room_id in grid.pins if grid is not None else ():
+                    self._room_floors.pop(room_id, None)
+
+
+index = SpatialIndex()
@@ -0,0 +1,13 @@
+# uni/storage.py
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+
+def overwrite(path, data):
+    """
+    Store `data` at exactly `path`, replacing any file already there
+    (default_storage.save would pick a new name instead).
+    """
+    if default_storage.exists(path):
+        default_storage.delete(path)
+    default_storage.save(path, ContentFile(data))
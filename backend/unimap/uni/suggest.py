@@ -0,0 +1,181 @@
+# uni/suggest.py
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+
+from .models import Room
+from .search_index import INDEXED_MODELS, normalize, _spec
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 25
+# Hard cap on the time spent walking the trie for one request.
+DEFAULT_BUDGET_MS = 5
+
+
+def terms(text):
+    """
+    The normalized text plus every suffix starting at a word, so "ik f01"
+    can be completed from "ik" as well as from "f0".
+    """
+    words = text.split(" ")
+    return {" ".join(words[i:]) for i in range(len(words)) if words[i]}
+
+
+class _Node:
+    __slots__ = ("children", "keys")
+
+    def __init__(self):
+        self.children = {}
+        self.keys = set()
+
+
+class SuggestTrie:
+    """
+    Prefix trie over campus, building and room names and aliases. Like the
+    search index it is loaded once per process and then maintained by the
+    catalog signals, so suggestions are answered without the DB.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._built = False
+        self._root = _Node()
+        # (model label, pk) -> (kind, result id, normalized text)
+        self._sources = {}
+        # (kind, id) -> {"label": ..., "building": building id or None}
+        self._entries = {}
+
+    def reset(self):
+        with self._lock:
+            self._built = False
+            self._root = _Node()
+            self._sources = {}
+            self._entries = {}
+
+    def build(self):
+        with self._lock:
+            self.reset()
+            for model, kind, id_attr in INDEXED_MODELS:
+                for pk, owner_id, name in model.objects.values_list("pk", id_attr, "name"):
+                    if id_attr == "pk":
+                        self._entries[(kind, pk)] = {"label": name, "building": None}
+                    self._add_source((model._meta.label_lower, pk), kind, owner_id, name)
+            for pk, building_id in Room.objects.values_list("pk", "building_id"):
+                self._entries[("room", pk)]["building"] = building_id
+            self._built = True
+
+    def _ensure_built(self):
+        if not self._built:
+            with self._lock:
+                if not self._built:
+                    self.build()
+
+    def _add_source(self, key, kind, owner_id, name):
+        self._remove_source(key)
+        if owner_id is None:
+            return
+        text = normalize(name)
+        self._sources[key] = (kind, owner_id, text)
+        for term in terms(text):
+            node = self._root
+            for ch in term:
+                node = node.children.setdefault(ch, _Node())
+            node.keys.add(key)
+
+    def _remove_source(self, key):
+        source = self._sources.pop(key, None)
+        if source is None:
+            return
+        for term in terms(source[2]):
+            path = [self._root]
+            for ch in term:
+                node = path[-1].children.get(ch)
+                if node is None:
+                    break
+                path.append(node)
+            else:
+                path[-1].keys.discard(key)
+                # Prune the branch back up to the first node still in use.
+                for depth in range(len(term), 0, -1):
+                    node = path[depth]
+                    if node.keys or node.children:
+                        break
+                    del path[depth - 1].children[term[depth - 1]]
+
+    def add(self, instance):
+        spec = _spec(type(instance))
+        if spec is None:
+            return
+        with self._lock:
+            if not self._built:
+                return
+            kind, id_attr = spec
+            if id_attr == "pk":
+                # Only rooms carry a parent building.
+                self._entries[(kind, instance.pk)] = {
+                    "label": instance.name,
+                    "building": getattr(instance, "building_id", None),
+                }
+            self._add_source((instance._meta.label_lower, instance.pk), kind, getattr(instance, id_attr), instance.name)
+
+    def discard(self, instance):
+        spec = _spec(type(instance))
+        if spec is None:
+            return
+        with self._lock:
+            if not self._built:
+                return
+            if spec[1] == "pk":
+                self._entries.pop((spec[0], instance.pk), None)
+            self._remove_source((instance._meta.label_lower, instance.pk))
+
+    def suggest(self, query, limit=DEFAULT_LIMIT, budget_ms=None):
+        """
+        Return up to `limit` suggestions for `query`, shortest completions
+        first, and whether the walk was cut short by the latency budget.
+        """
+        self._ensure_built()
+        if budget_ms is None:
+            budget_ms = getattr(settings, "UNI_SUGGEST_BUDGET_MS", DEFAULT_BUDGET_MS)
+        deadline = time.perf_counter() + budget_ms / 1000
+        text = normalize(query)
+        results = []
+        if not text:
+            return results, False
+
+        with self._lock:
+            node = self._root
+            for ch in text:
+                node = node.children.get(ch)
+                if node is None:
+                    return results, False
+
+            seen = set()
+            queue = deque([node])
+            while queue:
+                if time.perf_counter() > deadline:
+                    return results, True
+                node = queue.popleft()
+                for key in sorted(node.keys):
+                    kind, owner_id, _ = self._sources[key]
+                    entry = self._entries.get((kind, owner_id))
+                    if entry is None or (kind, owner_id) in seen:
+                        continue
+                    seen.add((kind, owner_id))
+                    results.append(self._suggestion(kind, owner_id, entry))
+                    if len(results) >= limit:
+                        return results, False
+                queue.extend(child for _, child in sorted(node.children.items()))
+        return results, False
+
+    def _suggestion(self, kind, pk, entry):
+        building = None
+        if entry["building"] is not None:
+            parent = self._entries.get(("building", entry["building"]))
+            building = {"id": entry["building"], "name": parent["label"] if parent else None}
+        return {"id": pk, "kind": kind, "label": entry["label"], "building": building}
+
+
+trie = SuggestTrie()
@@ -1,4 +1,5 @@
-from django.test import SimpleTestCase
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
 from django.apps import apps
 from uni.apps import UniConfig  # :contentReference[oaicite:6]{index=6}
 
@@ -15,3 +16,20 @@ class UniAppsTest(SimpleTestCase):
     def test_registered(self):
         config = apps.get_app_config('uni')
         self.assertEqual(config.name, UniConfig.name)
+
+    @override_settings(DEBUG=False)
+    def test_refuses_a_local_catalog_cache_without_debug(self):
+        config = apps.get_app_config('uni')
+        with self.assertRaises(ImproperlyConfigured):
+            config.ready()
+
+    @override_settings(DEBUG=False, CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+                    'LOCATION': 'redis://localhost:6379/0'},
+    })
+    def test_accepts_a_shared_catalog_cache(self):
+        apps.get_app_config('uni').ready()
+
+    @override_settings(DEBUG=True)
+    def test_debug_allows_a_local_catalog_cache(self):
+        apps.get_app_config('uni').ready()
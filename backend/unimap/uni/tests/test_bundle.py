@@ -0,0 +1,69 @@
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from uni.models import Campus, Building, FloorMap, Room, RoomAlias, BuildingAlias
+from uni import bundle
+
+
+class UniBundleViewTests(APITestCase):
+    bundle_url = "/api/uni/bundle/"
+
+    def setUp(self):
+        bundle.clear()
+        self.campus = Campus.objects.create(name="Kassai Campus", address="Kassai út 26", maps_url="http://maps")
+        self.other_campus = Campus.objects.create(name="Main Campus", address="Egyetem tér 1", maps_url="http://maps")
+        self.building = Building.objects.create(
+            name="IK", campus=self.campus, address="B Addr", maps_url="http://maps"
+        )
+        BuildingAlias.objects.create(building=self.building, name="Informatikai Kar")
+        self.floor1 = FloorMap.objects.create(building=self.building, floor_number=1, image="images/floor_maps/f1.jpg")
+        self.floor0 = FloorMap.objects.create(building=self.building, floor_number=0, image="images/floor_maps/f0.jpg")
+        self.room = Room.objects.create(name="IF01", type="seminar room", building=self.building, floor_map=self.floor0)
+        RoomAlias.objects.create(room=self.room, name="Seminar One")
+        self.loose_room = Room.objects.create(name="Kiosk", type="cafeteria", building=self.building)
+
+    def test_nested_hierarchy(self):
+        res = self.client.get(self.bundle_url)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        campuses = res.json()["campuses"]
+        self.assertEqual([c["name"] for c in campuses], ["Kassai Campus", "Main Campus"])
+
+        building = campuses[0]["buildings"][0]
+        self.assertEqual(building["aliases"], ["Informatikai Kar"])
+        self.assertEqual([f["floor_number"] for f in building["floors"]], [0, 1])
+        self.assertEqual(building["floors"][0]["rooms"][0]["aliases"], ["Seminar One"])
+        self.assertEqual(building["floors"][1]["rooms"], [])
+        self.assertEqual([r["id"] for r in building["rooms_without_floor"]], [self.loose_room.id])
+
+    def test_single_campus(self):
+        res = self.client.get(self.bundle_url, {"campus": self.other_campus.id})
+        self.assertEqual([c["id"] for c in res.json()["campuses"]], [self.other_campus.id])
+
+        res = self.client.get(self.bundle_url, {"campus": "x"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_unknown_campus_is_not_cached(self):
+        res = self.client.get(self.bundle_url, {"campus": self.other_campus.id + 100})
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(len(bundle._blobs), 0)
+
+    def test_cache_is_bounded(self):
+        campuses = [Campus.objects.create(name=f"C{i}", address="A", maps_url="http://maps")
+                    for i in range(bundle.MAX_ENTRIES + 5)]
+        for campus in campuses:
+            self.client.get(self.bundle_url, {"campus": campus.id})
+        self.assertEqual(len(bundle._blobs), bundle.MAX_ENTRIES)
+
+    def test_blob_reused_until_catalog_changes(self):
+        first = self.client.get(self.bundle_url)
+        with self.assertNumQueries(0):
+            second = self.client.get(self.bundle_url)
+        self.assertEqual(first["ETag"], second["ETag"])
+
+        res = self.client.get(self.bundle_url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.room.name = "IF01 Lab"
+        self.room.save()
+        third = self.client.get(self.bundle_url)
+        self.assertNotEqual(first["ETag"], third["ETag"])
@@ -0,0 +1,140 @@
+import io
+import json
+import tempfile
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from uni import catalog, routing
+from uni.models import Campus, Building, FloorMap, Room, BuildingAlias, RoomAlias
+from uni.importer import iter_json
+from uni.tiling import tile_floor_map
+from uni.search_index import index as search_index
+
+
+class ImportCatalogTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmpdir = tmp.name
+
+    def import_file(self, name, content, *args):
+        path = f"{self.tmpdir}/{name}"
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        out = io.StringIO()
+        call_command("import_catalog", path, *args, stdout=out)
+        return out.getvalue()
+
+    def catalog(self):
+        return [
+            {"kind": "campus", "name": "Kassai Campus", "address": "Kassai út 26", "maps_url": "http://maps"},
+            {"kind": "building", "campus": "Kassai Campus", "name": "IK", "address": "a", "maps_url": "http://maps"},
+            {"kind": "floormap", "building": "IK", "floor_number": 1, "image": "images/floor_maps/f1.jpg"},
+            {"kind": "room", "building": "IK", "name": "IF01", "type": "seminar room", "floor": 1, "map_x": 10, "map_y": 20},
+            {"kind": "room", "building": "IK", "name": "IF02", "type": "laboratory"},
+            {"kind": "building_alias", "building": "IK", "name": "Informatika"},
+            {"kind": "room_alias", "building": "IK", "room": "IF01", "name": "Seminar One"},
+        ]
+
+    def test_json_import_and_upsert(self):
+        records = self.catalog()
+        out = self.import_file("catalog.json", json.dumps(records), "--chunk-size", "2")
+        self.assertIn("records/s", out)
+
+        room = Room.objects.get(name="IF01")
+        self.assertEqual(room.floor_map, FloorMap.objects.get())
+        self.assertEqual(room.building, Building.objects.get(name="IK"))
+        self.assertEqual(RoomAlias.objects.get().room, room)
+        self.assertEqual(BuildingAlias.objects.count(), 1)
+
+        records[3]["type"] = "lecture hall"
+        self.import_file("catalog.jsonl", "\n".join(json.dumps(r) for r in records))
+        self.assertEqual(Campus.objects.count(), 1)
+        self.assertEqual(Room.objects.count(), 2)
+        self.assertEqual(RoomAlias.objects.count(), 1)
+        room.refresh_from_db()
+        self.assertEqual(room.type, "lecture hall")
+        self.assertEqual((room.map_x, room.map_y), (10, 20))
+
+    def test_csv_and_fixture_format(self):
+        self.import_file("catalog.json", json.dumps(self.catalog()[:2]))
+        building = Building.objects.get()
+
+        self.import_file("rooms.csv", "building,name,type,map_x\nIK,IF03,cafeteria,5.5\nIK,IF04,laboratory,\n",
+                         "--kind", "room")
+        self.assertEqual(Room.objects.get(name="IF03").map_x, 5.5)
+        self.assertIsNone(Room.objects.get(name="IF04").map_x)
+
+        fixture = [{"model": "uni.room", "pk": 1001, "fields": {
+            "name": "IF03", "type": "laboratory", "floor_map": None, "building": building.pk,
+        }}]
+        self.import_file("fixture.json", json.dumps(fixture))
+        self.assertEqual(Room.objects.get(name="IF03").type, "laboratory")
+        self.assertEqual(Room.objects.count(), 2)
+
+    def test_fixture_pks_are_remapped(self):
+        self.import_file("catalog.json", json.dumps(self.catalog()[:2]))
+        Room.objects.create(building=Building.objects.get(), name="Taken", type="cafeteria")
+        taken = Room.objects.get().pk
+        fixture = [
+            {"model": "uni.building", "pk": 500, "fields": {
+                "campus": Campus.objects.get().pk, "name": "GK", "address": "b", "maps_url": "http://maps"}},
+            {"model": "uni.room", "pk": taken, "fields": {"name": "GF01", "type": "laboratory", "building": 500}},
+            {"model": "uni.roomalias", "pk": 1, "fields": {"room": taken, "name": "Lab One"}},
+        ]
+        self.import_file("fixture.json", json.dumps(fixture))
+        room = Room.objects.get(name="GF01")
+        self.assertNotEqual(room.pk, taken)
+        self.assertEqual(room.building.name, "GK")
+        self.assertEqual(RoomAlias.objects.get().room, room)
+
+        with self.assertRaisesMessage(CommandError, "Unknown room(s) 999999"):
+            self.import_file("alias.json", json.dumps([
+                {"model": "uni.roomalias", "pk": 2, "fields": {"room": 999999, "name": "Ghost"}},
+            ]))
+
+    def test_csv_numbers_are_checked(self):
+        self.import_file("catalog.json", json.dumps(self.catalog()[:2]))
+        with self.assertRaisesMessage(CommandError, "Line 3: map_x must be a number, not 'left'"):
+            self.import_file("rooms.csv", "building,name,type,map_x\nIK,IF03,cafeteria,5.5\nIK,IF04,laboratory,left\n",
+                             "--kind", "room")
+
+    def test_indexes_see_imported_rooms(self):
+        self.import_file("catalog.json", json.dumps(self.catalog()[:4]))
+        search_index.build()
+        self.import_file("more.json", json.dumps([
+            {"kind": "room", "building": "IK", "name": "Aula Magna", "type": "lecture hall"},
+        ]))
+        self.assertTrue(search_index.search("aula magna")["room"])
+
+    def test_errors_name_the_record(self):
+        with self.assertRaisesMessage(CommandError, "Record 1: Unknown building 'Nowhere'"):
+            self.import_file("bad.json", json.dumps([{"kind": "room", "building": "Nowhere", "name": "X", "type": "cafeteria"}]))
+        with self.assertRaisesMessage(CommandError, "Invalid JSON"):
+            self.import_file("broken.json", '[{"kind": "campus", ')
+
+    def test_iter_json_across_reads(self):
+        records = [{"kind": "campus", "name": f"Campus {i}", "pad": "x" * 1000} for i in range(200)]
+        self.assertEqual(list(iter_json(io.StringIO(json.dumps(records)))), records)
+
+    def test_iter_json_with_small_reads(self):
+        records = [{"kind": "campus", "name": f"Campus {i}"} for i in range(50)]
+        text = "\n".join(json.dumps(r) for r in records)
+        with patch("uni.importer.READ_SIZE", 7):
+            self.assertEqual(list(iter_json(io.StringIO(text))), records)
+            self.assertEqual(list(iter_json(io.StringIO(json.dumps(records)))), records)
+
+    def test_imported_floor_maps_are_tiled_and_reroute(self):
+        self.import_file("catalog.json", json.dumps(self.catalog()[:2]))
+        building = Building.objects.get(name="IK")
+        nav_version = catalog.scope_version(routing.scope(building.pk))
+        with patch("uni.importer.run_after_commit") as queued:
+            self.import_file("maps.json", json.dumps([
+                self.catalog()[2],
+                {"kind": "floormap", "building": "IK", "floor_number": 2},
+            ]))
+        queued.assert_called_once_with(tile_floor_map, FloorMap.objects.get(floor_number=1).pk)
+        self.assertNotEqual(catalog.scope_version(routing.scope(building.pk)), nav_version)
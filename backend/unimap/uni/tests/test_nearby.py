@@ -0,0 +1,64 @@
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from uni.models import Campus, Building, FloorMap, Room
+from uni.nearby import index as facility_index
+
+
+@override_settings(UNI_NEAREST_FLOOR_PENALTY=25.0)
+class NearestFacilityTests(APITestCase):
+    def setUp(self):
+        facility_index.reset()
+        campus = Campus.objects.create(name="Kassai Campus", address="Kassai út 26", maps_url="http://maps")
+        self.building = Building.objects.create(name="IK", campus=campus, address="a", maps_url="http://maps")
+        other = Building.objects.create(name="Main", campus=campus, address="b", maps_url="http://maps")
+        self.ground = FloorMap.objects.create(building=self.building, floor_number=0, image="images/floor_maps/f0.jpg")
+        self.first = FloorMap.objects.create(building=self.building, floor_number=1, image="images/floor_maps/f1.jpg")
+        other_floor = FloorMap.objects.create(building=other, floor_number=0, image="images/floor_maps/m0.jpg")
+
+        room = lambda name, type, floor, x, y, building=self.building: Room.objects.create(
+            name=name, type=type, building=building, floor_map=floor, map_x=x, map_y=y
+        )
+        self.hall = room("IF01", "lecture hall", self.ground, 10, 10)
+        self.far = room("WC far", "male washroom", self.ground, 90, 10)
+        self.upstairs = room("WC up", "male washroom", self.first, 10, 20)
+        room("WC other", "male washroom", other_floor, 10, 10, other)
+        room("WC female", "female washroom", self.ground, 11, 10)
+
+    def nearest(self, room, **params):
+        return self.client.get(f"/api/uni/rooms/{room.id}/nearest/", params)
+
+    def test_floor_penalty_and_scope(self):
+        res = self.nearest(self.hall, type="male washroom", k=5)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        # Upstairs is 10 away plus one floor (25); the far one is 80 away.
+        self.assertEqual([r["id"] for r in res.data], [self.upstairs.id, self.far.id])
+        self.assertAlmostEqual(res.data[0]["distance"], 35.0)
+
+    def test_index_follows_room_changes(self):
+        self.nearest(self.hall, type="male washroom")
+        self.far.map_x = 12
+        self.far.save()
+        self.assertEqual(self.nearest(self.hall, type="male washroom").data[0]["id"], self.far.id)
+
+        self.far.type = "cafeteria"
+        self.far.save()
+        self.assertEqual([r["id"] for r in self.nearest(self.hall, type="cafeteria").data], [self.far.id])
+        self.assertEqual([r["id"] for r in self.nearest(self.hall, type="male washroom", k=5).data], [self.upstairs.id])
+
+        self.first.floor_number = 4
+        self.first.save()
+        self.assertAlmostEqual(self.nearest(self.hall, type="male washroom").data[0]["distance"], 110.0)
+
+    def test_cached_groups(self):
+        self.nearest(self.hall, type="male washroom")
+        with self.assertNumQueries(2):  # the origin room and the results
+            self.nearest(self.hall, type="male washroom")
+
+    def test_errors(self):
+        self.assertEqual(self.nearest(self.hall, type="pool").status_code, status.HTTP_400_BAD_REQUEST)
+        unplaced = Room.objects.create(name="Nowhere", type="laboratory", building=self.building)
+        self.assertEqual(self.nearest(unplaced, type="cafeteria").status_code, status.HTTP_400_BAD_REQUEST)
+        res = self.client.get("/api/uni/rooms/999999/nearest/", {"type": "cafeteria"})
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
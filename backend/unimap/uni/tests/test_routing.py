@@ -0,0 +1,87 @@
+from unittest.mock import patch
+
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from uni import routing
+from uni.models import Campus, Building, FloorMap, Room, NavNode, NavEdge
+
+
+@override_settings(UNI_ROUTE_FLOOR_COST=20.0)
+class RouteViewTests(APITestCase):
+    route_url = "/api/uni/route/"
+
+    def setUp(self):
+        campus = Campus.objects.create(name="Kassai Campus", address="Kassai út 26", maps_url="http://maps")
+        self.building = Building.objects.create(name="IK", campus=campus, address="a", maps_url="http://maps")
+        self.ground = FloorMap.objects.create(building=self.building, floor_number=0, image="images/floor_maps/f0.jpg")
+        self.first = FloorMap.objects.create(building=self.building, floor_number=1, image="images/floor_maps/f1.jpg")
+
+        self.lab = Room.objects.create(name="Lab", type="laboratory", building=self.building, floor_map=self.ground)
+        self.hall = Room.objects.create(name="Hall", type="lecture hall", building=self.building, floor_map=self.first)
+        self.lonely = Room.objects.create(name="Closet", type="seminar room", building=self.building, floor_map=self.first)
+
+        node = lambda floor, x, y, kind="corridor", room=None: NavNode.objects.create(
+            building=self.building, floor_map=floor, kind=kind, room=room, x=x, y=y
+        )
+        lab_door = node(self.ground, 0, 0, "room", self.lab)
+        corridor = node(self.ground, 30, 40)
+        self.stairs0 = node(self.ground, 30, 80, "stairs")
+        self.stairs1 = node(self.first, 30, 80, "stairs")
+        hall_door = node(self.first, 30, 90, "room", self.hall)
+        node(self.first, 90, 90, "room", self.lonely)
+
+        for a, b in [(lab_door, corridor), (corridor, self.stairs0), (self.stairs0, self.stairs1), (self.stairs1, hall_door)]:
+            NavEdge.objects.create(a=a, b=b)
+        self.path_ids = [lab_door.id, corridor.id, self.stairs0.id, self.stairs1.id, hall_door.id]
+
+    def route(self, a, b):
+        return self.client.get(self.route_url, {"from": a.id, "to": b.id})
+
+    def test_route_across_floors(self):
+        res = self.route(self.lab, self.hall)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([n["id"] for n in res.data["path"]], self.path_ids)
+        self.assertAlmostEqual(res.data["distance"], 50 + 40 + 20 + 10)
+        self.assertEqual([n["floor_number"] for n in res.data["path"]], [0, 0, 0, 1, 1])
+
+        back = self.route(self.hall, self.lab)
+        self.assertEqual([n["id"] for n in back.data["path"]], list(reversed(self.path_ids)))
+
+    def test_routes_are_precomputed(self):
+        self.route(self.lab, self.hall)
+        with self.assertNumQueries(1):  # only the room -> building lookup
+            self.route(self.hall, self.lab)
+
+    def test_graph_change_invalidates(self):
+        self.route(self.lab, self.hall)
+        NavEdge.objects.filter(a=self.stairs0, b=self.stairs1).get().delete()
+        self.assertEqual(self.route(self.lab, self.hall).status_code, status.HTTP_404_NOT_FOUND)
+
+        elevator0 = NavNode.objects.create(building=self.building, floor_map=self.ground, kind="elevator", x=30, y=80)
+        elevator1 = NavNode.objects.create(building=self.building, floor_map=self.first, kind="elevator", x=30, y=80)
+        NavEdge.objects.create(a=self.stairs0, b=elevator0, weight=1)
+        NavEdge.objects.create(a=elevator0, b=elevator1, weight=5)
+        NavEdge.objects.create(a=elevator1, b=self.stairs1, weight=1)
+        self.assertAlmostEqual(self.route(self.lab, self.hall).data["distance"], 50 + 40 + 7 + 10)
+
+    @override_settings(UNI_ROUTE_REBUILD_DELAY=3600, UNI_CATALOG_SNAPSHOTS=False)
+    def test_graph_edits_rebuild_once_per_building(self):
+        self.addCleanup(routing.cancel_pending)
+        with self.captureOnCommitCallbacks(execute=True):
+            for edge in NavEdge.objects.all():
+                edge.save()
+            self.first.floor_number = 2
+            self.first.save()
+        with patch("uni.routing.routes_for") as routes_for:
+            routing.build_pending()
+        routes_for.assert_called_once_with(self.building.id)
+
+        self.assertAlmostEqual(self.route(self.lab, self.hall).data["distance"], 50 + 40 + 40 + 10)
+
+    def test_errors(self):
+        self.assertEqual(self.route(self.lab, self.lonely).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(self.route_url, {"from": "x"}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.route_url, {"from": self.lab.id, "to": 999999}).status_code,
+                         status.HTTP_404_NOT_FOUND)
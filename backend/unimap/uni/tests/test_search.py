@@ -0,0 +1,155 @@
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from uni.models import Campus, Building, FloorMap, Room, BuildingAlias, RoomAlias
+from uni.search_index import index as search_index, normalize
+from uni.fuzzy import tree as fuzzy_rooms, compact, levenshtein
+from uni.search_cache import search_cache
+
+
+class NormalizeTest(SimpleTestCase):
+    def test_folds_accents_and_case(self):
+        self.assertEqual(normalize("Épület"), normalize("epulet"))
+        self.assertEqual(normalize("  Informatikai   Kar "), "informatikai kar")
+
+    def test_compact_and_distance(self):
+        self.assertEqual(compact("IK-F01"), compact("IK F 01"))
+        self.assertEqual(levenshtein(compact("IK-F01"), "if01"), 1)
+
+
+class UniSearchViewTests(APITestCase):
+    search_url = "/api/uni/search/"
+
+    def setUp(self):
+        search_index.reset()
+        fuzzy_rooms.reset()
+        self.campus = Campus.objects.create(name="Kassai Campus", address="Kassai út 26", maps_url="http://maps")
+        self.building = Building.objects.create(
+            name="Informatikai Épület", campus=self.campus, address="B Addr", maps_url="http://maps"
+        )
+        BuildingAlias.objects.create(building=self.building, name="IK")
+        self.room = Room.objects.create(name="IF01", type="seminar room", building=self.building)
+        RoomAlias.objects.create(room=self.room, name="Seminar One")
+
+    def search(self, q):
+        res = self.client.get(self.search_url, {"q": q})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data
+
+    def test_room_match_includes_parents(self):
+        data = self.search("if0")
+        self.assertEqual(data["matched_type"], "room")
+        self.assertEqual([r["id"] for r in data["rooms"]], [self.room.id])
+        self.assertEqual([b["id"] for b in data["buildings"]], [self.building.id])
+        self.assertEqual([c["id"] for c in data["campuses"]], [self.campus.id])
+
+    def test_alias_match(self):
+        data = self.search("seminar one")
+        self.assertEqual(data["matched_type"], "room")
+
+    def test_accent_folding(self):
+        data = self.search("epulet")
+        self.assertEqual(data["matched_type"], "building")
+        self.assertEqual(data["rooms"], [])
+
+    def test_campus_match(self):
+        data = self.search("kassai")
+        self.assertEqual(data["matched_type"], "campus")
+
+    def test_no_match(self):
+        data = self.search("zzz")
+        self.assertIsNone(data["matched_type"])
+
+    def test_fuzzy_fallback(self):
+        for q in ("IK-F01", "IK F 01", "if01"):
+            data = self.search(q)
+            self.assertEqual(data["matched_type"], "room", q)
+            self.assertEqual([r["id"] for r in data["rooms"]], [self.room.id])
+        self.assertTrue(self.search("IK-F01")["fuzzy"])
+        self.assertFalse(self.search("IF01")["fuzzy"])
+
+    def test_fuzzy_ranks_closest_first(self):
+        closer = Room.objects.create(name="IF011", type="laboratory", building=self.building)
+        data = self.search("IF-0111")
+        self.assertEqual([r["id"] for r in data["rooms"]], [closer.id, self.room.id])
+
+    def test_missing_query(self):
+        res = self.client.get(self.search_url)
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_index_follows_saves_and_deletes(self):
+        self.search("if01")  # build the index
+
+        self.room.name = "Lab 7"
+        self.room.save()
+        RoomAlias.objects.filter(room=self.room).delete()
+        self.assertEqual(self.search("lab 7")["matched_type"], "room")
+        self.assertNotEqual(self.search("if01")["matched_type"], "room")
+
+        self.room.delete()
+        self.assertNotEqual(self.search("lab 7")["matched_type"], "room")
+
+    def test_query_budget(self):
+        search_index.build()
+        fuzzy_rooms.build()
+        other = Building.objects.create(name="IF Annex", campus=self.campus, address="a", maps_url="http://maps")
+        Room.objects.create(name="IF02", type="laboratory", building=other)
+
+        # Index lookup is in memory, hydration is one joined query per request.
+        with self.assertNumQueries(1):
+            data = self.search("if0")
+        self.assertEqual(len(data["rooms"]), 2)
+        self.assertEqual([b["name"] for b in data["buildings"]], ["IF Annex", "Informatikai Épület"])
+        self.assertEqual(len(data["campuses"]), 1)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.search("epulet")["matched_type"], "building")
+        with self.assertNumQueries(1):
+            self.assertEqual(self.search("kassai")["matched_type"], "campus")
+        with self.assertNumQueries(0):
+            self.assertIsNone(self.search("zzz")["matched_type"])
+
+
+class SearchCacheTests(APITestCase):
+    search_url = "/api/uni/search/"
+
+    def setUp(self):
+        search_cache.clear()
+        self.campus = Campus.objects.create(name="Kassai Campus", address="Kassai út 26", maps_url="http://maps")
+        self.building = Building.objects.create(
+            name="Informatikai Épület", campus=self.campus, address="B Addr", maps_url="http://maps"
+        )
+        self.room = Room.objects.create(name="IF01", type="seminar room", building=self.building)
+
+    def search(self, q):
+        return self.client.get(self.search_url, {"q": q})
+
+    def test_repeated_query_is_served_from_cache(self):
+        self.assertEqual(self.search("IF01")["X-Search-Cache"], "miss")
+        with self.assertNumQueries(0):
+            res = self.search("  if01 ")
+        self.assertEqual(res["X-Search-Cache"], "hit")
+        self.assertEqual(res.data["rooms"][0]["id"], self.room.id)
+        self.assertEqual(search_cache.stats()["hits"], 1)
+        self.assertEqual(search_cache.stats()["misses"], 1)
+
+    def test_catalog_change_invalidates(self):
+        self.search("IF01")
+        FloorMap.objects.create(building=self.building, floor_number=1, image="images/floor_maps/f1.jpg")
+        self.assertEqual(self.search("IF01")["X-Search-Cache"], "miss")
+
+        self.room.name = "IF01 Lab"
+        self.room.save()
+        res = self.search("IF01")
+        self.assertEqual(res["X-Search-Cache"], "miss")
+        self.assertEqual(res.data["rooms"][0]["name"], "IF01 Lab")
+
+    @override_settings(UNI_SEARCH_CACHE={"BACKEND": "django", "ALIAS": "default", "TIMEOUT": 60})
+    def test_django_cache_backend(self):
+        self.assertEqual(self.search("IF01")["X-Search-Cache"], "miss")
+        self.assertEqual(self.search("IF01")["X-Search-Cache"], "hit")
+        self.room.delete()
+        res = self.search("IF01")
+        self.assertEqual(res["X-Search-Cache"], "miss")
+        self.assertEqual(res.data["rooms"], [])
@@ -0,0 +1,113 @@
+import gzip
+import io
+import json
+import os
+import shutil
+import tempfile
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from rest_framework import status
+from PIL import Image
+
+from uni.models import Campus, Building, FloorMap, Room
+from uni import snapshot
+from uni.tiling import tile_floor_map
+
+
+class CatalogSnapshotTests(APITestCase):
+    snapshot_url = "/api/uni/snapshot/"
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.campus = Campus.objects.create(name="Kassai Campus", address="Kassai út 26", maps_url="http://maps")
+        self.other = Campus.objects.create(name="Ótemető", address="Ótemető u. 2", maps_url="http://maps")
+        building = Building.objects.create(name="IK", campus=self.campus, address="a", maps_url="http://maps")
+        self.room = Room.objects.create(name="IF01", type="seminar room", building=building)
+
+    def files(self):
+        return sorted(os.listdir(os.path.join(self.media_root, snapshot.SNAPSHOT_ROOT)))
+
+    def read(self, name):
+        with open(os.path.join(self.media_root, name), "rb") as f:
+            return f.read()
+
+    def test_build_and_manifest(self):
+        self.assertEqual(self.client.get(self.snapshot_url).status_code, status.HTTP_404_NOT_FOUND)
+        call_command("build_catalog_snapshot", stdout=io.StringIO())
+
+        res = self.client.get(self.snapshot_url)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        entry = res.data["campuses"][str(self.campus.id)]
+        self.assertTrue(entry["urls"]["identity"].startswith("http://testserver/media/static/catalog/"))
+        self.assertIn("no-cache", res["Cache-Control"])
+
+        files = snapshot.read_manifest()["campuses"][str(self.campus.id)]["files"]
+        blob = self.read(files["identity"])
+        self.assertEqual(json.loads(blob)["campuses"][0]["buildings"][0]["name"], "IK")
+        self.assertEqual(gzip.decompress(self.read(files["gzip"])), blob)
+        if snapshot.brotli is not None:
+            self.assertEqual(snapshot.brotli.decompress(self.read(files["br"])), blob)
+
+        again = self.client.get(self.snapshot_url, HTTP_IF_NONE_MATCH=res["ETag"])
+        self.assertEqual(again.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_only_changed_campuses_get_new_files(self):
+        first = snapshot.build_snapshots()
+        self.room.name = "IF02"
+        self.room.save()
+        second = snapshot.build_snapshots()
+
+        changed, unchanged = str(self.campus.id), str(self.other.id)
+        self.assertNotEqual(first["campuses"][changed]["sha256"], second["campuses"][changed]["sha256"])
+        self.assertEqual(first["campuses"][unchanged]["files"], second["campuses"][unchanged]["files"])
+
+        # The previous generation stays until the one after it replaces it.
+        old = os.path.basename(first["campuses"][changed]["files"]["identity"])
+        self.assertIn(old, self.files())
+        snapshot.build_snapshots()
+        self.assertIn(old, self.files())
+        self.room.name = "IF03"
+        self.room.save()
+        snapshot.build_snapshots()
+        self.assertNotIn(old, self.files())
+
+    def scheduled_builds(self):
+        calls = []
+        original = snapshot.schedule_build
+        snapshot.schedule_build = lambda: calls.append(True)
+        self.addCleanup(setattr, snapshot, "schedule_build", original)
+        return calls
+
+    @override_settings(UNI_CATALOG_SNAPSHOTS=True)
+    def test_catalog_change_schedules_rebuild(self):
+        calls = self.scheduled_builds()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.room.name = "IF09"
+            self.room.save()
+        self.assertEqual(len(calls), 1)
+
+    @override_settings(UNI_CATALOG_SNAPSHOTS=True, UNI_TILE_SIZE=256)
+    def test_tiling_and_import_schedule_rebuild(self):
+        image = io.BytesIO()
+        Image.new("RGB", (64, 64), "white").save(image, format="PNG")
+        floor_map = FloorMap.objects.create(building=self.room.building, floor_number=0,
+                                            image=SimpleUploadedFile("floor.png", image.getvalue()))
+        calls = self.scheduled_builds()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertTrue(tile_floor_map(floor_map.pk))
+        self.assertEqual(len(calls), 1)
+
+        path = os.path.join(self.media_root, "rooms.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump([{"kind": "room", "building": "IK", "name": "IF05", "type": "laboratory"}], f)
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("import_catalog", path, stdout=io.StringIO())
+        self.assertEqual(len(calls), 2)
@@ -0,0 +1,72 @@
+import math
+import random
+
+from django.test import SimpleTestCase
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from uni.models import Campus, Building, FloorMap, Room
+from uni.spatial import FloorGrid, index as spatial_index
+
+
+class FloorGridTest(SimpleTestCase):
+    def test_nearest_matches_brute_force(self):
+        rng = random.Random(7)
+        grid = FloorGrid(5.0)
+        pins = [{"id": i, "name": str(i), "type": "lab", "map_x": rng.uniform(0, 100), "map_y": rng.uniform(0, 100)}
+                for i in range(300)]
+        for pin in pins:
+            grid.insert(pin)
+
+        for x, y in [(0, 0), (50, 50), (99, 3), (-20, 140), (1e12, -1e12)]:
+            expected = sorted(pins, key=lambda p: math.hypot(p["map_x"] - x, p["map_y"] - y))[:5]
+            self.assertEqual([pin["id"] for _, pin in grid.nearest(x, y, 5)], [p["id"] for p in expected])
+
+        inside = {p["id"] for p in pins if 10 <= p["map_x"] <= 30 and 40 <= p["map_y"] <= 45}
+        self.assertEqual({pin["id"] for pin in grid.within(10, 40, 30, 45)}, inside)
+        # A huge box only visits the occupied cells.
+        self.assertEqual(len(grid.within(-1e12, -1e12, 1e12, 1e12)), len(pins))
+
+
+class FloorMapRoomsViewTests(APITestCase):
+    def setUp(self):
+        spatial_index.reset()
+        campus = Campus.objects.create(name="Kassai Campus", address="Kassai út 26", maps_url="http://maps")
+        self.building = Building.objects.create(name="IK", campus=campus, address="a", maps_url="http://maps")
+        self.floor = FloorMap.objects.create(building=self.building, floor_number=0, image="images/floor_maps/f0.jpg")
+        self.other_floor = FloorMap.objects.create(building=self.building, floor_number=1, image="images/floor_maps/f1.jpg")
+        self.a = Room.objects.create(name="A", type="laboratory", building=self.building, floor_map=self.floor, map_x=10, map_y=10)
+        self.b = Room.objects.create(name="B", type="laboratory", building=self.building, floor_map=self.floor, map_x=60, map_y=60)
+        Room.objects.create(name="C", type="laboratory", building=self.building, floor_map=self.other_floor, map_x=11, map_y=11)
+        self.url = f"/api/uni/floormaps/{self.floor.id}/rooms/"
+
+    def test_bbox(self):
+        res = self.client.get(self.url, {"bbox": "0,0,50,50"})
+        self.assertEqual(res.data, [{"id": self.a.id, "name": "A", "type": "laboratory", "map_x": 10.0, "map_y": 10.0}])
+
+    def test_near(self):
+        res = self.client.get(self.url, {"near": "55,55", "k": 2})
+        self.assertEqual([r["id"] for r in res.data], [self.b.id, self.a.id])
+        self.assertAlmostEqual(res.data[0]["distance"], math.hypot(5, 5))
+
+    def test_index_follows_room_changes(self):
+        self.client.get(self.url, {"bbox": "0,0,100,100"})
+        self.b.map_x = 20
+        self.b.map_y = 20
+        self.b.save()
+        with self.assertNumQueries(0):
+            res = self.client.get(self.url, {"bbox": "0,0,50,50"})
+        self.assertEqual([r["id"] for r in res.data], [self.a.id, self.b.id])
+
+        self.a.floor_map = self.other_floor
+        self.a.save()
+        self.b.delete()
+        self.assertEqual(self.client.get(self.url, {"bbox": "0,0,100,100"}).data, [])
+
+    def test_errors(self):
+        self.assertEqual(self.client.get("/api/uni/floormaps/999999/rooms/", {"near": "1,1"}).status_code,
+                         status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {"bbox": "1,2,3"}).status_code, status.HTTP_400_BAD_REQUEST)
+        for params in ({"bbox": "0,0,nan,50"}, {"bbox": "-inf,0,50,50"}, {"near": "inf,1"}):
+            self.assertEqual(self.client.get(self.url, params).status_code, status.HTTP_400_BAD_REQUEST)
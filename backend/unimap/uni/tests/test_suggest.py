@@ -0,0 +1,61 @@
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from uni.models import Campus, Building, Room, RoomAlias
+from uni.suggest import trie as suggest_trie
+
+
+class UniSuggestViewTests(APITestCase):
+    suggest_url = "/api/uni/suggest/"
+
+    def setUp(self):
+        suggest_trie.reset()
+        self.campus = Campus.objects.create(name="Kassai Campus", address="Kassai út 26", maps_url="http://maps")
+        self.building = Building.objects.create(
+            name="IK Épület", campus=self.campus, address="B Addr", maps_url="http://maps"
+        )
+        self.room = Room.objects.create(name="IF01", type="seminar room", building=self.building)
+        RoomAlias.objects.create(room=self.room, name="IK F01")
+        Room.objects.create(name="IF02", type="laboratory", building=self.building)
+
+    def suggest(self, q, **params):
+        res = self.client.get(self.suggest_url, {"q": q, **params})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data["results"]
+
+    def test_prefix_suggestions(self):
+        results = self.suggest("if0")
+        self.assertEqual([r["label"] for r in results], ["IF01", "IF02"])
+        self.assertEqual(results[0], {
+            "id": self.room.id,
+            "kind": "room",
+            "label": "IF01",
+            "building": {"id": self.building.id, "name": "IK Épület"},
+        })
+
+    def test_word_prefix_and_alias(self):
+        results = self.suggest("f01")
+        self.assertEqual([(r["kind"], r["id"]) for r in results], [("room", self.room.id)])
+        self.assertEqual(self.suggest("epu")[0]["kind"], "building")
+
+    def test_limit(self):
+        self.assertEqual(len(self.suggest("i", limit=1)), 1)
+
+    def test_no_db_queries_once_built(self):
+        self.suggest("if")
+        with self.assertNumQueries(0):
+            self.suggest("ik")
+
+    def test_follows_catalog_changes(self):
+        self.suggest("if")
+        self.building.name = "Informatics"
+        self.building.save()
+        self.assertEqual(self.suggest("if01")[0]["building"]["name"], "Informatics")
+
+        self.room.delete()
+        self.assertEqual([r["label"] for r in self.suggest("if0")], ["IF02"])
+        self.assertEqual(self.suggest("f01"), [])
+
+    def test_missing_query(self):
+        res = self.client.get(self.suggest_url)
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
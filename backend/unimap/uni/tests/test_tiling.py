@@ -0,0 +1,85 @@
+import io
+import shutil
+import tempfile
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import override_settings
+from PIL import Image
+from rest_framework.test import APITestCase
+
+from uni.models import Campus, Building, FloorMap
+from uni.tiling import level_count, tile_floor_map, tiles_dir
+
+
+def png(width, height, color="white"):
+    out = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(out, format="PNG")
+    return SimpleUploadedFile("floor.png", out.getvalue(), content_type="image/png")
+
+
+class FloorMapTilingTests(APITestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        # Running on-commit callbacks would also schedule a snapshot build
+        # that outlives the temporary MEDIA_ROOT.
+        override = override_settings(MEDIA_ROOT=self.media_root, UNI_TILE_SIZE=256, UNI_CATALOG_SNAPSHOTS=False)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        campus = Campus.objects.create(name="Kassai Campus", address="Kassai út 26", maps_url="http://maps")
+        self.building = Building.objects.create(name="IK", campus=campus, address="a", maps_url="http://maps")
+        self.floor_map = FloorMap.objects.create(building=self.building, floor_number=0, image=png(600, 300))
+
+    def test_level_count(self):
+        self.assertEqual(level_count(1, 1), 1)
+        self.assertEqual(level_count(600, 300), 11)
+
+    def test_pyramid_and_serializer(self):
+        self.assertTrue(tile_floor_map(self.floor_map.pk))
+        self.floor_map.refresh_from_db()
+        self.assertEqual((self.floor_map.tile_width, self.floor_map.tile_height), (600, 300))
+        self.assertEqual(self.floor_map.tile_levels, 11)
+
+        base = tiles_dir(self.floor_map.pk, self.floor_map.image_hash)
+        # Full resolution level is 3x2 tiles of 256px, level 0 is a single pixel.
+        _, files = default_storage.listdir(f"{base}/floor_files/10")
+        self.assertEqual(sorted(files), ["0_0.jpg", "0_1.jpg", "1_0.jpg", "1_1.jpg", "2_0.jpg", "2_1.jpg"])
+        with default_storage.open(f"{base}/floor_files/0/0_0.jpg") as f:
+            self.assertEqual(Image.open(f).size, (1, 1))
+        self.assertTrue(default_storage.exists(f"{base}/preview.jpg"))
+        self.assertTrue(default_storage.exists(f"{base}/floor.dzi"))
+
+        tiles = self.client.get(f"/api/uni/floormaps/{self.floor_map.pk}/").data["tiles"]
+        self.assertTrue(tiles["url_template"].endswith(f"{base}/floor_files/{{z}}/{{x}}_{{y}}.jpg"))
+        self.assertEqual(tiles["levels"], 11)
+
+    def test_unchanged_image_is_not_retiled(self):
+        self.assertTrue(tile_floor_map(self.floor_map.pk))
+        self.assertFalse(tile_floor_map(self.floor_map.pk))
+
+        old_hash = FloorMap.objects.get(pk=self.floor_map.pk).image_hash
+        self.floor_map.refresh_from_db()
+        self.floor_map.image = png(300, 300, color="black")
+        self.floor_map.save()
+        self.assertTrue(tile_floor_map(self.floor_map.pk))
+        self.assertFalse(default_storage.exists(tiles_dir(self.floor_map.pk, old_hash)))
+
+    def test_untiled_floor_map(self):
+        res = self.client.get(f"/api/uni/floormaps/{self.floor_map.pk}/")
+        self.assertIsNone(res.data["tiles"])
+        self.assertNotIn("image_hash", res.data)
+
+    @override_settings(TASKS_ALWAYS_EAGER=True)
+    def test_upload_is_tiled_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            floor_map = FloorMap.objects.create(building=self.building, floor_number=1, image=png(100, 100))
+        floor_map.refresh_from_db()
+        self.assertEqual(floor_map.tile_levels, 8)
+
+    def test_command(self):
+        out = io.StringIO()
+        call_command("tile_floormaps", stdout=out)
+        self.assertIn("1 floor map(s) tiled", out.getvalue())
@@ -0,0 +1,181 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from uni.models import Campus, Building, FloorMap, Room, RoomAlias
+
+
+class CatalogConditionalGetTests(APITestCase):
+    rooms_url = "/api/uni/rooms/"
+
+    def setUp(self):
+        self.campus = Campus.objects.create(name="Kassai Campus", address="Kassai út 26", maps_url="http://maps")
+        self.building = Building.objects.create(
+            name="IK", campus=self.campus, address="B Addr", maps_url="http://maps"
+        )
+        self.room = Room.objects.create(name="IF01", type="seminar room", building=self.building)
+
+    def test_validators_and_cache_control(self):
+        res = self.client.get(self.rooms_url)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res["ETag"].startswith('"room-'))
+        self.assertIn("Last-Modified", res)
+        self.assertIn("public", res["Cache-Control"])
+        self.assertIn("must-revalidate", res["Cache-Control"])
+
+    def test_if_none_match_short_circuits(self):
+        etag = self.client.get(self.rooms_url)["ETag"]
+        with self.assertNumQueries(0):
+            res = self.client.get(self.rooms_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res["ETag"], etag)
+
+    def test_etag_is_per_url(self):
+        etag = self.client.get(self.rooms_url)["ETag"]
+        for url in (f"{self.rooms_url}{self.room.id}/", f"{self.rooms_url}?fields=id",
+                    f"{self.rooms_url}?limit=1", f"{self.rooms_url}?type=laboratory"):
+            res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(res.status_code, status.HTTP_200_OK, url)
+            self.assertNotEqual(res["ETag"], etag)
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=res["ETag"]).status_code,
+                             status.HTTP_304_NOT_MODIFIED)
+
+    def test_if_modified_since(self):
+        last_modified = self.client.get(self.rooms_url)["Last-Modified"]
+        res = self.client.get(self.rooms_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # A change within the same second still moves Last-Modified on.
+        self.room.name = "IF01 Lab"
+        self.room.save()
+        res = self.client.get(self.rooms_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_deleting_a_floor_map_changes_its_rooms(self):
+        floor = FloorMap.objects.create(building=self.building, floor_number=0, image="images/floor_maps/f0.jpg")
+        self.room.floor_map = floor
+        self.room.save()
+        etag = self.client.get(self.rooms_url)["ETag"]
+
+        floor.delete()
+        res = self.client.get(self.rooms_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIsNone(res.data[0]["floor_map"])
+
+    def test_renumbering_a_floor_changes_floor_filtered_rooms(self):
+        floor = FloorMap.objects.create(building=self.building, floor_number=0, image="images/floor_maps/f0.jpg")
+        self.room.floor_map = floor
+        self.room.save()
+        res = self.client.get(self.rooms_url, {"floor": 0})
+        self.assertEqual(len(res.data), 1)
+
+        floor.floor_number = 1
+        floor.save()
+        res = self.client.get(self.rooms_url, {"floor": 0}, HTTP_IF_NONE_MATCH=res["ETag"])
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, [])
+
+    def test_version_is_per_model(self):
+        room_etag = self.client.get(self.rooms_url)["ETag"]
+        campus_etag = self.client.get("/api/uni/campuses/")["ETag"]
+
+        RoomAlias.objects.create(room=self.room, name="Seminar One")
+        self.campus.name = "Kassai"
+        self.campus.save()
+
+        res = self.client.get(self.rooms_url, HTTP_IF_NONE_MATCH=room_etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        res = self.client.get("/api/uni/campuses/", HTTP_IF_NONE_MATCH=campus_etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data[0]["name"], "Kassai")
+
+    def test_not_found_has_no_validators(self):
+        res = self.client.get(f"{self.rooms_url}999999/")
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertNotIn("ETag", res)
+
+
+class RoomListingTests(APITestCase):
+    rooms_url = "/api/uni/rooms/"
+
+    def setUp(self):
+        self.campus = Campus.objects.create(name="Kassai Campus", address="Kassai út 26", maps_url="http://maps")
+        self.building = Building.objects.create(name="IK", campus=self.campus, address="a", maps_url="http://maps")
+        self.other = Building.objects.create(name="TTK", campus=self.campus, address="a", maps_url="http://maps")
+        self.floor = FloorMap.objects.create(building=self.building, floor_number=2, image="images/floor_maps/f2.jpg")
+        for name in ("IF05", "IF01", "IF03", "IF02", "IF04"):
+            Room.objects.create(name=name, type="seminar room", building=self.building)
+        Room.objects.create(name="IF02", type="laboratory", building=self.building, floor_map=self.floor)
+        Room.objects.create(name="T1", type="lecture hall", building=self.other)
+
+    def test_unpaginated_by_default(self):
+        res = self.client.get(self.rooms_url)
+        self.assertIsInstance(res.data, list)
+        self.assertEqual(len(res.data), 7)
+
+    def test_keyset_pages_cover_everything_once(self):
+        seen = []
+        url = f"{self.rooms_url}?building={self.building.id}&limit=2"
+        while url:
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(res.data["results"]), 2)
+            seen += [(r["name"], r["id"]) for r in res.data["results"]]
+            url = res.data["next"]
+        self.assertEqual(seen, sorted(seen))
+        self.assertEqual(len(seen), 6)
+
+    def test_filters(self):
+        res = self.client.get(self.rooms_url, {"type": "laboratory"})
+        self.assertEqual([r["name"] for r in res.data], ["IF02"])
+        res = self.client.get(self.rooms_url, {"floor": 2, "building": self.building.id})
+        self.assertEqual([r["floor_map"] for r in res.data], [self.floor.id])
+        res = self.client.get(self.rooms_url, {"floor_map": self.floor.id})
+        self.assertEqual(len(res.data), 1)
+
+        res = self.client.get("/api/uni/buildings/", {"campus": self.campus.id, "limit": 1})
+        self.assertEqual([b["name"] for b in res.data["results"]], ["IK"])
+        self.assertIsNotNone(res.data["next"])
+
+    def test_invalid_params(self):
+        self.assertEqual(self.client.get(self.rooms_url, {"building": "x"}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.rooms_url, {"cursor": "!!"}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.rooms_url, {"limit": "x"}).status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class SparseFieldsetTests(APITestCase):
+    rooms_url = "/api/uni/rooms/"
+
+    def setUp(self):
+        self.campus = Campus.objects.create(name="Kassai Campus", address="Kassai út 26", maps_url="http://maps")
+        self.building = Building.objects.create(name="IK", campus=self.campus, address="a", maps_url="http://maps")
+        self.room = Room.objects.create(name="IF01", type="seminar room", building=self.building, map_x=10, map_y=20)
+
+    def test_fields(self):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(self.rooms_url, {"fields": "id,name,map_x,map_y,type"})
+        self.assertEqual(res.data, [{"id": self.room.id, "name": "IF01", "type": "seminar room", "map_x": 10.0, "map_y": 20.0}])
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("building_id", queries[0]["sql"])
+
+    def test_omit(self):
+        res = self.client.get(f"/api/uni/campuses/{self.campus.id}/", {"omit": "image,maps_url"})
+        self.assertNotIn("image", res.data)
+        self.assertNotIn("maps_url", res.data)
+        self.assertEqual(res.data["name"], "Kassai Campus")
+
+    def test_with_keyset_pages(self):
+        res = self.client.get(self.rooms_url, {"fields": "id", "limit": 1})
+        self.assertEqual(res.data["results"], [{"id": self.room.id}])
+
+    def test_unknown_field(self):
+        res = self.client.get(self.rooms_url, {"fields": "id,nope"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_unchanged_without_params(self):
+        res = self.client.get(f"{self.rooms_url}{self.room.id}/")
+        self.assertEqual(
+            set(res.data),
+            {"id", "name", "type", "floor_map", "building", "map_x", "map_y"},
+        )
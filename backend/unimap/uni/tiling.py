@@ -0,0 +1,167 @@
+# uni/tiling.py
+import hashlib
+import io
+import logging
+import math
+import posixpath
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from PIL import Image
+
+from . import catalog
+from .models import FloorMap
+from .storage import overwrite
+
+logger = logging.getLogger(__name__)
+
+TILE_SIZE = 256
+TILE_FORMAT = "jpg"
+PREVIEW_SIZE = 512
+TILES_ROOT = "tiles/floormaps"
+
+
+def tile_size():
+    return getattr(settings, "UNI_TILE_SIZE", TILE_SIZE)
+
+
+def tiles_dir(floor_map_id, image_hash):
+    return f"{TILES_ROOT}/{floor_map_id}/{image_hash}"
+
+
+def image_digest(field_file):
+    digest = hashlib.sha256()
+    with field_file.open("rb") as f:
+        for chunk in f.chunks():
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def level_count(width, height):
+    # Deep Zoom convention: level 0 is 1x1, the last level is full size.
+    return math.ceil(math.log2(max(width, height, 1))) + 1
+
+
+def _encode(image, quality=85):
+    out = io.BytesIO()
+    image.save(out, format="JPEG", quality=quality)
+    return out.getvalue()
+
+
+def _delete_tree(path):
+    if not default_storage.exists(path):
+        return
+    dirs, files = default_storage.listdir(path)
+    for name in files:
+        default_storage.delete(posixpath.join(path, name))
+    for name in dirs:
+        _delete_tree(posixpath.join(path, name))
+    default_storage.delete(path)
+
+
+def write_pyramid(image, base, size=None):
+    """
+    Cut `image` into a Deep Zoom pyramid under `base`:
+    floor.dzi, floor_files/<level>/<col>_<row>.jpg and preview.jpg.
+    Returns the number of levels.
+    """
+    size = size or tile_size()
+    image = image.convert("RGB")
+    width, height = image.size
+    levels = level_count(width, height)
+
+    overwrite(f"{base}/floor.dzi", (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<Image xmlns="http://schemas.microsoft.com/deepzoom/2008" TileSize="{size}" Overlap="0" Format="{TILE_FORMAT}">'
+        f'<Size Width="{width}" Height="{height}"/></Image>\n'
+    ).encode("utf-8"))
+
+    preview = image.copy()
+    preview.thumbnail((PREVIEW_SIZE, PREVIEW_SIZE), Image.LANCZOS)
+    overwrite(f"{base}/preview.jpg", _encode(preview, quality=70))
+
+    # Walk down from full resolution, halving the image at each level.
+    level_image = image
+    for level in range(levels - 1, -1, -1):
+        level_width, level_height = level_image.size
+        for col in range(math.ceil(level_width / size)):
+            for row in range(math.ceil(level_height / size)):
+                box = (col * size, row * size, min((col + 1) * size, level_width), min((row + 1) * size, level_height))
+                overwrite(f"{base}/floor_files/{level}/{col}_{row}.{TILE_FORMAT}", _encode(level_image.crop(box)))
+        if level:
+            level_image = level_image.resize(
+                (max(1, math.ceil(level_width / 2)), max(1, math.ceil(level_height / 2))),
+                Image.LANCZOS,
+            )
+    return levels
+
+
+def tile_floor_map(floor_map_id, force=False):
+    """
+    Build the tile pyramid for one FloorMap. Skipped when the image content
+    hash matches the one already tiled. Returns True if tiles were written.
+    """
+    floor_map = FloorMap.objects.filter(pk=floor_map_id).first()
+    if floor_map is None or not floor_map.image:
+        return False
+
+    try:
+        digest = image_digest(floor_map.image)
+    except FileNotFoundError:
+        logger.warning("Floor map %s image %s is missing", floor_map_id, floor_map.image.name)
+        return False
+
+    if digest == floor_map.image_hash and not force:
+        return False
+
+    base = tiles_dir(floor_map_id, digest)
+    with floor_map.image.open("rb") as f:
+        with Image.open(f) as image:
+            image.load()
+            width, height = image.size
+            levels = write_pyramid(image, base)
+
+    # update() rather than save(): no signal, so no second tiling pass.
+    FloorMap.objects.filter(pk=floor_map_id).update(
+        image_hash=digest,
+        tile_width=width,
+        tile_height=height,
+        tile_levels=levels,
+    )
+    catalog.bump(FloorMap)
+    # Imported here: snapshot -> bundle -> serializers imports this module.
+    from . import snapshot
+    snapshot.rebuild_on_commit()
+
+    if floor_map.image_hash and floor_map.image_hash != digest:
+        _delete_tree(tiles_dir(floor_map_id, floor_map.image_hash))
+    return True
+
+
+def delete_tiles(floor_map_id):
+    _delete_tree(f"{TILES_ROOT}/{floor_map_id}")
+
+
+def tile_info(floor_map, request=None):
+    """
+    Where a viewer finds the tiles of `floor_map`, or None until it has
+    been tiled.
+    """
+    if not floor_map.image_hash:
+        return None
+
+    base = tiles_dir(floor_map.pk, floor_map.image_hash)
+
+    def url(path):
+        url = default_storage.url(path)
+        return request.build_absolute_uri(url) if request is not None else url
+
+    return {
+        "url_template": url(f"{base}/floor_files/") + "{z}/{x}_{y}." + TILE_FORMAT,
+        "dzi": url(f"{base}/floor.dzi"),
+        "preview": url(f"{base}/preview.jpg"),
+        "tile_size": tile_size(),
+        "width": floor_map.tile_width,
+        "height": floor_map.tile_height,
+        "levels": floor_map.tile_levels,
+    }
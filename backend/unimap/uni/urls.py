@@ -8,8 +8,14 @@ urlpatterns = [
     path('buildings/<int:pk>/', BuildingView.as_view()),
     path('rooms/', RoomView.as_view()),
     path('rooms/<int:pk>/', RoomView.as_view()),
+    path('rooms/<int:pk>/nearest/', NearestFacilityView.as_view()),
     path('floormaps/', FloorMapView.as_view()),
     path('floormaps/<int:pk>/', FloorMapView.as_view()),
+    path('floormaps/<int:pk>/rooms/', FloorMapRoomsView.as_view()),
 
     path('search/', UniSearchView.as_view()),
+    path('suggest/', UniSuggestView.as_view()),
+    path('bundle/', UniBundleView.as_view()),
+    path('snapshot/', UniSnapshotView.as_view()),
+    path('route/', RouteView.as_view()),
 ]
\ No newline at end of file
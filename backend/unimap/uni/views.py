@@ -1,3 +1,5 @@
+import hashlib
+import math
 from  .models import *
 from .serializers import *
 from rest_framework import generics, mixins
@@ -5,48 +7,157 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import AllowAny
-from django.db.models import Q
+from .search_index import index as search_index
+from .fuzzy import tree as fuzzy_rooms
+from .search_cache import search_cache
+from . import bundle, catalog, snapshot
+from .pagination import KeysetPagination
+from .spatial import index as spatial_index
+from .nearby import index as facility_index
+from . import routing
+from rest_framework.exceptions import ValidationError
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from .suggest import trie as suggest_trie, DEFAULT_LIMIT as SUGGEST_LIMIT, MAX_LIMIT as SUGGEST_MAX_LIMIT
 
 # Create your views here.
-class CampusView(mixins.ListModelMixin, mixins.RetrieveModelMixin, generics.GenericAPIView):
+def filter_by_params(queryset, request, filter_params):
+    """
+    Apply ?<param>=<value> filters. `filter_params` maps each param to its
+    ORM lookup and the type its value is parsed as.
+    """
+    filters = {}
+    for param, (lookup, cast) in filter_params.items():
+        value = request.query_params.get(param)
+        if value is None:
+            continue
+        try:
+            filters[lookup] = cast(value)
+        except ValueError:
+            raise ValidationError({param: f"Invalid value {value!r}."})
+    return queryset.filter(**filters)
+
+class CatalogReadMixin(mixins.ListModelMixin, mixins.RetrieveModelMixin):
+    """
+    List/retrieve GET with conditional request support. The ETag and
+    Last-Modified come from the model's catalog version (kept by
+    uni/signals.py), so a matching If-None-Match is answered with a 304
+    before any queryset is evaluated. The ETag also hashes the path and
+    query, which select what the same version renders. Views whose filters
+    join other catalog models list them in `related_models`, whose versions
+    count too. ?fields= / ?omit= trim both the serializer and the columns
+    the queryset loads.
+    """
+    related_models = ()
+
+    def get(self, request, *args, **kwargs):
+        model = self.queryset.model
+        models = (model, *self.related_models)
+        versions = ".".join(str(catalog.version(m)) for m in models)
+        etag = quote_etag(f"{model._meta.model_name}-{versions}-{self.url_digest(request)}")
+        last_modified = max(catalog.last_modified(m) for m in models)
+
+        if self.not_modified(request, etag, last_modified):
+            response = HttpResponseNotModified()
+        elif "pk" in kwargs:
+            response = self.retrieve(request, *args, **kwargs)
+        else:
+            response = self.list(request, *args, **kwargs)
+
+        if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response["ETag"] = etag
+            response["Last-Modified"] = http_date(last_modified)
+            patch_cache_control(
+                response,
+                public=True,
+                max_age=getattr(settings, "UNI_CATALOG_MAX_AGE", 0),
+                must_revalidate=True,
+            )
+        return response
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        params = self.request.query_params
+        if "fields" in params or "omit" in params:
+            # Only load the columns the trimmed serializer will read.
+            queryset = queryset.only(*self.selected_columns(queryset.model))
+        return queryset
+
+    def selected_columns(self, model):
+        columns = {model._meta.pk.name}
+        columns.update(getattr(self.pagination_class, "ordering", ()))
+        concrete = {field.name for field in model._meta.concrete_fields}
+        serializer = self.get_serializer()
+        for name in serializer.fields:
+            if name in concrete:
+                columns.add(name)
+            columns.update(serializer.column_sources.get(name, ()))
+        return columns
+
+    def url_digest(self, request):
+        return hashlib.sha256(request.get_full_path().encode("utf-8")).hexdigest()[:16]
+
+    def not_modified(self, request, etag, last_modified):
+        if_none_match = request.headers.get("If-None-Match")
+        if if_none_match:
+            # If-None-Match wins over If-Modified-Since when both are sent.
+            etags = parse_etags(if_none_match)
+            return "*" in etags or etag in etags
+        if_modified_since = parse_http_date_safe(request.headers.get("If-Modified-Since", ""))
+        return if_modified_since is not None and last_modified <= if_modified_since
+
+class CampusView(CatalogReadMixin, generics.GenericAPIView):
     serializer_class = CampusSerializer
     queryset = Campus.objects.all()
     permission_classes = [AllowAny]
 
-    def get(self, request, *args, **kwargs):
-        if "pk" in kwargs:
-            return self.retrieve(request, *args, **kwargs)
-        return self.list(request, *args, **kwargs)
-
-class BuildingView(mixins.ListModelMixin, mixins.RetrieveModelMixin, generics.GenericAPIView):
+class BuildingView(CatalogReadMixin, generics.GenericAPIView):
     serializer_class = BuildingSerializer
     queryset = Building.objects.all()
     permission_classes = [AllowAny]
+    pagination_class = KeysetPagination
+    # query param -> lookup, all covered by the indexes on Building
+    filter_params = {
+        "campus": ("campus_id", int),
+    }
 
-    def get(self, request, *args, **kwargs):
-        if "pk" in kwargs:
-            return self.retrieve(request, *args, **kwargs)
-        return self.list(request, *args, **kwargs)
+    def get_queryset(self):
+        return filter_by_params(super().get_queryset(), self.request, self.filter_params)
 
-class RoomView(mixins.ListModelMixin, mixins.RetrieveModelMixin, generics.GenericAPIView):
+class RoomView(CatalogReadMixin, generics.GenericAPIView):
     serializer_class = RoomSerializer
     queryset = Room.objects.all()
     permission_classes = [AllowAny]
+    pagination_class = KeysetPagination
+    # ?floor= joins through the floor map.
+    related_models = (FloorMap,)
+    # query param -> lookup, all covered by the indexes on Room / FloorMap
+    filter_params = {
+        "building": ("building_id", int),
+        "floor_map": ("floor_map_id", int),
+        "type": ("type", str),
+        "floor": ("floor_map__floor_number", int),
+    }
 
-    def get(self, request, *args, **kwargs):
-        if "pk" in kwargs:
-            return self.retrieve(request, *args, **kwargs)
-        return self.list(request, *args, **kwargs)
-    
-class FloorMapView(mixins.ListModelMixin, mixins.RetrieveModelMixin, generics.GenericAPIView):
+    def get_queryset(self):
+        return filter_by_params(super().get_queryset(), self.request, self.filter_params)
+
+class FloorMapView(CatalogReadMixin, generics.GenericAPIView):
     serializer_class = FloorMapSerializer
     queryset = FloorMap.objects.all()
     permission_classes = [AllowAny]
 
-    def get(self, request, *args, **kwargs):
-        if "pk" in kwargs:
-            return self.retrieve(request, *args, **kwargs)
-        return self.list(request, *args, **kwargs)
+# Most rooms a typo-corrected search returns, closest first.
+FUZZY_LIMIT = 20
+
+
+def _distinct_by_name(objects):
+    # Parents come back once per matched child; keep one of each, in Meta.ordering order.
+    unique = {obj.pk: obj for obj in objects}
+    return sorted(unique.values(), key=lambda obj: (obj.name, obj.pk))
+
 
 class UniSearchView(APIView):
     def get(self, request):
@@ -55,58 +166,277 @@ class UniSearchView(APIView):
         if not query:
             return Response({"error": "Query parameter 'q' is required."}, status=400)
 
+        payload = search_cache.get(query)
+        if payload is not None:
+            response = Response(payload)
+            response["X-Search-Cache"] = "hit"
+            return response
+
+        payload = self.search(query)
+        search_cache.set(query, payload)
+        response = Response(payload)
+        response["X-Search-Cache"] = "miss"
+        return response
+
+    def search(self, query):
+        # Names and aliases are matched in memory; the DB only hydrates the ids.
+        matches = search_index.search(query)
+
+        # Each step is a single joined query that pulls in the parents, and the
+        # serializers work from those materialized rows.
+
         # STEP 1 — Search Rooms
-        rooms = Room.objects.filter(
-            Q(name__icontains=query) |
-            Q(aliases__name__icontains=query)
-        ).distinct()
-
-        if rooms.exists():
-            # Build parent building + campus sets
-            buildings = Building.objects.filter(id__in=rooms.values("building_id")).distinct()
-            campuses = Campus.objects.filter(id__in=buildings.values("campus_id")).distinct()
-
-            return Response({
-                "campuses": CampusSerializer(campuses, many=True).data,
-                "buildings": BuildingSerializer(buildings, many=True).data,
-                "rooms": RoomSerializer(rooms, many=True).data,
-                "matched_type": "room"
-            })
+        if matches["room"]:
+            rooms = list(Room.objects.filter(id__in=matches["room"]).select_related("building__campus"))
+            if rooms:
+                buildings = _distinct_by_name(room.building for room in rooms)
+                campuses = _distinct_by_name(building.campus for building in buildings)
+                return self.result(campuses, buildings, rooms, "room")
 
         # STEP 2 — Search Buildings (only if no rooms matched)
-        buildings = Building.objects.filter(
-            Q(name__icontains=query) |
-            Q(aliases__name__icontains=query)
-        ).distinct()
-
-        if buildings.exists():
-            campuses = Campus.objects.filter(id__in=buildings.values("campus_id")).distinct()
-
-            return Response({
-                "campuses": CampusSerializer(campuses, many=True).data,
-                "buildings": BuildingSerializer(buildings, many=True).data,
-                "rooms": [],  # no rooms
-                "matched_type": "building"
-            })
+        if matches["building"]:
+            buildings = list(Building.objects.filter(id__in=matches["building"]).select_related("campus"))
+            if buildings:
+                campuses = _distinct_by_name(building.campus for building in buildings)
+                return self.result(campuses, buildings, [], "building")
 
         # STEP 3 — Search Campuses (only if no rooms or buildings matched)
-        campuses = Campus.objects.filter(
-            Q(name__icontains=query) |
-            Q(aliases__name__icontains=query)
-        ).distinct()
-
-        if campuses.exists():
-            return Response({
-                "campuses": CampusSerializer(campuses, many=True).data,
-                "buildings": [],
-                "rooms": [],
-                "matched_type": "campus"
-            })
+        if matches["campus"]:
+            campuses = list(Campus.objects.filter(id__in=matches["campus"]))
+            if campuses:
+                return self.result(campuses, [], [], "campus")
+
+        # STEP 4 — Typo-tolerant room lookup (only if nothing matched exactly)
+        ranked = fuzzy_rooms.search(query)[:FUZZY_LIMIT]
+        if ranked:
+            rank = {room_id: position for position, (_, room_id) in enumerate(ranked)}
+            rooms = sorted(
+                Room.objects.filter(id__in=rank).select_related("building__campus"),
+                key=lambda room: rank[room.pk]
+            )
+            if rooms:
+                buildings = _distinct_by_name(room.building for room in rooms)
+                campuses = _distinct_by_name(building.campus for building in buildings)
+                return self.result(campuses, buildings, rooms, "room", fuzzy=True)
 
         # Nothing matched
+        return self.result([], [], [], None)
+
+    def result(self, campuses, buildings, rooms, matched_type, fuzzy=False):
+        return {
+            "campuses": CampusSerializer(campuses, many=True).data,
+            "buildings": BuildingSerializer(buildings, many=True).data,
+            "rooms": RoomSerializer(rooms, many=True).data,
+            "matched_type": matched_type,
+            "fuzzy": fuzzy
+        }
+
+
+class UniSuggestView(APIView):
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        query = request.query_params.get("q", "").strip()
+
+        if not query:
+            return Response({"error": "Query parameter 'q' is required."}, status=400)
+
+        try:
+            limit = int(request.query_params.get("limit", SUGGEST_LIMIT))
+        except ValueError:
+            return Response({"error": "Query parameter 'limit' must be an integer."}, status=400)
+        limit = max(1, min(limit, SUGGEST_MAX_LIMIT))
+
+        # Answered entirely from the in-memory trie.
+        results, partial = suggest_trie.suggest(query, limit=limit)
+        return Response({
+            "results": results,
+            "partial": partial
+        })
+
+
+class UniBundleView(APIView):
+    """
+    The whole campus > building > floor > room tree in one response,
+    optionally limited to ?campus=<id>. The JSON is rendered once per
+    catalog version and reused until the catalog changes.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        campus_id = request.query_params.get("campus")
+        if campus_id is not None:
+            try:
+                campus_id = int(campus_id)
+            except ValueError:
+                return Response({"error": "Query parameter 'campus' must be an integer."}, status=400)
+
+        bundled = bundle.get(campus_id, request)
+        if bundled is None:
+            return Response({"error": "Campus not found."}, status=404)
+        etag, blob = bundled
+        etag = quote_etag(etag)
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(blob, content_type="application/json")
+        response["ETag"] = etag
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=getattr(settings, "UNI_CATALOG_MAX_AGE", 0),
+            must_revalidate=True,
+        )
+        return response
+
+
+class UniSnapshotView(APIView):
+    """
+    Manifest of the static catalog snapshots: per campus, the URLs of the
+    current content-hashed JSON file and its pre-compressed copies. Those
+    files never change, so they can be cached forever by whatever serves
+    MEDIA_ROOT.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        manifest = snapshot.read_manifest()
+        if manifest is None:
+            return Response({"error": "No catalog snapshot has been built yet."}, status=status.HTTP_404_NOT_FOUND)
+
+        etag = quote_etag(f"snapshot-{manifest['version']}-{manifest['generated_at']}")
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            response = HttpResponseNotModified()
+        else:
+            response = Response({
+                "version": manifest["version"],
+                "generated_at": manifest["generated_at"],
+                "campuses": {
+                    campus_id: {
+                        "sha256": entry["sha256"],
+                        "size": entry["size"],
+                        "urls": {encoding: request.build_absolute_uri(url) for encoding, url in entry["urls"].items()},
+                    }
+                    for campus_id, entry in manifest["campuses"].items()
+                },
+            })
+        response["ETag"] = etag
+        patch_cache_control(response, public=True, no_cache=True)
+        return response
+
+
+def _floats(value, count, param):
+    try:
+        numbers = [float(part) for part in value.split(",")]
+    except ValueError:
+        numbers = []
+    if len(numbers) != count or not all(math.isfinite(number) for number in numbers):
+        raise ValidationError({param: f"Expected {count} comma-separated numbers."})
+    return numbers
+
+
+class FloorMapRoomsView(APIView):
+    """
+    Room pins of one floor map inside a viewport (?bbox=x0,y0,x1,y1) or
+    closest to a point (?near=x,y&k=5), answered from the spatial index.
+    """
+    permission_classes = [AllowAny]
+    max_k = 50
+
+    def get(self, request, pk):
+        grid = spatial_index.grid(pk)
+        if grid is None:
+            return Response({"error": "Floor map not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        if "bbox" in request.query_params:
+            x0, y0, x1, y1 = _floats(request.query_params["bbox"], 4, "bbox")
+            return Response(grid.within(min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)))
+
+        if "near" in request.query_params:
+            x, y = _floats(request.query_params["near"], 2, "near")
+            try:
+                k = int(request.query_params.get("k", 1))
+            except ValueError:
+                raise ValidationError({"k": "Must be an integer."})
+            k = max(1, min(k, self.max_k))
+            return Response([{**pin, "distance": distance} for distance, pin in grid.nearest(x, y, k)])
+
+        return Response({"error": "Query parameter 'bbox' or 'near' is required."}, status=400)
+
+
+class NearestFacilityView(APIView):
+    """
+    The k rooms of ?type=<room type> in the same building closest to a room,
+    e.g. the nearest male washroom to a lecture hall.
+    """
+    permission_classes = [AllowAny]
+    max_k = 20
+
+    def get(self, request, pk):
+        room_type = request.query_params.get("type")
+        if room_type not in ROOM_TYPES:
+            raise ValidationError({"type": f"Must be one of: {', '.join(ROOM_TYPES)}."})
+        try:
+            k = int(request.query_params.get("k", 1))
+        except ValueError:
+            raise ValidationError({"k": "Must be an integer."})
+        k = max(1, min(k, self.max_k))
+
+        room = Room.objects.select_related("floor_map").filter(pk=pk).first()
+        if room is None:
+            return Response({"error": "Room not found."}, status=status.HTTP_404_NOT_FOUND)
+        if room.floor_map is None or room.map_x is None or room.map_y is None:
+            return Response({"error": "Room has no position on a floor map."}, status=400)
+
+        nearest = facility_index.nearest(room, room_type, k)
+        rooms = Room.objects.in_bulk([room_id for _, room_id in nearest])
+        return Response([
+            {**RoomSerializer(rooms[room_id]).data, "distance": distance}
+            for distance, room_id in nearest
+            if room_id in rooms
+        ])
+
+
+class RouteView(APIView):
+    """
+    Shortest indoor walk between two rooms of the same building, looked up
+    in the building's precomputed route tables.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        try:
+            from_room = int(request.query_params["from"])
+            to_room = int(request.query_params["to"])
+        except (KeyError, ValueError):
+            return Response({"error": "Query parameters 'from' and 'to' must be room ids."}, status=400)
+
+        buildings = dict(Room.objects.filter(pk__in=[from_room, to_room]).values_list("pk", "building_id"))
+        if from_room not in buildings or to_room not in buildings:
+            return Response({"error": "Room not found."}, status=status.HTTP_404_NOT_FOUND)
+        if buildings[from_room] != buildings[to_room]:
+            return Response({"error": "Routes between buildings are not supported."}, status=400)
+
+        found = routing.routes_for(buildings[from_room]).route(from_room, to_room)
+        if found is None:
+            return Response({"error": "No route between these rooms."}, status=status.HTTP_404_NOT_FOUND)
+
+        distance, nodes = found
         return Response({
-            "campuses": [],
-            "buildings": [],
-            "rooms": [],
-            "matched_type": None
-        })
\ No newline at end of file
+            "from": from_room,
+            "to": to_room,
+            "distance": distance,
+            "path": [
+                {
+                    "id": node["id"],
+                    "kind": node["kind"],
+                    "label": node["label"],
+                    "room": node["room_id"],
+                    "floor_map": node["floor_map_id"],
+                    "floor_number": node["floor_map__floor_number"],
+                    "x": node["x"],
+                    "y": node["y"],
+                }
+                for node in nodes
+            ]
+        })
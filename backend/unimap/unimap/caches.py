@@ -0,0 +1,34 @@
+"""
+Checks for caches that must be shared between worker processes.
+
+Catalog versions (uni/catalog.py) and availability generations
+(booking/availability.py) are only correct if every process reads and
+bumps the same counters. A local-memory cache gives each process its own
+copy, so a change made through one worker never reaches the others.
+"""
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+LOCAL_BACKENDS = {
+    "django.core.cache.backends.locmem.LocMemCache",
+}
+
+
+def require_shared_cache(setting, default="default"):
+    """
+    Raise ImproperlyConfigured if the cache alias named by `setting` is
+    process-local while DEBUG is off. Development servers run a single
+    process, so DEBUG lets them keep the local-memory default.
+    """
+    if settings.DEBUG:
+        return
+    alias = getattr(settings, setting, default)
+    backend = settings.CACHES.get(alias, {}).get("BACKEND")
+    if backend in LOCAL_BACKENDS:
+        raise ImproperlyConfigured(
+            f"{setting} points at the {alias!r} cache, which uses the "
+            f"process-local {backend}. Configure a cache shared between "
+            "processes (e.g. set UNIMAP_CACHE_URL) before running with "
+            "DEBUG off."
+        )
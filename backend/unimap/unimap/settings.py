@@ -90,6 +90,11 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # A file rather than the shared in-memory default, so tests that
+        # write from several threads wait for locks instead of failing.
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
     }
 }
 
@@ -145,6 +150,71 @@ CORS_ALLOWED_ORIGINS = [
 ]
 
 
+# Catalog versions behind the uni ETags (uni/catalog.py, UNI_CATALOG_CACHE)
+# and booking availability generations (booking/availability.py,
+# BOOKING_AVAILABILITY_CACHE) live in these caches and must be shared by
+# every worker process: with a per-process cache a change made through one
+# worker is never seen by the others. Point UNIMAP_CACHE_URL at a Redis
+# server in production; the local-memory fallback only suits a single
+# development process, and the uni and booking apps refuse to start with it
+# when DEBUG is off (see unimap/caches.py).
+if os.environ.get('UNIMAP_CACHE_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['UNIMAP_CACHE_URL'],
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+    }
+UNI_CATALOG_CACHE = 'default'
+BOOKING_AVAILABILITY_CACHE = 'default'
+
+
+# Result cache in front of /api/uni/search/ (see uni/search_cache.py).
+# BACKEND is "local" (per-process LRU) or "django" (uses CACHES[ALIAS]).
+UNI_SEARCH_CACHE = {
+    'BACKEND': 'local',
+    'TIMEOUT': 300,
+    'MAX_ENTRIES': 1024,
+}
+
+
+# Cut uploaded floor map images into Deep Zoom tiles in the background
+# (see uni/tiling.py and `manage.py tile_floormaps`).
+UNI_FLOOR_MAP_TILING = True
+UNI_TILE_SIZE = 256
+
+# Seconds browsers and proxies may reuse uni catalog responses before
+# revalidating them with If-None-Match / If-Modified-Since.
+UNI_CATALOG_MAX_AGE = 60
+
+# Rebuild the static per-campus catalog snapshots under MEDIA_ROOT/static/
+# this many seconds after the last catalog change (see uni/snapshot.py and
+# `manage.py build_catalog_snapshot`).
+UNI_CATALOG_SNAPSHOTS = True
+UNI_CATALOG_SNAPSHOT_DELAY = 5
+
+# Precompute a building's route tables this many seconds after the last
+# change to its navigation graph or floor maps (see uni/routing.py).
+UNI_ROUTE_REBUILD_DELAY = 2
+
+# Bookings dated more than this many days ago are moved to the booking
+# archive by `manage.py archive_bookings` (see booking/archive.py).
+BOOKING_ARCHIVE_AFTER_DAYS = 90
+
+# Fan-out behind /api/booking/availability/stream/ (see booking/push.py).
+# LocalBroker only reaches streams served by the same process; point this
+# at a broker shared between processes when running more than one. Idle
+# streams get a comment line every BOOKING_PUSH_KEEPALIVE seconds.
+BOOKING_PUSH_BROKER = 'booking.push.LocalBroker'
+BOOKING_PUSH_KEEPALIVE = 15
+
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'users.authentication.JWTAuthentication',
@@ -0,0 +1,51 @@
+"""
+Minimal in-process background work queue.
+
+Work that should not run on the request path (image tiling, snapshot
+builds, ...) is handed to a small thread pool. Set TASKS_ALWAYS_EAGER to
+run it inline instead, e.g. in tests or management commands.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, "TASKS_MAX_WORKERS", 2),
+            thread_name_prefix="unimap-task",
+        )
+    return _executor
+
+
+def _run(func, args, kwargs):
+    try:
+        func(*args, **kwargs)
+    except Exception:
+        logger.exception("Background task %s failed", getattr(func, "__name__", func))
+    finally:
+        # Worker threads open their own DB connections; don't leak them.
+        close_old_connections()
+
+
+def run_in_background(func, *args, **kwargs):
+    if getattr(settings, "TASKS_ALWAYS_EAGER", False):
+        return func(*args, **kwargs)
+    return _get_executor().submit(_run, func, args, kwargs)
+
+
+def run_after_commit(func, *args, **kwargs):
+    """
+    Queue `func` once the current transaction commits, so the worker sees
+    the rows the caller just wrote.
+    """
+    transaction.on_commit(lambda: run_in_background(func, *args, **kwargs))